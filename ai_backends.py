@@ -0,0 +1,441 @@
+import os
+import sys
+import json
+import argparse
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import networkx as nx
+import deadlock_core
+import recovery
+import scenario_dsl
+
+METHODS = ("Preemption", "Random Kill", "Resource Timeout")
+GEMINI_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+DEFAULT_THRESHOLD = 0.7  # local answers below this confidence are escalated to the remote model
+DEFAULT_TIMEOUT = 10
+MOCK_CHUNK_CHARS = 24
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+class Features:
+    """What the recommenders look at, computed once per request from the wait-for graph."""
+
+    def __init__(self, graph):
+        succ = recovery.successor_sets(graph)
+        components = recovery.deadlocked_components(succ)
+        self.deadlock_type = deadlock_core.identify_deadlock_type(graph)
+        self.processes = graph.number_of_nodes()
+        self.dependencies = graph.number_of_edges()
+        self.components = len(components)
+        self.deadlocked = sum(len(c) for c in components)
+        self.largest = max((len(c) for c in components), default=0)
+        self.self_loops = sum(1 for n in succ if n in succ[n])
+        # A process many deadlocked processes wait on is a single point whose preemption clears the most.
+        self.hotspot, self.hotspot_waiters = None, 0
+        for component in components:
+            for n in component:
+                waiters = sum(1 for u in component if n in succ[u] and u != n)
+                if waiters > self.hotspot_waiters:
+                    self.hotspot, self.hotspot_waiters = n, waiters
+
+    def describe(self):
+        return (f"{self.deadlock_type}; {self.processes} processes, {self.dependencies} dependencies, "
+                f"{self.components} deadlocked group(s) covering {self.deadlocked} processes, largest {self.largest}")
+
+
+class Recommendation:
+    def __init__(self, method, reasons, confidence, backend):
+        self.method = method
+        self.reasons = list(reasons)
+        self.confidence = confidence
+        self.backend = backend
+
+
+class Prediction:
+    def __init__(self, text, confidence, backend):
+        self.text = text
+        self.confidence = confidence
+        self.backend = backend
+
+
+class AIBackend:
+    name = "base"
+
+    def recommend(self, features):
+        raise NotImplementedError
+
+    def predict(self, scenario, history, graph):
+        raise NotImplementedError
+
+    def predict_stream(self, scenario, history, graph):
+        # Backends without a streaming transport deliver the whole text as one chunk.
+        yield self.predict(scenario, history, graph).text
+
+
+# (test, method, confidence, reason) in priority order; the first rule that matches decides.
+RULES = [
+    (lambda f: f.components == 0, None, 1.0,
+     "No process is part of a wait cycle."),
+    (lambda f: f.self_loops and f.components == f.self_loops, "Resource Timeout", 0.9,
+     "Every cycle is a process waiting on itself; timing out that request breaks it without losing any work."),
+    (lambda f: f.largest == 2 and f.components == 1, "Preemption", 0.9,
+     "Two processes hold what the other needs; preempting one frees the other immediately."),
+    (lambda f: f.hotspot_waiters >= 3, "Preemption", 0.85,
+     "One process is waited on by {hotspot_waiters} deadlocked processes; preempting it clears most of the cycles at once."),
+    (lambda f: f.components > 1 and f.largest <= 3, "Preemption", 0.8,
+     "{components} small independent cycles; one preemption per cycle is cheap and predictable."),
+    (lambda f: f.largest > 3 and f.hotspot_waiters <= 1, "Resource Timeout", 0.75,
+     "A long simple cycle of {largest} processes; timing out one dependency breaks it without killing anything."),
+    (lambda f: True, "Preemption", 0.5,
+     "Mixed cycle structure; preemption is the safe default but the choice is not clear-cut."),
+]
+
+PREVENTION = {
+    "Circular Wait Deadlock": ["Acquire resources in one global order so no cycle can form.",
+                               "Request every needed resource at once, or release held ones before asking for more."],
+    "Mutual Exclusion Deadlock (Self-loop detected)": ["Use re-entrant locks or check ownership before requesting a resource already held.",
+                                                       "Add timeouts to resource requests."],
+    "No Preemption Deadlock": ["Allow held resources to be preempted when a request cannot be granted.",
+                               "Use try-lock with back-off instead of blocking waits."],
+}
+
+
+class LocalBackend(AIBackend):
+    """Deterministic rules over graph features: no network, microseconds per answer."""
+
+    name = "local rules"
+
+    def recommend(self, features):
+        for test, method, confidence, reason in RULES:
+            if test(features):
+                reasons = [reason.format(**vars(features))]
+                if method == "Preemption" and features.hotspot is not None:
+                    reasons.append(f"Start with {features.hotspot}, which {features.hotspot_waiters} deadlocked process(es) wait on.")
+                if features.components:
+                    reasons.append(f"{features.components} deadlocked group(s), {features.deadlocked} process(es) involved.")
+                return Recommendation(method, reasons, confidence, self.name)
+
+    def predict(self, scenario, history, graph):
+        # Scenarios written in the scenario language can be answered exactly; free-form questions cannot.
+        features = Features(graph)
+        try:
+            edges = scenario_dsl.compile_text(scenario, strict=True) if scenario.strip() else []
+        except scenario_dsl.ScenarioError:
+            edges = None
+        if not edges:
+            past = [r for r in history if "label" in r]
+            rate = sum(r["label"] for r in past) / len(past) if past else 0
+            text = (f"Analysis:\nCurrent state: {features.describe()}.\n"
+                    f"{len(past)} recorded states, {rate:.0%} of them deadlocked.\n"
+                    f"Likelihood of deadlock:\n{'High' if features.components else 'Low'} for the current dependencies.\n"
+                    f"Prevention strategies:\n" + "\n".join(f"- {s}" for s in PREVENTION.get(features.deadlock_type, PREVENTION["Circular Wait Deadlock"])))
+            return Prediction(text, 0.3 if scenario.strip() else 0.8, self.name)
+        combined = nx.DiGraph(graph)
+        combined.add_edges_from(edges)
+        after = Features(combined)
+        lines = [f"Analysis:\nThe scenario adds {len(edges)} dependencies: {after.describe()}."]
+        if after.components:
+            lines.append(f"Likelihood of deadlock:\nCertain: {after.deadlock_type} with {after.deadlocked} process(es) in {after.components} cycle group(s).")
+            lines.append("Prevention strategies:\n" + "\n".join(f"- {s}" for s in PREVENTION.get(after.deadlock_type, PREVENTION["Circular Wait Deadlock"])))
+            recommendation = self.recommend(after)
+            lines.append(f"Conclusion:\nIf it happens, recover with {recommendation.method}: {recommendation.reasons[0]}")
+        else:
+            lines.append("Likelihood of deadlock:\nNone: the dependencies form no cycle.")
+            lines.append("Conclusion:\nThe scenario is safe as written.")
+        return Prediction("\n".join(lines), 0.95, self.name)
+
+
+class GeminiBackend(AIBackend):
+    name = "Gemini"
+
+    def __init__(self, api_key, endpoint=GEMINI_ENDPOINT, timeout=DEFAULT_TIMEOUT):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _generate(self, prompt):
+        import requests
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+        data = {"contents": [{"parts": [{"text": prompt}]}]}
+        try:
+            response = requests.post(self.endpoint, headers=headers, json=data, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        except requests.exceptions.HTTPError as e:
+            raise BackendError(f"HTTP error: {e} - check the API key and endpoint")
+        except requests.exceptions.RequestException as e:
+            raise BackendError(f"Request error: {e} - check the connection or API service")
+        except (KeyError, IndexError, ValueError) as e:
+            raise BackendError(f"Parsing error: {e} - invalid response format from the API")
+
+    def recommend(self, features):
+        prompt = (f"Given a deadlock of type '{features.deadlock_type}' ({features.describe()}), recommend the best "
+                  f"resolution method (Preemption, Random Kill, or Resource Timeout) in a concise point-wise format.")
+        lines = [line.strip() for line in self._generate(prompt).split("\n") if line.strip()]
+        method = next((m for m in ["Resource Timeout", "Preemption", "Random Kill"] if any(m.lower() in line.lower() for line in lines)), "Preemption")
+        reasons = [line.replace("*", "").replace("-", "").strip() for line in lines if not any(m.lower() in line.lower() for m in METHODS)]
+        return Recommendation(method, reasons[:3], 0.9, self.name)
+
+    @staticmethod
+    def _prediction_prompt(scenario, history):
+        return (f"Analyze this scenario: '{scenario}' and historical data: {history}. Predict if a deadlock is likely and "
+                f"suggest prevention strategies. If the scenario is a question, provide a clear explanation.")
+
+    def predict(self, scenario, history, graph):
+        return Prediction(self._generate(self._prediction_prompt(scenario, history)), 0.9, self.name)
+
+    def predict_stream(self, scenario, history, graph):
+        # streamGenerateContent with alt=sse sends one JSON event per generated chunk.
+        import requests
+        url = self.endpoint.replace(":generateContent", ":streamGenerateContent") + "?alt=sse"
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+        data = {"contents": [{"parts": [{"text": self._prediction_prompt(scenario, history)}]}]}
+        try:
+            with requests.post(url, headers=headers, json=data, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                # text/event-stream is always UTF-8, but requests would fall back to ISO-8859-1 without a charset.
+                response.encoding = "utf-8"
+                for event in sse_events(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                    parts = json.loads(event)["candidates"][0]["content"].get("parts", [])
+                    text = "".join(part.get("text", "") for part in parts)
+                    if text:
+                        yield text
+        except requests.exceptions.HTTPError as e:
+            raise BackendError(f"HTTP error: {e} - check the API key and endpoint")
+        except requests.exceptions.RequestException as e:
+            raise BackendError(f"Request error: {e} - check the connection or API service")
+        except (KeyError, IndexError, ValueError) as e:
+            raise BackendError(f"Parsing error: {e} - invalid response format from the API")
+
+
+def sse_events(lines):
+    # Server-sent events: "data:" lines accumulate until a blank line ends the event.
+    data = []
+    for line in lines:
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+    if data:
+        yield "\n".join(data)
+
+
+class RoutedBackend(AIBackend):
+    """Local rules first; the remote model is asked only when the local answer is not confident enough."""
+
+    def __init__(self, local, remote=None, threshold=DEFAULT_THRESHOLD):
+        self.local = local
+        self.remote = remote
+        self.threshold = threshold
+        self.escalations = 0
+
+    @property
+    def name(self):
+        return f"{self.local.name} -> {self.remote.name}" if self.remote else self.local.name
+
+    def _route(self, ask):
+        answer = ask(self.local)
+        if answer.confidence >= self.threshold or self.remote is None:
+            return answer
+        self.escalations += 1
+        try:
+            return ask(self.remote)
+        except BackendError:
+            return answer  # the remote model is an improvement, not a dependency
+
+    def recommend(self, features):
+        return self._route(lambda backend: backend.recommend(features))
+
+    def predict(self, scenario, history, graph):
+        return self._route(lambda backend: backend.predict(scenario, history, graph))
+
+    def predict_stream(self, scenario, history, graph):
+        answer = self.local.predict(scenario, history, graph)
+        if answer.confidence >= self.threshold or self.remote is None:
+            yield answer.text
+            return
+        self.escalations += 1
+        started = False
+        try:
+            for chunk in self.remote.predict_stream(scenario, history, graph):
+                started = True
+                yield chunk
+        except BackendError:
+            if started:
+                raise  # part of the remote answer is already on screen; don't splice the local one after it
+            yield answer.text
+
+
+class PredictionFormatter:
+    """Turns prediction text into ai_log HTML as it streams in. Each complete line is classified as a
+    section heading or content the moment its newline arrives; a partial line waits for the rest."""
+
+    SECTIONS = [
+        ("likelihood of deadlock", "#FF6F61", "Prediction"),
+        ("prevention strategies", "#006400", "Prevention Strategies"),
+        ("improving prediction", "#4682B4", "Improving Prediction"),
+        ("conclusion", "#4682B4", "Conclusion"),
+        ("analysis", "#26A69A", "Analysis"),
+        ("explanation", "#26A69A", "Explanation"),
+    ]
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.pending = ""
+        self.section = ""
+        self.question = "what is" in scenario.lower()
+
+    def header(self):
+        return f"<b><u>AI Prediction Result</u></b><br><br><b style='color: #0A1A44;'>Scenario:</b> {self.scenario}<br>"
+
+    def feed(self, text):
+        lines = (self.pending + text).split("\n")
+        self.pending = lines.pop()
+        return "".join(self._line(line) for line in lines)
+
+    def finish(self):
+        line, self.pending = self.pending, ""
+        return self._line(line)
+
+    def _line(self, line):
+        line = line.strip()
+        if not line:
+            return ""
+        lowered = line.lower()
+        for keyword, color, title in self.SECTIONS:
+            if keyword in lowered:
+                self.section = title
+                return f"<br><b style='color: {color};'>{title}:</b><br>"
+        fragment = ""
+        if self.question and not self.section:
+            # Answers to "what is ..." questions often start without a heading of their own.
+            self.section = "Explanation"
+            fragment = "<br><b style='color: #26A69A;'>Explanation:</b><br>"
+        clean_line = line.replace('- -', '-').replace('*-', '-').replace('*', '').strip()
+        if clean_line.startswith('-'):
+            return fragment + f"- {clean_line[1:].strip()}<br>"
+        return fragment + f"{clean_line}<br>"
+
+
+def backend_from_env(environ=None):
+    """DEADLOCK_AI_BACKEND: local, gemini or routed (default). GEMINI_API_KEY enables the remote model,
+    DEADLOCK_AI_ENDPOINT overrides its URL (e.g. a mock server) and DEADLOCK_AI_THRESHOLD sets escalation."""
+    environ = os.environ if environ is None else environ
+    kind = environ.get("DEADLOCK_AI_BACKEND", "routed").lower()
+    key = environ.get("GEMINI_API_KEY")
+    endpoint = environ.get("DEADLOCK_AI_ENDPOINT", GEMINI_ENDPOINT)
+    remote = GeminiBackend(key or "", endpoint) if key or endpoint != GEMINI_ENDPOINT else None
+    if kind == "local":
+        return LocalBackend()
+    if kind == "gemini":
+        if remote is None:
+            raise BackendError("DEADLOCK_AI_BACKEND=gemini needs GEMINI_API_KEY or DEADLOCK_AI_ENDPOINT")
+        return remote
+    if kind != "routed":
+        raise BackendError(f"unknown DEADLOCK_AI_BACKEND '{kind}' (expected local, gemini or routed)")
+    threshold = environ.get("DEADLOCK_AI_THRESHOLD", DEFAULT_THRESHOLD)
+    try:
+        threshold = float(threshold)
+    except ValueError:
+        threshold = None
+    if threshold is None or not 0 <= threshold <= 1:
+        raise BackendError(f"DEADLOCK_AI_THRESHOLD must be a confidence between 0 and 1, got '{environ['DEADLOCK_AI_THRESHOLD']}'")
+    return RoutedBackend(LocalBackend(), remote, threshold)
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    # Speaks the generateContent and streamGenerateContent (alt=sse) shapes with canned text.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            prompt = json.loads(self.rfile.read(length))["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError):
+            self._reply(400, {"error": {"message": "malformed generateContent request"}})
+            return
+        self.server.prompts.append(prompt)
+        if "recommend the best resolution method" in prompt:
+            text = self.server.recommendation_text
+        else:
+            text = self.server.prediction_text
+        if ":streamGenerateContent" not in self.path:
+            self._reply(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+            return
+        # One SSE event per HTTP chunk, as the real API sends them.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(text), MOCK_CHUNK_CHARS):
+            if i:
+                time.sleep(self.server.chunk_delay)
+            event = {"candidates": [{"content": {"parts": [{"text": text[i:i + MOCK_CHUNK_CHARS]}], "role": "model"}}]}
+            data = f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockGeminiServer(ThreadingHTTPServer):
+    """Local stand-in for the Gemini API, for offline runs and tests. Records the prompts it receives."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, chunk_delay=0.0,
+                 recommendation_text="- Resource Timeout\n- Breaks the cycle without losing work\n- Cheap to retry",
+                 prediction_text="Analysis:\nMock analysis.\nLikelihood of deadlock:\nModerate.\nPrevention strategies:\n- Order resource acquisition."):
+        super().__init__(("127.0.0.1", port), MockGeminiHandler)
+        self.prompts = []
+        self.chunk_delay = chunk_delay  # seconds between streamed chunks, to imitate generation time
+        self.recommendation_text = recommendation_text
+        self.prediction_text = prediction_text
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1beta/models/mock:generateContent"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Gemini generateContent API.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="Seconds between streamed chunks")
+    args = parser.parse_args(argv)
+
+    server = MockGeminiServer(args.port, args.chunk_delay)
+    print(f"Mock Gemini listening; set DEADLOCK_AI_ENDPOINT={server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
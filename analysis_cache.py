@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from hashlib import blake2b
+
+import numpy as np
+
+import deadlock_core
+from deadlock_core import process_sort_key
+
+MAXSIZE = 256
+
+
+def fingerprint(graph, processes=()):
+    """Canonical key of a dependency graph: its process names plus the sorted, packed (waiter, holder)
+    index pairs, hashed. Two graphs get the same key exactly when they have the same processes and
+    dependencies, however they were built."""
+    nodes = sorted(graph.nodes, key=process_sort_key)
+    index = {n: i for i, n in enumerate(nodes)}
+    n = len(nodes)
+    edges = np.fromiter((index[u] * n + index[v] for u, v in graph.edges), dtype=np.uint64, count=graph.number_of_edges())
+    edges.sort()
+    h = blake2b(digest_size=16)
+    h.update("\0".join(nodes).encode())
+    h.update(b"\1")
+    h.update("\0".join(processes).encode())
+    h.update(b"\1")
+    h.update(edges.tobytes())
+    return h.digest()
+
+
+class Analysis:
+    """Everything the detection views derive from one graph. Classification, cycles and the dependency
+    series are computed up front in O(V + E); the ML risk only when first asked for, then kept."""
+
+    def __init__(self, graph, processes):
+        self.processes = list(processes)
+        self.type = deadlock_core.identify_deadlock_type(graph)
+        # Any cycle (a self-loop counts) feeds the ML features; only a circular wait is reported as "the" cycle.
+        self.first_cycle = deadlock_core.find_deadlock_cycle(graph) if graph.edges else []
+        self.cycle = self.first_cycle if "Circular Wait" in self.type else []
+        self.cycles = deadlock_core.deadlock_cycles(graph) if "No Deadlock" not in self.type else []
+        if self.cycle:
+            self.involved = [u for u, _, _ in self.cycle]
+        else:
+            touched = {n for edge in graph.edges for n in edge}
+            self.involved = [n for n in graph.nodes if n in touched]
+        waiting, waited_by = dict.fromkeys(self.processes, 0), dict.fromkeys(self.processes, 0)
+        for u, v in graph.edges:
+            if u in waiting:
+                waiting[u] += 1
+            if v in waited_by:
+                waited_by[v] += 1
+        self.series = ([waiting[p] for p in self.processes], [waited_by[p] for p in self.processes], [1] * len(self.processes))
+        self._risk = None
+
+    @property
+    def deadlocked(self):
+        return "No Deadlock" not in self.type
+
+    @property
+    def cycle_str(self):
+        return " -> ".join(f"{u} to {v}" for u, v, _ in self.cycle) if self.cycle else "N/A"
+
+    def ml_risk(self):
+        """(risky processes, message) from clustering the per-process dependency features."""
+        if self._risk is None:
+            on_cycle = {n for edge in self.first_cycle for n in edge[:2]}
+            cycle_feature = [1 if p in on_cycle else 0 for p in self.processes]
+            X = np.array([[w, wb, r, c] for w, wb, r, c in zip(*self.series, cycle_feature)])
+
+            from sklearn.cluster import KMeans
+            kmeans = KMeans(n_clusters=2, random_state=42)
+            clusters = kmeans.fit_predict(X)
+
+            risky = [self.processes[i] for i in range(len(clusters)) if cycle_feature[i] == 1]
+            if risky:
+                message = f"ML Analysis: Potential deadlock risk detected in processes {', '.join(risky)} due to cycle involvement."
+            else:
+                message = "ML Analysis: No significant deadlock risk detected based on clustering."
+            self._risk = (risky, message)
+        return self._risk
+
+
+class AnalysisCache:
+    """Bounded LRU of Analysis results keyed by graph fingerprint, so a matrix seen before costs one
+    hash and a lookup instead of a fresh classification, cycle search and clustering."""
+
+    def __init__(self, maxsize=MAXSIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, graph, processes=()):
+        key = fingerprint(graph, processes)
+        analysis = self.entries.get(key)
+        if analysis is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return analysis
+        self.misses += 1
+        analysis = self.entries[key] = Analysis(graph, processes)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return analysis
+
+    def clear(self):
+        self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self.entries), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "hit_rate": self.hit_rate}
+
+    def describe(self):
+        return (f"Analysis cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+                f"{len(self.entries)}/{self.maxsize} entries, {self.evictions} evicted")
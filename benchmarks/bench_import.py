@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import graph_io
+
+PROCESSES = 2_000_000
+DEPENDENCIES = 10_000_000
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    # Mostly forward dependencies (can finish) plus one ring, so the reduction has to peel nearly everything.
+    src = rng.integers(0, PROCESSES - 1, DEPENDENCIES)
+    dst = np.minimum(src + rng.integers(1, 1000, DEPENDENCIES), PROCESSES - 1)
+    src[:3], dst[:3] = [0, 1, 2], [1, 2, 0]
+    directory = tempfile.mkdtemp()
+
+    text = os.path.join(directory, "bench.txt")
+    with open(text, "w") as f:
+        for lo in range(0, DEPENDENCIES, 1_000_000):
+            f.write("".join(f"P{u + 1} P{v + 1}\n" for u, v in zip(src[lo:lo + 1_000_000].tolist(), dst[lo:lo + 1_000_000].tolist())))
+    start = time.perf_counter()
+    graph = graph_io.load(text)
+    print(f"edge list: {graph.edges} dependencies parsed in {time.perf_counter() - start:.2f} s ({os.path.getsize(text) >> 20} MB)")
+
+    binary = graph.save(os.path.join(directory, "bench.wfg"))
+    del graph
+    start = time.perf_counter()
+    graph = graph_io.load(binary)
+    opened = time.perf_counter() - start
+    start = time.perf_counter()
+    detection = graph.detect()
+    print(f"binary: opened in {opened * 1000:.1f} ms, detection in {time.perf_counter() - start:.2f} s")
+    print(detection.describe())
@@ -0,0 +1,36 @@
+import os
+import sys
+import timeit
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lock_tracker import LockTracker
+
+N = 1_000_000
+
+
+def per_op_ns(lock):
+    def run():
+        with lock:
+            pass
+    return min(timeit.repeat(run, number=N, repeat=5)) / N * 1e9
+
+
+if __name__ == "__main__":
+    tracker = LockTracker()
+    baseline_lock = per_op_ns(threading.Lock())
+    baseline_rlock = per_op_ns(threading.RLock())
+    tracked_lock = per_op_ns(tracker.Lock())
+    tracked_rlock = per_op_ns(tracker.RLock())
+    tracker.record_sites = True
+    tracked_sites = per_op_ns(tracker.Lock())
+    untraced = LockTracker(trace=False)
+    untraced_lock = per_op_ns(untraced.Lock())
+    untraced_rlock = per_op_ns(untraced.RLock())
+    print(f"threading.Lock            {baseline_lock:8.1f} ns per acquire/release")
+    print(f"TrackedLock               {tracked_lock:8.1f} ns (+{tracked_lock - baseline_lock:.1f} ns)")
+    print(f"threading.RLock           {baseline_rlock:8.1f} ns per acquire/release")
+    print(f"TrackedRLock              {tracked_rlock:8.1f} ns (+{tracked_rlock - baseline_rlock:.1f} ns)")
+    print(f"TrackedLock (call sites)  {tracked_sites:8.1f} ns (+{tracked_sites - baseline_lock:.1f} ns)")
+    print(f"TrackedLock (no trace)    {untraced_lock:8.1f} ns (+{untraced_lock - baseline_lock:.1f} ns)")
+    print(f"TrackedRLock (no trace)   {untraced_rlock:8.1f} ns (+{untraced_rlock - baseline_rlock:.1f} ns)")
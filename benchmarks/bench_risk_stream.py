@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import statistics
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import risk_stream
+
+PROCESSES = 100_000
+UPDATES = 1_000_000
+LIVE = 200_000  # dependencies kept live once reached; past it half the updates are removals
+STREAMS = 300
+STREAM_LIMIT = 600.0  # seconds a generated stream runs without closing a cycle before it is given up
+
+
+def generated_stream(rng, limit=STREAM_LIMIT):
+    """A random live system: 8-40 processes, Poisson arrivals of random dependencies and some of them
+    ending again. Returns (time the first cycle closed or None, alert times before it)."""
+    n = rng.randint(8, 40)
+    rate = rng.uniform(0.2, 3.0)
+    removals = rng.uniform(0.0, 0.5)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(n))
+    scorer = risk_stream.RiskScorer(graph, n)
+    now, alerts, edges = 0.0, [], []
+    while now < limit:
+        now += rng.expovariate(rate)
+        if edges and rng.random() < removals:
+            i = rng.randrange(len(edges))
+            edges[i], edges[-1] = edges[-1], edges[i]
+            u, v = edges.pop()
+            graph.remove_edge(u, v)
+            scorer.edge_removed(u, v, now)
+            continue
+        u, v = rng.sample(range(n), 2)
+        if graph.has_edge(u, v):
+            continue
+        if nx.has_path(graph, v, u):
+            return now, alerts
+        graph.add_edge(u, v)
+        edges.append((u, v))
+        if scorer.edge_added(u, v, now) is not None:
+            alerts.append(now)
+    return None, alerts
+
+
+def alert_quality(streams=STREAMS, seed=1):
+    """How many generated streams were warned within the horizon before their first cycle closed, how
+    many were missed, how many alerts came earlier than that, and the lead time of the warnings."""
+    rng = random.Random(seed)
+    horizon = risk_stream.HORIZON
+    warned = missed = early = 0
+    leads = []
+    for _ in range(streams):
+        closed, alerts = generated_stream(rng)
+        if closed is None:
+            early += len(alerts)
+            continue
+        early += sum(1 for t in alerts if t < closed - horizon)
+        before = [t for t in alerts if t >= closed - horizon]
+        if before:
+            warned += 1
+            leads.append(closed - before[0])
+        else:
+            missed += 1
+    return warned, missed, early, statistics.median(leads) if leads else None
+
+
+if __name__ == "__main__":
+    warned, missed, early, lead = alert_quality()
+    print(f"{STREAMS} generated streams: {warned} warned before the first cycle closed (median lead {lead:.1f} s), "
+          f"{missed} missed, {early} alert(s) earlier than the {risk_stream.HORIZON:g} s horizon")
+
+    rng = random.Random(0)
+    graph = nx.DiGraph()
+    scorer = risk_stream.RiskScorer(graph, PROCESSES)
+    edges = []
+    spent = 0.0
+    alerts = 0
+    for step in range(UPDATES):
+        now = step * 0.001
+        if len(edges) > LIVE and rng.random() < 0.5:
+            i = rng.randrange(len(edges))
+            edges[i], edges[-1] = edges[-1], edges[i]
+            u, v = edges.pop()
+            graph.remove_edge(u, v)
+            start = time.perf_counter()
+            scorer.edge_removed(u, v, now)
+            spent += time.perf_counter() - start
+        else:
+            u, v = rng.randrange(PROCESSES), rng.randrange(PROCESSES)
+            if u == v or graph.has_edge(u, v):
+                continue
+            graph.add_edge(u, v)
+            edges.append((u, v))
+            start = time.perf_counter()
+            alerts += scorer.edge_added(u, v, now) is not None
+            spent += time.perf_counter() - start
+    print(f"{UPDATES} updates scored in {spent:.2f} s ({spent / UPDATES * 1e6:.1f} us each), {alerts} alert(s)")
+    print(scorer.risk(UPDATES * 0.001).describe())
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import time
+import threading
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server import DeadlockServer
+
+CLIENTS = 8
+REQUESTS_PER_CLIENT = 2000
+LARGE_PROCESSES = 200_000
+
+
+def client(port, bodies, latencies):
+    # One keep-alive connection per sidecar, as a real client would use.
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for body in bodies:
+        start = time.perf_counter()
+        conn.request("POST", "/v1/detect", body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def edge_chunks(count, lines_per_chunk=4096):
+    for lo in range(0, count, lines_per_chunk):
+        yield "".join(f"P{i + 1} P{(i + 1) % count + 1}\n" for i in range(lo, min(lo + lines_per_chunk, count))).encode()
+
+
+if __name__ == "__main__":
+    server = DeadlockServer(("127.0.0.1", 0))
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    bodies = [json.dumps({"edges": [[f"P{j}", f"P{j % 5 + 1}"] for j in range(1, 6) if (i + j) % 3]}) for i in range(REQUESTS_PER_CLIENT)]
+    latencies = []
+    threads = [threading.Thread(target=client, args=(port, bodies, latencies)) for _ in range(CLIENTS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    total = CLIENTS * REQUESTS_PER_CLIENT
+    print(f"small checks: {total / elapsed:.0f}/s over {CLIENTS} connections, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, "
+          f"{server.batcher.batched / max(server.batcher.batches, 1):.1f} requests per batch")
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    start = time.perf_counter()
+    conn.request("POST", "/v1/detect", edge_chunks(LARGE_PROCESSES), {"Content-Type": "text/plain", "Transfer-Encoding": "chunked"}, encode_chunked=True)
+    result = json.loads(conn.getresponse().read())
+    print(f"streamed {LARGE_PROCESSES} dependencies: {result['deadlock_type']} in {time.perf_counter() - start:.2f} s")
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sim_recorder import SimulationRecorder, SimulationReplay
+import networkx as nx
+
+STEPS = 1_000_000
+PROCESSES = 1000
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    names = [f"P{i + 1}" for i in range(PROCESSES)]
+    graph = nx.DiGraph()
+    graph.add_nodes_from(names)
+    # Pre-generated toggles, so only the recorder is timed.
+    toggles = [(rng.choice(names), rng.choice(names)) for _ in range(STEPS)]
+    path = os.path.join(tempfile.mkdtemp(), "bench.dlsim")
+    recorder = SimulationRecorder(path, graph, seed=0)
+    edges = set()
+    start = time.perf_counter()
+    for edge in toggles:
+        if edge in edges:
+            edges.discard(edge)
+            recorder.step(removed_edges=(edge,))
+        else:
+            edges.add(edge)
+            recorder.step(added_edges=(edge,))
+    recorder.close()
+    record_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    replay = SimulationReplay(path)
+    open_time = time.perf_counter() - start
+    seeks = [rng.randrange(STEPS) for _ in range(20)]
+    start = time.perf_counter()
+    for step in seeks:
+        replay.graph_at(step)
+    seek_time = (time.perf_counter() - start) / len(seeks)
+    # Dragging the slider: each position is a few steps away from the last, in either direction.
+    scrub = [seeks[-1]]
+    for _ in range(1000):
+        scrub.append(min(STEPS, max(0, scrub[-1] + rng.randint(-20, 20))))
+    start = time.perf_counter()
+    for step in scrub:
+        replay.graph_at(step)
+    scrub_time = (time.perf_counter() - start) / len(scrub)
+    replay.close()
+
+    print(f"recorded {STEPS} steps in {record_time:.2f} s ({record_time / STEPS * 1e6:.2f} us per step)")
+    print(f"file size {os.path.getsize(path) / 1e6:.1f} MB, {len(recorder.keyframes)} keyframes")
+    print(f"open {open_time * 1000:.1f} ms, random seek {seek_time * 1000:.1f} ms, scrub by up to 20 steps "
+          f"{scrub_time * 1e6:.0f} us (graph of {len(edges)} edges at the end)")
+    os.remove(path)
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+# Runs in a fresh interpreter each time; prints seconds since the parent spawned it.
+CHILD = r"""
+import sys, time
+start = float(sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+import main
+app = QApplication(sys.argv[:1])
+window = main.DeadlockDetectionAI()
+window.show()
+shown = time.time() - start
+def poll():
+    if getattr(window, "canvas_tab1", None) is None:
+        QTimer.singleShot(0, poll)
+        return
+    print(f"{shown} {time.time() - start}")
+    app.quit()
+QTimer.singleShot(0, poll)
+app.exec()
+"""
+
+
+def measure():
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    start = time.time()
+    output = subprocess.run([sys.executable, "-c", CHILD, repr(start), ROOT], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    shown, ready = output.strip().splitlines()[-1].split()
+    return float(shown), float(ready)
+
+
+if __name__ == "__main__":
+    results = [measure() for _ in range(RUNS)]
+    shown = [r[0] for r in results]
+    ready = [r[1] for r in results]
+    print(f"window shown:        median {statistics.median(shown):.3f}s  (min {min(shown):.3f}s, max {max(shown):.3f}s)")
+    print(f"first chart drawn:   median {statistics.median(ready):.3f}s  (min {min(ready):.3f}s, max {max(ready):.3f}s)")
@@ -0,0 +1,274 @@
+import numpy as np
+import networkx as nx
+
+NODE_COLORS = ['red', 'green', 'blue', 'yellow', 'gray', 'purple', 'orange', 'pink', 'brown']
+HEATMAP = "Adjacency Heatmap"
+GRAPH_TYPES = ["3D Bar Plot", "3D Scatter Plot", "3D Surface Plot", "3D Circular Layout", HEATMAP]
+HEATMAP_PIXELS = 512  # blocks across a heatmap tile when the axes size is not known yet
+HEATMAP_LABELS = 40   # process names are shown on the axes up to this many rows in view
+HEATMAP_OUTLINES = 200
+CONDENSE_ABOVE = 60     # the simulation network is drawn condensed beyond this many processes
+
+
+def dependency_series(graph, processes):
+    series1 = [sum(1 for u, v in graph.edges if u == p) for p in processes]  # Waiting On
+    series2 = [sum(1 for u, v in graph.edges if v == p) for p in processes]  # Waited By
+    series3 = [1] * len(processes)  # Resources Held
+    return series1, series2, series3
+
+
+def draw_dependency_bars(figure, processes, series1, series2, series3):
+    figure.clear()
+    ax = figure.add_subplot(111)
+    ax.set_facecolor('#F5F5F5')
+    x = np.arange(len(processes))
+    width = 0.2
+    ax.bar(x - width - 0.02, [s * 0.9 for s in series1], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
+    ax.bar(x - 0.02, [s * 0.9 for s in series2], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
+    ax.bar(x + width - 0.02, [s * 0.9 for s in series3], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
+    ax.bar(x - width, series1, width, label="Waiting On", color='#4682B4', edgecolor='black', hatch='//', zorder=2)
+    ax.bar(x, series2, width, label="Waited By", color='#FF6347', edgecolor='black', hatch='//', zorder=2)
+    ax.bar(x + width, series3, width, label="Resources Held", color='#3CB371', edgecolor='black', hatch='//', zorder=2)
+    ax.set_xticks(x)
+    ax.set_xticklabels(processes)
+    ax.set_ylabel("Number of Dependencies")
+    ax.set_title("Process Dependency Analysis")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend()
+    return ax
+
+
+def draw_dependency_3d(figure, graph, processes, graph_type):
+    if graph_type not in GRAPH_TYPES:
+        graph_type = "3D Bar Plot"
+    if graph_type == HEATMAP:
+        return draw_dependency_heatmap(figure, graph, processes)
+    import mpl_toolkits.mplot3d  # noqa: F401 (registers the 3d projection)
+    figure.clear()
+    ax = figure.add_subplot(111, projection='3d')
+    ax.set_facecolor('#F5F5F5')
+    series1, series2, series3 = dependency_series(graph, processes)
+
+    if graph_type == "3D Bar Plot":
+        x = np.arange(len(processes))
+        y = np.zeros(len(processes))
+        z1, z2, z3 = series1, series2, series3
+        dx = dy = 0.5
+        ax.bar3d(x - 0.2, y, np.zeros(len(z1)), dx, dy, z1, color='#4682B4', label='Waiting On', edgecolor='black', shade=True)
+        ax.bar3d(x, y, np.zeros(len(z2)), dx, dy, z2, color='#FF6347', label='Waited By', edgecolor='black', shade=True)
+        ax.bar3d(x + 0.2, y, np.zeros(len(z3)), dx, dy, z3, color='#3CB371', label='Resources Held', edgecolor='black', shade=True)
+        for u, v in graph.edges:
+            u_idx = processes.index(u)
+            v_idx = processes.index(v)
+            ax.plot([u_idx, v_idx], [0, 0], [z1[u_idx], z2[v_idx]], c='black', alpha=0.5)
+        ax.set_xlabel("Processes")
+        ax.set_ylabel("Depth (Fixed)")
+        ax.set_zlabel("Number of Dependencies")
+
+    elif graph_type == "3D Scatter Plot":
+        pos = nx.spring_layout(graph, dim=3)
+        nodes = list(graph.nodes)
+        x, y, z = [], [], []
+        for node in nodes:
+            x_i, y_i, z_i = pos[node]
+            x.append(x_i)
+            y.append(y_i)
+            z.append(z_i)
+        ax.scatter(x, y, z, c=NODE_COLORS[:len(nodes)], s=100)
+        for u, v in graph.edges:
+            x = [pos[u][0], pos[v][0]]
+            y = [pos[u][1], pos[v][1]]
+            z = [pos[u][2], pos[v][2]]
+            ax.plot(x, y, z, c='black', alpha=0.5)
+        ax.set_xlabel("X Coordinate")
+        ax.set_ylabel("Y Coordinate")
+        ax.set_zlabel("Z Coordinate")
+
+    elif graph_type == "3D Surface Plot":
+        x = np.arange(len(processes))
+        y = np.zeros(len(processes))
+        X, Y = np.meshgrid(x, y)
+        Z = np.array([series1])
+        ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='black')
+        for u, v in graph.edges:
+            u_idx = processes.index(u)
+            v_idx = processes.index(v)
+            ax.plot([u_idx, v_idx], [0, 0], [series1[u_idx], series1[v_idx]], c='black', alpha=0.5)
+        ax.set_xlabel("Processes")
+        ax.set_ylabel("Depth (Fixed)")
+        ax.set_zlabel("Dependency Count")
+
+    elif graph_type == "3D Circular Layout":
+        theta = np.linspace(0, 2*np.pi, len(processes), endpoint=False)
+        x = np.cos(theta)
+        y = np.sin(theta)
+        z = np.zeros(len(processes))
+        ax.scatter(x, y, z, c=NODE_COLORS[:len(processes)], s=100)
+        for u, v in graph.edges:
+            u_idx = processes.index(u)
+            v_idx = processes.index(v)
+            ax.plot([x[u_idx], x[v_idx]], [y[u_idx], y[v_idx]], [0, 0], c='black', alpha=0.5)
+        ax.set_xlabel("X Coordinate")
+        ax.set_ylabel("Y Coordinate")
+        ax.set_zlabel("Z Coordinate (Fixed)")
+
+    add_legend(figure)
+    ax.set_title(f"{graph_type} of Tab 1 Dependencies")
+    return ax
+
+
+def draw_dependency_heatmap(figure, graph, processes, pyramid=None, view=None):
+    import heatmap
+    pyramid = pyramid or heatmap.AdjacencyPyramid(graph, processes)
+    view = view or heatmap.HeatmapView(pyramid)
+    figure.clear()
+    ax = figure.add_subplot(111)
+    ax.set_facecolor('#F5F5F5')
+    ax.imshow(np.zeros((1, 1)), cmap='magma_r', vmin=0, interpolation='nearest', aspect='auto')
+    refresh_heatmap(ax, pyramid, view)
+    return ax
+
+
+def refresh_heatmap(ax, pyramid, view):
+    # Zoom and pan come through here: only the visible tile is recomputed and the image data swapped.
+    from matplotlib.patches import Rectangle
+    r0, r1, c0, c1 = view.bounds()
+    pixels = int(max(ax.bbox.width, ax.bbox.height)) or HEATMAP_PIXELS
+    counts, block, (row, col) = pyramid.tile(r0, r1, c0, c1, pixels)
+    image = ax.images[0]
+    shade = np.log1p(counts)
+    image.set_data(shade)
+    image.set_clim(0, max(float(shade.max()), 1.0))
+    image.set_extent((col - 0.5, col + counts.shape[1] * block - 0.5, row + counts.shape[0] * block - 0.5, row - 0.5))
+    ax.set_xlim(view.c0 - 0.5, view.c1 - 0.5)
+    ax.set_ylim(view.r1 - 0.5, view.r0 - 0.5)
+
+    for patch in list(ax.patches):
+        patch.remove()
+    visible = [(start, size) for start, size in pyramid.groups if start < r1 and start + size > r0 and start < c1 and start + size > c0]
+    for start, size in sorted(visible, key=lambda g: -g[1])[:HEATMAP_OUTLINES]:
+        ax.add_patch(Rectangle((start - 0.5, start - 0.5), size, size, fill=False, edgecolor='#FF6347', linewidth=1.5))
+
+    if r1 - r0 <= HEATMAP_LABELS and c1 - c0 <= HEATMAP_LABELS:
+        ax.set_xticks(range(c0, c1))
+        ax.set_xticklabels(pyramid.order[c0:c1], rotation=90)
+        ax.set_yticks(range(r0, r1))
+        ax.set_yticklabels(pyramid.order[r0:r1])
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    detail = "one process per cell" if block == 1 else f"{block}x{block} processes per cell"
+    ax.set_xlabel(f"Waited On, rows {r0 + 1}-{r1} ({detail})")
+    ax.set_ylabel("Waiting")
+    ax.set_title(f"{HEATMAP} ({pyramid.n} processes, {len(pyramid.groups)} deadlocked group(s))")
+
+
+def add_legend(figure):
+    from matplotlib.lines import Line2D
+    legend_ax = figure.add_axes([0.85, 0.05, 0.15, 0.9])
+    legend_ax.axis('off')
+    handles = [
+        Line2D([0], [0], color='#4682B4', lw=10, label='Waiting On'),
+        Line2D([0], [0], color='#FF6347', lw=10, label='Waited By'),
+        Line2D([0], [0], color='#3CB371', lw=10, label='Resources Held'),
+        Line2D([0, 1], [0, 0], color='black', lw=2, label='Dependency Direction')
+    ]
+    legend_ax.legend(handles=handles, loc='center', frameon=True)
+
+
+def draw_dependency_network(figure, graph, processes):
+    import mpl_toolkits.mplot3d  # noqa: F401 (registers the 3d projection)
+    figure.clear()
+    ax = figure.add_subplot(111, projection='3d')
+    ax.set_facecolor('#F5F5F5')
+
+    if graph.edges:
+        pos = nx.circular_layout(graph)
+    else:
+        theta = np.linspace(0, 2 * np.pi, len(processes), endpoint=False)
+        pos = {p: [np.cos(t), np.sin(t)] for p, t in zip(processes, theta)}
+
+    z = [sum(1 for u, v in graph.edges if u == p or v == p) for p in processes]
+    max_z = max(z) if z and max(z) > 0 else 1
+    node_sizes = [1000 * (z_i / max_z) + 500 for z_i in z]
+
+    ax.scatter([pos[p][0] for p in processes], [pos[p][1] for p in processes], z,
+               c=NODE_COLORS[:len(processes)], s=node_sizes, alpha=0.7)
+    for u, v in graph.edges:
+        u_idx = processes.index(u)
+        v_idx = processes.index(v)
+        ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]], [z[u_idx], z[v_idx]],
+                c='black', linewidth=2, alpha=0.8)
+
+    ax.set_xlabel("X Coordinate")
+    ax.set_ylabel("Y Coordinate")
+    ax.set_zlabel("Dependency Weight")
+    ax.set_title("Dynamic Dependency Network")
+    return ax
+
+
+def draw_condensed_network(figure, summary):
+    """Each deadlocked group as one circle sized by its member count, the processes blocked behind it
+    folded into a single 'waiting' box. Returns (x, y, radius, group) per circle for picking."""
+    from matplotlib.patches import Circle
+    figure.clear()
+    ax = figure.add_subplot(111)
+    ax.set_facecolor('#F5F5F5')
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_xlim(-1.9, 1.9)
+    ax.set_ylim(-1.9, 1.9)
+
+    groups = summary.groups
+    count = len(groups)
+    theta = np.linspace(0, 2 * np.pi, count, endpoint=False) + np.pi / 2
+    ring = 1.0 if count > 1 else 0.0
+    centers = np.column_stack([ring * np.cos(theta), ring * np.sin(theta)])
+    outward = np.column_stack([np.cos(theta), np.sin(theta)]) if count > 1 else np.array([[0.0, -1.0]])
+    largest = max((len(g.members) for g in groups), default=1)
+    widest = min(0.45, 0.8 * np.pi / count) if count > 1 else 0.6
+    radii = [widest * max(np.sqrt(len(g.members) / largest), 0.3) for g in groups]
+
+    def arrow(start, end, r_start, r_end, **style):
+        step = end - start
+        unit = step / (np.hypot(*step) or 1.0)
+        ax.annotate("", xy=end - unit * r_end, xytext=start + unit * r_start, arrowprops=dict(arrowstyle='->', **style))
+
+    for a, b, direct in summary.edges:
+        arrow(centers[a], centers[b], radii[a], radii[b], color='black' if direct else 'gray', linestyle='-' if direct else '--')
+
+    picks = []
+    for (x, y), r, out, group in zip(centers, radii, outward, groups):
+        ax.add_patch(Circle((x, y), r, facecolor='#FF6347', edgecolor='#8B0000', alpha=0.25 if group.expanded else 0.6))
+        size = len(group.members)
+        if group.expanded:
+            shown = group.shown
+            angles = np.linspace(0, 2 * np.pi, len(shown), endpoint=False)
+            pos = {p: (x + 0.75 * r * np.cos(t), y + 0.75 * r * np.sin(t)) for p, t in zip(shown, angles)}
+            for u, v in group.edges:
+                ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]], c='black', linewidth=0.6, alpha=0.6)
+            ax.scatter([pos[p][0] for p in shown], [pos[p][1] for p in shown], s=12, c='#8B0000', zorder=3)
+            if len(shown) <= 16:
+                for p in shown:
+                    ax.text(*pos[p], p, fontsize=7, ha='center', va='bottom')
+            if size > len(shown):
+                ax.text(x, y - r - 0.05, f"+{size - len(shown)} more", fontsize=7, ha='center', va='top')
+        else:
+            label = ", ".join(group.members) if size <= 3 else f"{group.members[0]} +{size - 1}"
+            ax.text(x, y, label, fontsize=8, ha='center', va='center', fontweight='bold')
+        if group.waiting:
+            box = np.array([x, y]) + out * (r + 0.45)
+            text = f"{group.waiting} waiting" + (f"\nchains up to {group.chain}" if group.chain > 1 else "")
+            ax.text(*box, text, fontsize=7, ha='center', va='center',
+                    bbox=dict(boxstyle='square', facecolor='#D3D3D3', edgecolor='gray'))
+            arrow(box, np.array([x, y]), 0.12, r, color='#4682B4')
+        picks.append((x, y, r, group))
+
+    if not groups:
+        ax.text(0, 0, "No deadlocked groups", ha='center', va='center', fontsize=12)
+    footer = f"{summary.free} not blocked"
+    if summary.hidden:
+        footer += f"; {summary.hidden} smaller deadlocked group(s) not shown"
+    ax.text(0.5, 0.01, footer + ". Click a group to expand it.", transform=ax.transAxes, ha='center', fontsize=8)
+    ax.set_title(f"Condensed Network: {summary.deadlocked} deadlocked, {summary.blocked} waiting")
+    return picks
@@ -0,0 +1,190 @@
+from collections import Counter, deque
+
+import recovery
+from deadlock_core import process_sort_key
+
+MAX_GROUPS = 40       # deadlocked groups drawn individually; smaller ones are summarised
+EXPAND_LIMIT = 60     # members drawn for an expanded group
+
+
+class Condensation:
+    """Strongly connected components of a live graph, kept up to date from the same deltas as
+    GraphHistory versions instead of being recomputed from scratch.
+
+    Removing a dependency or process only re-splits the component it was in; adding one merges the
+    components on the cycle it closes. `links` counts the dependencies between components.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.rebuild()
+
+    def rebuild(self):
+        self.comp_of, self.members, self.cyclic = {}, {}, {}
+        self.links, self.back = {}, {}
+        self.next_id = 0
+        for component in recovery.strongly_connected(recovery.successor_sets(self.graph)):
+            self._new_component(component)
+        for c in list(self.members):
+            self._link_out(c)
+
+    def _new_component(self, nodes):
+        c = self.next_id
+        self.next_id += 1
+        self.members[c] = set(nodes)
+        for n in nodes:
+            self.comp_of[n] = c
+        node = next(iter(nodes))
+        self.cyclic[c] = len(nodes) > 1 or self.graph.has_edge(node, node)
+        self.links[c], self.back[c] = Counter(), Counter()
+        return c
+
+    def _link_out(self, c):
+        comp_of, links, back = self.comp_of, self.links, self.back
+        for u in self.members[c]:
+            for v in self.graph.adj[u]:
+                d = comp_of[v]
+                if d != c:
+                    links[c][d] += 1
+                    back[d][c] += 1
+
+    def _drop(self, c):
+        for d in self.links.pop(c):
+            del self.back[d][c]
+        for d in self.back.pop(c):
+            del self.links[d][c]
+        del self.members[c], self.cyclic[c]
+
+    def _replace(self, old, nodes):
+        # Recompute the components of `nodes` (the union of `old`) and their links from the graph.
+        for c in old:
+            self._drop(c)
+        succ = {n: {v for v in self.graph.adj[n] if v in nodes} for n in nodes}
+        new = [self._new_component(component) for component in recovery.strongly_connected(succ)]
+        fresh = set(new)
+        for c in new:
+            self._link_out(c)
+            for v in self.members[c]:
+                for u in self.graph.pred[v]:
+                    d = self.comp_of[u]
+                    if d not in fresh:
+                        self.links[d][c] += 1
+                        self.back[c][d] += 1
+
+    def apply(self, added_nodes=(), removed_nodes=(), added_edges=(), removed_edges=()):
+        """Bring the condensation in line with a net change already made to the graph (see GraphHistory.changes)."""
+        comp_of, links, back = self.comp_of, self.links, self.back
+        split = set()
+        for u, v in removed_edges:
+            a, b = comp_of[u], comp_of[v]
+            if a != b:
+                links[a][b] -= 1
+                back[b][a] -= 1
+                if not links[a][b]:
+                    del links[a][b], back[b][a]
+            else:
+                split.add(a)
+        for n in removed_nodes:
+            c = comp_of.pop(n)
+            self.members[c].discard(n)
+            split.add(c)
+        for n in added_nodes:
+            if n not in comp_of:
+                self._new_component([n])
+        for u, v in added_edges:
+            a, b = comp_of[u], comp_of[v]
+            if a != b:
+                links[a][b] += 1
+                back[b][a] += 1
+            elif u == v:
+                self.cyclic[a] = True
+        # Only the components that lost an internal dependency or member can fall apart.
+        for c in split:
+            if c in self.members:
+                if self.members[c]:
+                    self._replace([c], self.members[c])
+                else:
+                    self._drop(c)
+        for u, v in added_edges:
+            a, b = comp_of[u], comp_of[v]
+            if a == b:
+                continue
+            # The new dependency closes a cycle if b already reaches a: merge everything on those paths.
+            ahead = self._reach(b, links)
+            if a in ahead:
+                merged = ahead & self._reach(a, back)
+                self._replace(merged, set().union(*(self.members[c] for c in merged)))
+
+    @staticmethod
+    def _reach(start, edges):
+        seen, queue = {start}, deque([start])
+        while queue:
+            for d in edges[queue.popleft()]:
+                if d not in seen:
+                    seen.add(d)
+                    queue.append(d)
+        return seen
+
+    def summary(self, expanded=()):
+        """What the condensed view draws. Only deadlocked groups and the processes blocked behind them
+        are visited; processes that are not blocked are counted, never walked."""
+        deadlocked = sorted((c for c in self.members if self.cyclic[c]),
+                            key=lambda c: (-len(self.members[c]), process_sort_key(min(self.members[c], key=process_sort_key))))
+        # Multi-source reverse BFS: every blocked component is folded into the first group it leads to.
+        owner, depth = {c: c for c in deadlocked}, {c: 0 for c in deadlocked}
+        queue = deque(deadlocked)
+        while queue:
+            c = queue.popleft()
+            for d in self.back[c]:
+                if d not in owner:
+                    owner[d], depth[d] = owner[c], depth[c] + 1
+                    queue.append(d)
+        waiting = Counter()
+        chain = Counter()
+        for c, o in owner.items():
+            if c != o:
+                waiting[o] += len(self.members[c])
+                chain[o] = max(chain[o], depth[c])
+        drawn_groups = deadlocked[:MAX_GROUPS]
+        index = {c: i for i, c in enumerate(drawn_groups)}
+        groups, edges = [], Counter()
+        expanded = set(expanded)
+        for c in drawn_groups:
+            members = sorted(self.members[c], key=process_sort_key)
+            shown = members[:EXPAND_LIMIT] if not expanded.isdisjoint(members) else []
+            drawn = set(shown)
+            inner = [(u, v) for u in shown for v in self.graph.adj[u] if v in drawn]
+            groups.append(Group(members, waiting[c], chain[c], shown, inner))
+            for d in self.links[c]:
+                target = owner.get(d)
+                if target in index and target != c:
+                    edges[index[c], index[target], d == target] += 1
+        blocked = sum(waiting.values())
+        in_groups = sum(len(self.members[c]) for c in deadlocked)
+        return Summary(groups, sorted(edges), len(deadlocked) - len(drawn_groups), in_groups, blocked,
+                       len(self.comp_of) - in_groups - blocked)
+
+
+class Group:
+    __slots__ = ("members", "waiting", "chain", "shown", "edges")
+
+    def __init__(self, members, waiting, chain, shown, edges):
+        self.members = members      # sorted process names
+        self.waiting = waiting      # blocked processes folded into this group
+        self.chain = chain          # longest wait chain (in components) leading into it
+        self.shown = shown          # members drawn individually; empty while collapsed
+        self.edges = edges          # dependencies among the shown members
+
+    @property
+    def expanded(self):
+        return bool(self.shown)
+
+
+class Summary:
+    def __init__(self, groups, edges, hidden, deadlocked, blocked, free):
+        self.groups = groups
+        self.edges = edges          # (from group, to group, direct) between drawn groups
+        self.hidden = hidden        # deadlocked groups beyond MAX_GROUPS
+        self.deadlocked = deadlocked
+        self.blocked = blocked
+        self.free = free
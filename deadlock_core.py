@@ -0,0 +1,125 @@
+import networkx as nx
+
+
+def identify_deadlock_type(graph):
+    if not graph or not graph.edges:
+        return "No Deadlock"
+
+    edges = list(graph.edges)
+    edges_set = set(edges)
+
+    # Check for Mutual Exclusion (self-loops)
+    has_self_loop = any(u == v for u, v in edges)
+    if has_self_loop:
+        return "Mutual Exclusion Deadlock (Self-loop detected)"
+
+    # Check for Circular Wait (cycles in the graph)
+    if find_deadlock_cycle(graph):
+        return "Circular Wait Deadlock"
+
+    # Check for No Preemption (bidirectional dependencies)
+    has_bidirectional = any((v, u) in edges_set for u, v in edges if u != v)
+    if has_bidirectional:
+        return "No Preemption Deadlock"
+
+    return "No Deadlock"
+
+
+def find_deadlock_cycle(graph, source=None, within=None):
+    # Same result shape as nx.find_cycle(orientation="original"), but one iterative DFS, linear in the graph.
+    adj = graph.adj
+    state = {}  # 1 while on the DFS path, 2 once finished
+    for root in ([source] if source is not None else graph):
+        if root in state:
+            continue
+        state[root] = 1
+        path, stack = [root], [iter(adj[root])]
+        while stack:
+            for child in stack[-1]:
+                if within is not None and child not in within:
+                    continue
+                seen = state.get(child)
+                if seen == 1:
+                    nodes = path[path.index(child):]
+                    return [(u, v, "forward") for u, v in zip(nodes, nodes[1:] + [child])]
+                if seen is None:
+                    state[child] = 1
+                    path.append(child)
+                    stack.append(iter(adj[child]))
+                    break
+            else:
+                stack.pop()
+                state[path.pop()] = 2
+    return []
+
+
+def deadlock_cycles(graph):
+    # One representative cycle per deadlocked strongly connected component.
+    cycles = []
+    for component in nx.strongly_connected_components(graph):
+        node = next(iter(component))
+        if len(component) > 1 or graph.has_edge(node, node):
+            cycles.append(find_deadlock_cycle(graph, source=node, within=component))
+    return cycles
+
+
+def bankers_safety(available, max_demand, allocation):
+    """Banker's safety check: (True, safe order of process indices) or (False, indices that finished)."""
+    work = list(available)
+    need = [[max(0, m - a) for m, a in zip(max_d, alloc)] for max_d, alloc in zip(max_demand, allocation)]
+    finish = [False] * len(need)
+    sequence = []
+    while False in finish:
+        found = False
+        for p in range(len(need)):
+            if not finish[p] and all(n <= w for n, w in zip(need[p], work)):
+                for j in range(len(work)):
+                    work[j] += allocation[p][j]
+                sequence.append(p)
+                finish[p] = True
+                found = True
+        if not found:
+            return False, sequence
+    return True, sequence
+
+
+def bankers_request(available, max_demand, allocation, process, request):
+    """Resource-request check: (granted, reason, safe order after granting)."""
+    need = [max(0, m - a) for m, a in zip(max_demand[process], allocation[process])]
+    if any(r > n for r, n in zip(request, need)):
+        return False, "request exceeds the process's remaining maximum demand", []
+    if any(r > a for r, a in zip(request, available)):
+        return False, "not enough resources available; the process must wait", []
+    available = [a - r for a, r in zip(available, request)]
+    allocation = [list(row) for row in allocation]
+    allocation[process] = [a + r for a, r in zip(allocation[process], request)]
+    safe, sequence = bankers_safety(available, max_demand, allocation)
+    if not safe:
+        return False, "granting would leave the system in an unsafe state", []
+    return True, "granted", sequence
+
+
+def process_sort_key(name):
+    name = str(name)
+    return (0, int(name[1:]), name) if name[:1] == "P" and name[1:].isdigit() else (1, 0, name)
+
+
+def graph_from_history(record):
+    graph = nx.DiGraph()
+    if "matrix" in record:
+        matrix = record["matrix"]
+        processes = [f"P{i+1}" for i in range(len(matrix))]
+        graph.add_nodes_from(processes)
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                if str(value) == "1":
+                    graph.add_edge(processes[i], processes[j])
+    else:
+        for key in record.get("state", {}):
+            u, _, v = key.partition("->")
+            graph.add_edge(u, v)
+        processes = sorted(graph.nodes, key=process_sort_key)
+        if processes and all(process_sort_key(p)[0] == 0 for p in processes):
+            # Fill the gaps so P-numbered states line up with the table layout
+            processes = [f"P{i+1}" for i in range(process_sort_key(processes[-1])[1])]
+    return graph, processes
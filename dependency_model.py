@@ -0,0 +1,138 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtWidgets import QTableWidgetItem
+
+from graph_history import GraphHistory
+
+
+class DependencyModel(QObject):
+    """The single copy of a workspace's dependencies: its graph, the versions that edit it and the process list.
+
+    Every change, from a cell edit, a recovery action, a scenario or an undo, goes through the versions and
+    is re-emitted dependency by dependency, so views touch only what changed instead of re-reading a table.
+    """
+
+    edge_added = pyqtSignal(str, str)
+    edge_removed = pyqtSignal(str, str)
+    nodes_changed = pyqtSignal(list, list)  # added, removed graph nodes, before the edge signals
+    processes_changed = pyqtSignal(int)
+    changed = pyqtSignal()  # once per applied version, after its edge signals
+
+    def __init__(self, count, parent=None):
+        super().__init__(parent)
+        self.versions = GraphHistory()
+        self.graph = self.versions.graph
+        self.versions.listeners.append(self._forward)
+        self.count = 0
+        self.processes = []
+        self.index = {}  # process -> row/column
+        self.set_process_count(count)
+
+    def set_process_count(self, count):
+        if count == self.count:
+            return
+        dropped = self.processes[count:]
+        self.count = count
+        self.processes = [f"P{i+1}" for i in range(count)]
+        self.index = {p: i for i, p in enumerate(self.processes)}
+        if dropped:
+            # The dropped processes have no rows to come back to, so the resize cannot be undone.
+            self.versions.record(f"Resize to {count} processes", removed_nodes=dropped, barrier=True)
+        self.processes_changed.emit(count)
+
+    def set_edge(self, u, v, present):
+        if present == self.graph.has_edge(u, v):
+            return None
+        return self.versions.add_edges([(u, v)], f"Add {u} -> {v}") if present else self.versions.remove_edge(u, v)
+
+    def matrix(self):
+        # Row-major "0"/"1" cells, the shape history records are stored in.
+        return [["1" if self.graph.has_edge(p, q) else "0" for q in self.processes] for p in self.processes]
+
+    def _forward(self, added_nodes, removed_nodes, added_edges, removed_edges):
+        if added_nodes or removed_nodes:
+            self.nodes_changed.emit(list(added_nodes), list(removed_nodes))
+        for u, v in removed_edges:
+            self.edge_removed.emit(u, v)
+        for u, v in added_edges:
+            self.edge_added.emit(u, v)
+        self.changed.emit()
+
+
+class TableBinding(QObject):
+    """Keeps a QTableWidget and a DependencyModel in step, one cell per change in either direction.
+
+    `source` returns the graph the table shows; while it is not the model's own graph (a replayed step),
+    model changes are left for the next reload and cell edits are ignored.
+    """
+
+    def __init__(self, model, table, source=None):
+        super().__init__(table)
+        self.model = None
+        self.table = table
+        self.source = source or (lambda: self.model.graph)
+        self.writing = False
+        table.itemChanged.connect(self._cell_edited)
+        self.bind(model)
+
+    def bind(self, model):
+        # Switches the table to another model (a workspace switch) with one reload.
+        if self.model is not None:
+            self.model.edge_added.disconnect(self._edge_added)
+            self.model.edge_removed.disconnect(self._edge_removed)
+            self.model.processes_changed.disconnect(self._processes_changed)
+        self.model = model
+        model.edge_added.connect(self._edge_added)
+        model.edge_removed.connect(self._edge_removed)
+        model.processes_changed.connect(self._processes_changed)
+        self.reload()
+
+    def reload(self):
+        # The only full rewrite: a new process count, or switching between the live graph and a replay.
+        model, table, graph = self.model, self.table, self.source()
+        self.writing = True
+        try:
+            if table.rowCount() != model.count or table.columnCount() != model.count:
+                table.setRowCount(model.count)
+                table.setColumnCount(model.count)
+                table.setHorizontalHeaderLabels(model.processes)
+                table.setVerticalHeaderLabels(model.processes)
+            for i, p in enumerate(model.processes):
+                for j, q in enumerate(model.processes):
+                    table.setItem(i, j, QTableWidgetItem("1" if graph.has_edge(p, q) else "0"))
+        finally:
+            self.writing = False
+
+    def _edge_added(self, u, v):
+        self._model_changed(u, v, True)
+
+    def _edge_removed(self, u, v):
+        self._model_changed(u, v, False)
+
+    def _processes_changed(self, count):
+        self.reload()
+
+    def _model_changed(self, u, v, present):
+        i, j = self.model.index.get(u), self.model.index.get(v)
+        if i is not None and j is not None and self.source() is self.model.graph:
+            self._write(i, j, present)
+
+    def _write(self, i, j, present):
+        text = "1" if present else "0"
+        self.writing = True
+        try:
+            item = self.table.item(i, j)
+            if item is None:
+                self.table.setItem(i, j, QTableWidgetItem(text))
+            elif item.text() != text:
+                item.setText(text)  # keeps any highlight painted on the cell
+        finally:
+            self.writing = False
+
+    def _cell_edited(self, item):
+        model = self.model
+        if self.writing or self.source() is not model.graph or item.row() >= model.count or item.column() >= model.count:
+            return
+        present = item.text().strip() == "1"
+        model.set_edge(model.processes[item.row()], model.processes[item.column()], present)
+        if item.text() not in ("0", "1"):
+            self._write(item.row(), item.column(), present)  # anything but "1" means no dependency
@@ -0,0 +1,147 @@
+import os
+import enum
+import logging
+import logging.handlers
+from collections import deque
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QStandardPaths, QTimer
+from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+
+LOG_FILE = "deadlock_app.log"
+LOG_FILE_BYTES = 2 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+DEFAULT_CAPACITY = 5000
+FRAME_INTERVAL_MS = 16
+
+
+class Severity(enum.Enum):
+    INFO = "info"
+    HEADER = "header"
+    DETAIL = "detail"
+    ALERT = "alert"
+    SUCCESS = "success"
+
+
+# Severity -> (text color, file log level)
+SEVERITY_STYLES = {
+    Severity.INFO: ("#0A1A44", logging.INFO),
+    Severity.HEADER: ("#0A1A44", logging.INFO),
+    Severity.DETAIL: ("#0A1A44", logging.DEBUG),
+    Severity.ALERT: ("#FF4500", logging.WARNING),
+    Severity.SUCCESS: ("#006400", logging.INFO),
+}
+
+
+_file_handler = None
+
+
+def log_path():
+    # The per-user data directory (e.g. ~/.local/share/<app>), not whatever directory the app was started from.
+    directory = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation) or os.path.expanduser("~")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, LOG_FILE)
+
+
+def file_logger(name):
+    # One rotating file shared by every log view in the process.
+    global _file_handler
+    root = logging.getLogger("deadlock")
+    if _file_handler is None:
+        _file_handler = logging.handlers.RotatingFileHandler(log_path(), maxBytes=LOG_FILE_BYTES, backupCount=LOG_FILE_BACKUPS, delay=True)
+        _file_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        root.addHandler(_file_handler)
+        root.setLevel(logging.DEBUG)
+        root.propagate = False
+    return root.getChild(name)
+
+
+class LogModel(QAbstractListModel):
+    def __init__(self, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.entries = deque()
+        self.colors = {severity: QColor(color) for severity, (color, _) in SEVERITY_STYLES.items()}
+        self.bold_font = QFont("Helvetica")
+        self.bold_font.setPixelSize(16)
+        self.bold_font.setBold(True)
+        self.header_font = QFont(self.bold_font)
+        self.header_font.setUnderline(True)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        text, severity = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return text
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.colors[severity]
+        if role == Qt.ItemDataRole.FontRole:
+            return self.header_font if severity is Severity.HEADER else self.bold_font
+        return None
+
+    def extend(self, batch):
+        batch = batch[-self.capacity:]
+        overflow = len(self.entries) + len(batch) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.entries.popleft()
+            self.endRemoveRows()
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self.entries.extend(batch)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries.clear()
+        self.endResetModel()
+
+
+class EventLog:
+    def __init__(self, name, capacity=DEFAULT_CAPACITY):
+        self.model = LogModel(capacity)
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.logger = file_logger(name)
+        self.pending = []
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def log(self, text, severity=Severity.INFO):
+        for line in str(text).splitlines() or [""]:
+            self.pending.append((line, severity))
+        if len(self.pending) >= self.model.capacity:
+            self.flush()
+        elif not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        scrollbar = self.view.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 1
+        self.model.extend(batch)
+        for text, severity in batch:
+            self.logger.log(SEVERITY_STYLES[severity][1], text)
+        if follow:
+            self.view.scrollToBottom()
+
+    def clear(self):
+        self.pending = []
+        self.model.clear()
+
+    def text(self):
+        self.flush()
+        return "\n".join(text for text, _ in self.model.entries)
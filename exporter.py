@@ -0,0 +1,145 @@
+import os
+import itertools
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import charts
+import deadlock_core
+import graph_io
+
+FIGURE_FORMATS = ["png", "svg", "pdf"]
+MATRIX_FORMATS = ["csv", "edgelist", "npz", "wfg"]
+CHART_KINDS = {
+    "dependency": ("Process Dependency Analysis", (4, 3)),
+    "visualization": ("Dependency Visualization", (5, 4)),
+    "network": ("Dynamic Dependency Network", (6, 5)),
+}
+CSV_BLOCK_ROWS = 512
+
+
+def unique_path(directory, stem, ext):
+    """`<stem>_<timestamp>.<ext>` in `directory`, with _2, _3, ... when that name is taken. The file is
+    created empty to claim the name, since exports queued in the same second are written later."""
+    base = os.path.join(directory, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    for n in itertools.count(1):
+        path = f"{base}.{ext}" if n == 1 else f"{base}_{n}.{ext}"
+        try:
+            open(path, "x").close()
+        except FileExistsError:
+            continue
+        return path
+
+
+def render_chart(kind, graph, processes, path, fmt="png", graph_type="3D Bar Plot"):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    # A private Agg figure per job, so nothing here touches the live Qt canvases.
+    figure = Figure(figsize=CHART_KINDS[kind][1])
+    FigureCanvasAgg(figure)
+    if kind == "dependency":
+        charts.draw_dependency_bars(figure, processes, *charts.dependency_series(graph, processes))
+    elif kind == "visualization":
+        charts.draw_dependency_3d(figure, graph, processes, graph_type)
+    else:
+        graph = graph.copy()
+        graph.add_nodes_from(processes)
+        charts.draw_dependency_network(figure, graph, processes)
+    figure.savefig(path, format=fmt)
+    return path
+
+
+def edge_index_arrays(graph, processes):
+    index = {p: i for i, p in enumerate(processes)}
+    pairs = [(index[u], index[v]) for u, v in graph.edges if u in index and v in index]
+    edges = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    return edges[order, 0], edges[order, 1]
+
+
+def write_matrix_csv(path, processes, src, dst):
+    n = len(processes)
+    with open(path, "wb") as f:
+        f.write(("," + ",".join(processes) + "\r\n").encode())
+        if n == 0:
+            return
+        # Each row is rendered as one byte buffer: digits at even offsets, commas between, CRLF at the end.
+        for start in range(0, n, CSV_BLOCK_ROWS):
+            stop = min(start + CSV_BLOCK_ROWS, n)
+            block = np.full((stop - start, 2 * n + 1), ord(","), dtype=np.uint8)
+            block[:, 0:2 * n - 1:2] = ord("0")
+            block[:, -2] = ord("\r")
+            block[:, -1] = ord("\n")
+            lo, hi = np.searchsorted(src, [start, stop])
+            block[src[lo:hi] - start, 2 * dst[lo:hi]] = ord("1")
+            for offset, row in enumerate(block):
+                f.write(f"{processes[start + offset]},".encode())
+                f.write(row.tobytes())
+
+
+def write_matrix(graph, processes, path, fmt="csv"):
+    src, dst = edge_index_arrays(graph, processes)
+    if fmt == "csv":
+        write_matrix_csv(path, processes, src, dst)
+    elif fmt == "edgelist":
+        names = np.array(processes, dtype=object)
+        with open(path, "w") as f:
+            f.write("# source target\n")
+            f.write("".join(f"{u} {v}\n" for u, v in zip(names[src], names[dst])))
+    elif fmt == "npz":
+        np.savez_compressed(path, processes=np.array(processes), src=src.astype(np.int32), dst=dst.astype(np.int32))
+    elif fmt == "wfg":
+        graph_io.WaitForGraph.from_edges(src, dst, len(processes), list(processes)).save(path)
+    else:
+        raise ValueError(f"Unsupported matrix format '{fmt}'")
+    return path
+
+
+class Exporter:
+    def __init__(self, output_dir=".", on_done=None, on_error=None, workers=1):
+        self.output_dir = output_dir
+        self.on_done = on_done
+        self.on_error = on_error
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exporter")
+
+    def _path(self, stem, ext):
+        return unique_path(self.output_dir, stem, ext)
+
+    def _submit(self, fn, *args, **kwargs):
+        future = self.pool.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        error = future.exception()
+        if error is not None:
+            if self.on_error:
+                self.on_error(error)
+        elif self.on_done:
+            self.on_done(future.result())
+
+    def export_charts(self, graph, processes, kinds=None, fmt="png", graph_type="3D Bar Plot", stem="deadlock_graph"):
+        graph = graph.copy()
+        processes = list(processes)
+        futures = []
+        for kind in kinds or list(CHART_KINDS):
+            path = self._path(f"{stem}_{kind}", fmt)
+            futures.append(self._submit(render_chart, kind, graph, processes, path, fmt, graph_type))
+        return futures
+
+    def export_history(self, history, kinds=None, fmt="png", graph_type="3D Bar Plot"):
+        futures = []
+        for i, record in enumerate(history, 1):
+            graph, processes = deadlock_core.graph_from_history(record)
+            if processes:
+                futures.extend(self.export_charts(graph, processes, kinds, fmt, graph_type, stem=f"history_{i:05d}"))
+        return futures
+
+    def export_matrix(self, graph, processes, fmt="csv"):
+        ext = "txt" if fmt == "edgelist" else fmt
+        path = self._path("dependency_values", ext)
+        return self._submit(write_matrix, graph.copy(), list(processes), path, fmt)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
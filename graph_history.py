@@ -0,0 +1,211 @@
+import networkx as nx
+
+
+class Version:
+    # A version only stores what changed relative to its parent, so unchanged nodes and edges are shared.
+    __slots__ = ("id", "parent", "depth", "label", "added_nodes", "removed_nodes", "added_edges", "removed_edges", "children", "last_child",
+                 "barrier")
+
+    def __init__(self, id, parent, label, added_nodes=(), removed_nodes=(), added_edges=(), removed_edges=(), barrier=False):
+        self.id = id
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.label = label
+        self.added_nodes = tuple(added_nodes)
+        self.removed_nodes = tuple(removed_nodes)
+        self.added_edges = tuple(added_edges)
+        self.removed_edges = tuple(removed_edges)
+        self.children = []
+        self.last_child = None
+        self.barrier = barrier  # cannot be undone, so the versions before it are out of reach
+
+    def size(self):
+        return len(self.added_nodes) + len(self.removed_nodes) + len(self.added_edges) + len(self.removed_edges)
+
+    def __repr__(self):
+        return f"Version({self.id}, {self.label!r}, +{len(self.added_edges)}/-{len(self.removed_edges)} edges)"
+
+
+class GraphHistory:
+    def __init__(self, graph=None):
+        self.graph = graph if graph is not None else nx.DiGraph()
+        self.listeners = []  # called with each (added nodes, removed nodes, added edges, removed edges) applied to the graph
+        self.versions = []
+        self.root = self._new_version(None, "Initial", self.graph.nodes, (), self.graph.edges, ())
+        self.head = self.root
+
+    def _new_version(self, parent, label, added_nodes, removed_nodes, added_edges, removed_edges, barrier=False):
+        version = Version(len(self.versions), parent, label, added_nodes, removed_nodes, added_edges, removed_edges, barrier)
+        self.versions.append(version)
+        if parent is not None:
+            parent.children.append(version)
+            parent.last_child = version
+        return version
+
+    def _apply(self, version):
+        self.graph.remove_edges_from(version.removed_edges)
+        self.graph.remove_nodes_from(version.removed_nodes)
+        self.graph.add_nodes_from(version.added_nodes)
+        self.graph.add_edges_from(version.added_edges)
+        self._notify(version.added_nodes, version.removed_nodes, version.added_edges, version.removed_edges)
+
+    def _revert(self, version):
+        self.graph.remove_edges_from(version.added_edges)
+        self.graph.remove_nodes_from(version.added_nodes)
+        self.graph.add_nodes_from(version.removed_nodes)
+        self.graph.add_edges_from(version.removed_edges)
+        self._notify(version.removed_nodes, version.added_nodes, version.removed_edges, version.added_edges)
+
+    def _notify(self, added_nodes, removed_nodes, added_edges, removed_edges):
+        for listener in self.listeners:
+            listener(added_nodes, removed_nodes, added_edges, removed_edges)
+
+    def record(self, label, added_nodes=(), removed_nodes=(), added_edges=(), removed_edges=(), barrier=False):
+        # Only real changes are kept, so the inverse of a version is always exact.
+        graph = self.graph
+        removed_nodes = [n for n in dict.fromkeys(removed_nodes) if n in graph]
+        removed = dict.fromkeys(e for e in removed_edges if graph.has_edge(*e))
+        for n in removed_nodes:
+            removed.update(dict.fromkeys(graph.in_edges(n)))
+            removed.update(dict.fromkeys(graph.out_edges(n)))
+        removed_edges = list(removed)
+        added_edges = [e for e in dict.fromkeys(added_edges) if not graph.has_edge(*e)]
+        added_nodes = list(dict.fromkeys(n for n in [*added_nodes, *(n for e in added_edges for n in e)] if n not in graph))
+        if not (added_nodes or removed_nodes or added_edges or removed_edges):
+            return self.head
+        self.head = self._new_version(self.head, label, added_nodes, removed_nodes, added_edges, removed_edges, barrier)
+        self._apply(self.head)
+        return self.head
+
+    def commit(self, graph, label):
+        # Replaces the whole tracked graph; the stored delta is still only what differs.
+        current_edges, new_edges = set(self.graph.edges), set(graph.edges)
+        current_nodes, new_nodes = set(self.graph.nodes), set(graph.nodes)
+        return self.record(label, new_nodes - current_nodes, current_nodes - new_nodes,
+                           new_edges - current_edges, current_edges - new_edges)
+
+    def remove_node(self, node, label=None):
+        return self.record(label or f"Remove {node}", removed_nodes=[node])
+
+    def remove_edge(self, u, v, label=None):
+        return self.record(label or f"Remove {u} -> {v}", removed_edges=[(u, v)])
+
+    def add_edges(self, edges, label="Add dependencies"):
+        return self.record(label, added_edges=edges)
+
+    def can_undo(self):
+        return self.head.parent is not None and not self.head.barrier
+
+    def can_redo(self):
+        return self.head.last_child is not None
+
+    def undo(self):
+        if not self.can_undo():
+            return None
+        undone = self.head
+        self._revert(undone)
+        self.head = undone.parent
+        self.head.last_child = undone
+        return undone
+
+    def redo(self):
+        if not self.can_redo():
+            return None
+        self.head = self.head.last_child
+        self._apply(self.head)
+        return self.head
+
+    def _path(self, source, target):
+        # Versions walked up from source, and versions walked down to target, through their common ancestor.
+        up, down = [], []
+        while source.depth > target.depth:
+            up.append(source)
+            source = source.parent
+        while target.depth > source.depth:
+            down.append(target)
+            target = target.parent
+        while source is not target:
+            up.append(source)
+            down.append(target)
+            source, target = source.parent, target.parent
+        down.reverse()
+        return up, down
+
+    def checkout(self, version):
+        if isinstance(version, int):
+            version = self.versions[version]
+        up, down = self._path(self.head, version)
+        if any(v.barrier for v in up):
+            return None
+        for v in up:
+            self._revert(v)
+            v.parent.last_child = v
+        for v in down:
+            self._apply(v)
+            v.parent.last_child = v
+        self.head = version
+        return version
+
+    def diff(self, a, b=None):
+        # Net (added, removed) edges going from version a to version b (default: head).
+        a = self.versions[a] if isinstance(a, int) else a
+        b = self.head if b is None else self.versions[b] if isinstance(b, int) else b
+        up, down = self._path(a, b)
+        added, removed = set(), set()
+        steps = [(v.removed_edges, v.added_edges) for v in up] + [(v.added_edges, v.removed_edges) for v in down]
+        for gained, lost in steps:
+            for e in lost:
+                if e in added:
+                    added.discard(e)
+                else:
+                    removed.add(e)
+            for e in gained:
+                if e in removed:
+                    removed.discard(e)
+                else:
+                    added.add(e)
+        return added, removed
+
+    def changes(self, a, b=None):
+        # Net (added nodes, removed nodes, added edges, removed edges) going from version a to b (default: head).
+        a = self.versions[a] if isinstance(a, int) else a
+        b = self.head if b is None else self.versions[b] if isinstance(b, int) else b
+        up, down = self._path(a, b)
+        nodes, edges = ({}, {}), ({}, {})
+        steps = [(v.removed_nodes, v.added_nodes, v.removed_edges, v.added_edges) for v in up]
+        steps += [(v.added_nodes, v.removed_nodes, v.added_edges, v.removed_edges) for v in down]
+        for gained_nodes, lost_nodes, gained_edges, lost_edges in steps:
+            for (added, removed), gained, lost in ((nodes, gained_nodes, lost_nodes), (edges, gained_edges, lost_edges)):
+                for x in lost:
+                    if added.pop(x, False) is False:
+                        removed[x] = True
+                for x in gained:
+                    if removed.pop(x, False) is False:
+                        added[x] = True
+        return list(nodes[0]), list(nodes[1]), list(edges[0]), list(edges[1])
+
+    def snapshot(self, version=None):
+        # Materializes a version as a separate graph without moving head.
+        graph = self.graph.copy()
+        if version is None:
+            return graph
+        version = self.versions[version] if isinstance(version, int) else version
+        up, down = self._path(self.head, version)
+        for v in up:
+            graph.remove_edges_from(v.added_edges)
+            graph.remove_nodes_from(v.added_nodes)
+            graph.add_nodes_from(v.removed_nodes)
+            graph.add_edges_from(v.removed_edges)
+        for v in down:
+            graph.remove_edges_from(v.removed_edges)
+            graph.remove_nodes_from(v.removed_nodes)
+            graph.add_nodes_from(v.added_nodes)
+            graph.add_edges_from(v.added_edges)
+        return graph
+
+    def branches(self, version=None):
+        version = self.head if version is None else version
+        return list(version.children)
+
+    def delta_size(self):
+        return sum(v.size() for v in self.versions)
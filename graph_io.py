@@ -0,0 +1,389 @@
+import os
+import mmap
+import sys
+import time
+import struct
+import argparse
+import xml.etree.ElementTree as ET
+from array import array
+
+import numpy as np
+import networkx as nx
+
+MAGIC = b"DLWFG\0"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<6sHQQQ")    # magic, format version, process count, dependency count, name table bytes
+ALIGN = 8
+CHUNK_BYTES = 1 << 24                # text formats are read and parsed this many bytes at a time
+SEPARATORS = bytes.maketrans(b",;\t", b"   ")
+
+
+class GraphFormatError(ValueError):
+    pass
+
+
+class WaitForGraph:
+    """A wait-for graph as compressed sparse rows: out_indices[out_indptr[i]:out_indptr[i + 1]] are the
+    processes i waits on, in_indices[in_indptr[i]:in_indptr[i + 1]] the processes waiting on i. Nothing
+    is held per process or per dependency as a Python object, and the native binary format maps these
+    four arrays straight from disk.
+
+    `names` is None when processes are simply P1..Pn; binary files decode their name table on first use.
+    """
+
+    def __init__(self, out_indptr, out_indices, in_indptr, in_indices, names=None):
+        self.out_indptr, self.out_indices = out_indptr, out_indices
+        self.in_indptr, self.in_indices = in_indptr, in_indices
+        self._names = names
+        self.n = len(out_indptr) - 1
+        self.edges = len(out_indices)
+
+    @classmethod
+    def from_edges(cls, src, dst, n=None, names=None):
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        if n is None:
+            n = len(names) if names is not None else int(max(src.max(initial=-1), dst.max(initial=-1))) + 1
+        if src.size and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= n):
+            raise GraphFormatError("dependency refers to an unknown process")
+        size = max(n, 1)
+        keys = _distinct(src * size + dst)  # sorted by waiting process, duplicates dropped
+        out_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // size, minlength=n), out=out_indptr[1:])
+        out_indices = (keys % size).astype(np.int32)
+        reverse = np.sort((keys % size) * size + keys // size)
+        in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(reverse // size, minlength=n), out=in_indptr[1:])
+        if names is not None and all(name == f"P{i + 1}" for i, name in enumerate(names)):
+            names = None  # P1..Pn in order needs no name table
+        return cls(out_indptr, out_indices, in_indptr, (reverse % size).astype(np.int32), names)
+
+    @property
+    def names(self):
+        if callable(self._names):
+            self._names = self._names()
+        return self._names
+
+    def name(self, i):
+        names = self.names
+        return names[i] if names is not None else f"P{i + 1}"
+
+    def process_names(self):
+        return list(self.names) if self.names is not None else [f"P{i + 1}" for i in range(self.n)]
+
+    def waits_on(self, i):
+        return self.out_indices[self.out_indptr[i]:self.out_indptr[i + 1]]
+
+    def reduce(self):
+        """Returns a mask of the processes that can never finish: those on a cycle (a strongly connected
+        component of two or more processes, or one waiting on itself) and every process waiting on one,
+        directly or not. Both steps run in scipy's compiled graph routines and are linear whatever the
+        shape, about 1 s for 10 million dependencies. Peeling finishable processes level by level from
+        Python took 27 s on a 10-million-process chain."""
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import breadth_first_order, connected_components
+        n = self.n
+        if not self.edges:
+            return np.zeros(n, dtype=bool)
+        self.check()
+        out = csr_matrix((np.ones(self.edges, dtype=bool), self.out_indices, self.out_indptr), shape=(n, n))
+        count, labels = connected_components(out, directed=True, connection="strong")
+        stuck = np.bincount(labels, minlength=count)[labels] > 1
+        waiting = np.repeat(np.arange(n), np.diff(self.out_indptr))
+        stuck[waiting[waiting == self.out_indices]] = True
+        cyclic = np.flatnonzero(stuck)
+        if not cyclic.size:
+            return stuck
+        # Everything that reaches a cycle: one search over the reversed dependencies from an extra
+        # process n that waits on every process on a cycle.
+        in_indptr = np.append(self.in_indptr, self.in_indptr[-1] + cyclic.size)
+        in_indices = np.concatenate((self.in_indices, cyclic.astype(self.in_indices.dtype)))
+        reverse = csr_matrix((np.ones(in_indices.size, dtype=bool), in_indices, in_indptr), shape=(n + 1, n + 1))
+        stuck[breadth_first_order(reverse, n, directed=True, return_predecessors=False)[1:]] = True
+        return stuck
+
+    def check(self):
+        # scipy's compiled routines trust the arrays: a corrupt file would read out of bounds, not raise.
+        for indptr, indices in ((self.out_indptr, self.out_indices), (self.in_indptr, self.in_indices)):
+            if indptr[0] != 0 or indptr[-1] != len(indices) or (np.diff(indptr) < 0).any():
+                raise GraphFormatError("the wait-for graph has inconsistent row offsets")
+            if len(indices) and (indices.min() < 0 or indices.max() >= self.n):
+                raise GraphFormatError("a dependency refers to an unknown process")
+
+    def find_cycle(self, stuck=None):
+        # Every stuck process waits on another stuck one, so following such dependencies from any of
+        # them must come back around.
+        stuck = self.reduce() if stuck is None else stuck
+        start = np.flatnonzero(stuck)
+        if not start.size:
+            return []
+        seen, path, p = {}, [], int(start[0])
+        while p not in seen:
+            seen[p] = len(path)
+            path.append(p)
+            targets = self.waits_on(p)
+            p = int(targets[stuck[targets]][0])
+        return path[seen[p]:]
+
+    def detect(self):
+        stuck = self.reduce()
+        cycle = self.find_cycle(stuck)
+        return Detection(self.n, self.edges, int(stuck.sum()), [self.name(p) for p in cycle])
+
+    def to_networkx(self):
+        graph = nx.DiGraph()
+        names = self.process_names()
+        graph.add_nodes_from(names)
+        src = np.repeat(np.arange(self.n), np.diff(self.out_indptr))
+        graph.add_edges_from((names[u], names[v]) for u, v in zip(src.tolist(), self.out_indices.tolist()))
+        return graph
+
+    def save(self, path):
+        # Header, then the four arrays each 8-byte aligned so they can be mapped in place, then the names.
+        names = b"" if self.names is None else "\n".join(self.names).encode()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.n, self.edges, len(names)))
+            for data, dtype in self._sections():
+                f.write(b"\0" * (-f.tell() % ALIGN))
+                np.ascontiguousarray(data, dtype=dtype).tofile(f)
+            f.write(b"\0" * (-f.tell() % ALIGN))
+            f.write(names)
+        return path
+
+    def _sections(self):
+        return [(self.out_indptr, np.int64), (self.out_indices, np.int32), (self.in_indptr, np.int64), (self.in_indices, np.int32)]
+
+
+def _distinct(values):
+    # Sorted with duplicates dropped; np.sort is much faster than np.unique on large integer arrays.
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if values.size else values
+
+
+def _numbered(chunk):
+    # Process indices if every token is P<number>, else None; checked with byte counts, never split.
+    if chunk.translate(None, b"P0123456789 \r\n"):
+        return None
+    tokens = chunk.count(b"P")
+    if tokens != chunk.count(b" P") + chunk.count(b"\nP") + chunk.count(b"\rP") + chunk.startswith(b"P"):
+        return None
+    values = np.fromstring(chunk.replace(b"P", b" "), dtype=np.int64, sep=" ")
+    if values.size != tokens or values.size and values.min() < 1:
+        return None
+    return values - 1
+
+
+class Detection:
+    def __init__(self, processes, dependencies, stuck, cycle):
+        self.processes = processes
+        self.dependencies = dependencies
+        self.stuck = stuck        # processes that can never finish
+        self.cycle = cycle        # one circular wait among them, as process names
+
+    @property
+    def deadlocked(self):
+        return self.stuck > 0
+
+    def describe(self):
+        if not self.deadlocked:
+            return f"No Deadlock: all {self.processes} processes can finish."
+        cycle = " -> ".join(self.cycle[:12]) + (" -> ..." if len(self.cycle) > 12 else f" -> {self.cycle[0]}")
+        return f"Deadlock: {self.stuck} of {self.processes} processes can never finish. Cycle: {cycle}"
+
+
+def open_binary(path):
+    """Maps a native .wfg file without reading it: the CSR arrays are views of the page cache."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise GraphFormatError(f"'{path}' is too short to be a wait-for graph")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    size = len(data)
+    magic, version, n, edges, name_bytes = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise GraphFormatError(f"'{path}' is not a wait-for graph file")
+    arrays, pos = [], HEADER.size
+    for dtype, count in ((np.int64, n + 1), (np.int32, edges), (np.int64, n + 1), (np.int32, edges)):
+        pos += -pos % ALIGN
+        end = pos + count * np.dtype(dtype).itemsize
+        if end > size:
+            raise GraphFormatError(f"'{path}' is truncated")
+        arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=pos))
+        pos = end
+    pos += -pos % ALIGN
+    if pos + name_bytes > size:
+        raise GraphFormatError(f"'{path}' is truncated")
+    names = None
+    if name_bytes:
+        def names():
+            try:
+                table = data[pos:pos + name_bytes].decode().split("\n")
+            except UnicodeDecodeError as e:
+                raise GraphFormatError(f"'{path}': {e}")
+            if len(table) != n:
+                raise GraphFormatError(f"'{path}' names {len(table)} processes, expected {n}")
+            return table
+    return WaitForGraph(*arrays, names=names)
+
+
+def _text_chunks(path):
+    # Whole lines only: a chunk ends at its last newline and the remainder starts the next one.
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            block = f.read(CHUNK_BYTES)
+            if not block:
+                break
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:
+                tail = block
+                continue
+            tail = block[cut:]
+            yield block[:cut]
+        if tail:
+            yield tail
+
+
+def read_edge_list(path):
+    """'waiting holding' per line; commas, semicolons, tabs and '->' also separate, '#' starts a comment.
+    Files that only use P-numbered names are parsed straight into integer arrays."""
+    ids = None  # name -> index once a chunk has names other than P<number>
+    parts = []
+    n = 0
+    for chunk in _text_chunks(path):
+        if b"#" in chunk:
+            chunk = b"\n".join(line.split(b"#", 1)[0] for line in chunk.split(b"\n"))
+        chunk = chunk.replace(b"->", b" ").translate(SEPARATORS)
+        if chunk.isspace():
+            continue
+        values = _numbered(chunk) if ids is None else None
+        if values is not None:
+            if values.size % 2:
+                raise GraphFormatError(f"'{path}' has a line without two processes")
+            n = max(n, int(values.max(initial=-1)) + 1)
+            parts.append(values)
+            continue
+        if ids is None:
+            ids = {b"P%d" % (i + 1): i for i in range(n)}
+        tokens = chunk.split()
+        if len(tokens) % 2:
+            raise GraphFormatError(f"'{path}' has a line without two processes")
+        parts.append(np.fromiter((ids.setdefault(t, len(ids)) for t in tokens), dtype=np.int64, count=len(tokens)))
+    values = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    if ids is None:
+        return WaitForGraph.from_edges(values[0::2], values[1::2], n)
+    return WaitForGraph.from_edges(values[0::2], values[1::2], len(ids), [name.decode() for name in ids])
+
+
+def read_matrix_csv(path):
+    """The matrix written by Export Values: a header of process names, then one labelled row each,
+    any non-zero cell being a dependency."""
+    with open(path, "rb") as f:
+        header = f.readline().rstrip(b"\r\n").split(b",")
+        names = [name.strip().decode() for name in header[1:]]
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        src, dst = array("q"), array("q")
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            label, _, cells = line.partition(b",")
+            row = index.get(label.strip().decode())
+            if row is None:
+                raise GraphFormatError(f"'{path}': row '{label.decode()}' is not in the header")
+            chars = np.frombuffer(cells, dtype=np.uint8)
+            digits = chars[0::2]
+            if len(cells) == 2 * n - 1 and (chars[1::2] == ord(",")).all() and ((digits >= ord("0")) & (digits <= ord("9"))).all():
+                # The exporter's layout: single digits at even offsets.
+                hits = np.flatnonzero(digits != ord("0"))
+            else:
+                values = cells.split(b",")
+                if len(values) != n:
+                    raise GraphFormatError(f"'{path}': row '{label.decode()}' has {len(values)} cells, expected {n}")
+                try:
+                    hits = [j for j, value in enumerate(values) if value.strip() and float(value) != 0]
+                except ValueError:
+                    raise GraphFormatError(f"'{path}': row '{label.decode()}' has a cell that is not a number") from None
+            dst.extend(hits)
+            src.extend([row] * len(hits))
+    return WaitForGraph.from_edges(np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64), n, names)
+
+
+def read_graphml(path):
+    """Nodes and edges of a GraphML file, streamed element by element; an undirected graph waits both ways."""
+    ids, src, dst = {}, array("q"), array("q")
+    undirected = False
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == "graph":
+                undirected = element.get("edgedefault") == "undirected"
+            continue
+        if tag == "node":
+            ids.setdefault(element.get("id"), len(ids))
+        elif tag == "edge":
+            u = ids.setdefault(element.get("source"), len(ids))
+            v = ids.setdefault(element.get("target"), len(ids))
+            src.append(u)
+            dst.append(v)
+            if element.get("directed", "false" if undirected else "true") == "false":
+                src.append(v)
+                dst.append(u)
+        element.clear()
+    return WaitForGraph.from_edges(np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64), len(ids), list(ids))
+
+
+def read_npz(path):
+    # The compressed archive written by Export Values.
+    with np.load(path) as archive:
+        try:
+            names = [str(name) for name in archive["processes"]]
+            return WaitForGraph.from_edges(archive["src"], archive["dst"], len(names), names)
+        except KeyError as e:
+            raise GraphFormatError(f"'{path}' has no {e} array")
+
+
+READERS = {
+    ".wfg": open_binary,
+    ".csv": read_matrix_csv,
+    ".graphml": read_graphml,
+    ".xml": read_graphml,
+    ".npz": read_npz,
+}
+FILE_FILTER = "Wait-for graphs (*.wfg *.txt *.edgelist *.csv *.graphml *.xml *.npz);;All files (*)"
+
+
+def load(path):
+    """Reads any supported format, chosen by extension; anything unrecognised is read as an edge list."""
+    try:
+        return READERS.get(os.path.splitext(path)[1].lower(), read_edge_list)(path)
+    except (ET.ParseError, UnicodeDecodeError) as e:
+        raise GraphFormatError(f"'{path}': {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a wait-for graph, check it for deadlock, and optionally convert it to the native binary format.")
+    parser.add_argument("path")
+    parser.add_argument("--save", metavar="OUT.wfg", help="Write the graph in the memory-mapped binary format")
+    args = parser.parse_args(argv)
+    try:
+        start = time.perf_counter()
+        graph = load(args.path)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        detection = graph.detect()
+        detected = time.perf_counter() - start
+    except (OSError, GraphFormatError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{graph.n} processes, {graph.edges} dependencies loaded in {loaded:.2f} s, checked in {detected:.2f} s")
+    print(detection.describe())
+    if args.save:
+        graph.save(args.save)
+        print(f"Saved '{args.save}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import numpy as np
+
+import recovery
+from deadlock_core import process_sort_key
+
+DENSE_CELLS = 1 << 22   # the finest dense level has at most 2048 x 2048 blocks (16 MB)
+MIN_SPAN = 8            # processes visible at the deepest zoom
+
+
+class AdjacencyPyramid:
+    """The wait-for matrix with rows and columns in SCC order, plus block-count levels for drawing.
+
+    Components are laid out sources first, so dependencies between them fall above the diagonal and
+    every deadlocked group shows up as a square block on it. Level k sums 2^k x 2^k cells: the coarse
+    levels are kept as dense arrays, finer ones are binned from the sorted edge list on demand for the
+    visible tile only.
+    """
+
+    def __init__(self, graph, processes=()):
+        succ = recovery.successor_sets(graph)
+        for p in processes:
+            succ.setdefault(p, set())
+        self.order = []
+        self.groups = []  # (first row, size) of each deadlocked component
+        for component in reversed(recovery.strongly_connected(succ)):
+            node = next(iter(component))
+            if len(component) > 1 or node in succ[node]:
+                self.groups.append((len(self.order), len(component)))
+            self.order.extend(sorted(component, key=process_sort_key))
+        self.n = len(self.order)
+        position = {node: i for i, node in enumerate(self.order)}
+        count = sum(len(targets) for targets in succ.values())
+        rows = np.fromiter((position[u] for u, targets in succ.items() for _ in targets), dtype=np.int64, count=count)
+        cols = np.fromiter((position[v] for targets in succ.values() for v in targets), dtype=np.int64, count=count)
+        by_cell = np.argsort(rows * max(self.n, 1) + cols, kind="stable")
+        self.rows, self.cols = rows[by_cell], cols[by_cell]
+
+        self.dense_level = 0
+        while (-(-self.n >> self.dense_level)) ** 2 > DENSE_CELLS:
+            self.dense_level += 1
+        size = max(1, -(-self.n >> self.dense_level))
+        cells = np.bincount((self.rows >> self.dense_level) * size + (self.cols >> self.dense_level), minlength=size * size)
+        level = cells.reshape(size, size).astype(np.int32)
+        self.levels = {self.dense_level: level}
+        k = self.dense_level
+        while level.shape[0] > 1:
+            if level.shape[0] % 2:
+                level = np.pad(level, ((0, 1), (0, 1)))
+            half = level.shape[0] // 2
+            level = level.reshape(half, 2, half, 2).sum(axis=(1, 3))
+            k += 1
+            self.levels[k] = level
+        self.top_level = k
+
+    def level_for(self, span, pixels):
+        # Smallest level whose blocks, across the span, fit in the pixel budget.
+        k = 0
+        while (span >> k) > pixels:
+            k += 1
+        return min(k, self.top_level)
+
+    def tile(self, r0, r1, c0, c1, pixels):
+        """Block counts covering rows r0:r1 and columns c0:c1 at about `pixels` blocks across.
+        Returns (counts, block size, (first row, first column) of the tile)."""
+        k = self.level_for(max(r1 - r0, c1 - c0), pixels)
+        block = 1 << k
+        br0, br1 = r0 >> k, -(-r1 >> k)
+        bc0, bc1 = c0 >> k, -(-c1 >> k)
+        if k >= self.dense_level:
+            counts = self.levels[k][br0:br1, bc0:bc1]
+        else:
+            lo, hi = np.searchsorted(self.rows, (br0 << k, br1 << k))
+            rows, cols = self.rows[lo:hi] >> k, self.cols[lo:hi] >> k
+            inside = (cols >= bc0) & (cols < bc1)
+            width = bc1 - bc0
+            counts = np.bincount((rows[inside] - br0) * width + (cols[inside] - bc0), minlength=(br1 - br0) * width)
+            counts = counts.reshape(br1 - br0, width)
+        return counts, block, (br0 << k, bc0 << k)
+
+
+class HeatmapView:
+    """The visible window of a pyramid in matrix coordinates; zoom and pan keep it inside the matrix."""
+
+    def __init__(self, pyramid):
+        self.pyramid = pyramid
+        self.reset()
+
+    def reset(self):
+        self.r0, self.r1, self.c0, self.c1 = 0, self.pyramid.n, 0, self.pyramid.n
+
+    def bounds(self):
+        return int(self.r0), int(np.ceil(self.r1)), int(self.c0), int(np.ceil(self.c1))
+
+    def _place(self, start, span):
+        n = self.pyramid.n
+        span = min(max(span, min(MIN_SPAN, n)), n)
+        start = min(max(start, 0), n - span)
+        return start, start + span
+
+    def zoom(self, factor, row, col):
+        # The cell under the cursor stays under the cursor.
+        span_r, span_c = (self.r1 - self.r0) * factor, (self.c1 - self.c0) * factor
+        self.r0, self.r1 = self._place(row - (row - self.r0) * factor, span_r)
+        self.c0, self.c1 = self._place(col - (col - self.c0) * factor, span_c)
+
+    def pan(self, rows, cols):
+        self.r0, self.r1 = self._place(self.r0 + rows, self.r1 - self.r0)
+        self.c0, self.c1 = self._place(self.c0 + cols, self.c1 - self.c0)
@@ -0,0 +1,238 @@
+import sys
+import json
+import argparse
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+
+from deadlock_core import process_sort_key
+
+EPOCH = datetime(1970, 1, 1)
+PERIODS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1)}
+
+
+def record_edges(record):
+    # The dependencies of a history record, from either the table matrix or a "u->v" state map.
+    if "matrix" in record:
+        return [(f"P{i + 1}", f"P{j + 1}") for i, row in enumerate(record["matrix"]) for j, value in enumerate(row) if str(value) == "1"]
+    return [tuple(key.split("->", 1)) for key in record.get("state", {}) if "->" in key]
+
+
+def find_cycle(edges):
+    # First circular wait found by an iterative DFS; history graphs are table-sized, so no networkx here.
+    succ = {}
+    for u, v in edges:
+        succ.setdefault(u, []).append(v)
+    state = {}
+    for root in succ:
+        if root in state:
+            continue
+        path, stack = [root], [iter(succ[root])]
+        state[root] = 1
+        while stack:
+            for v in stack[-1]:
+                if state.get(v) == 1:
+                    return path[path.index(v):]
+                if v not in state:
+                    state[v] = 1
+                    path.append(v)
+                    stack.append(iter(succ.get(v, ())))
+                    break
+            else:
+                state[path.pop()] = 2
+                stack.pop()
+    return []
+
+
+def record_cycle(record, edges):
+    cycle = record.get("cycle")
+    if cycle and cycle != "N/A":
+        # Written by detection as "P1 to P2 -> P2 to P3 -> P3 to P1".
+        return [step.split(" to ", 1)[0].strip() for step in cycle.split(" -> ")]
+    return find_cycle(edges)
+
+
+def canonical_cycle(cycle):
+    # One key per cycle whatever process it was reported from: rotated to start at the lowest process.
+    if not cycle:
+        return ()
+    start = min(range(len(cycle)), key=lambda i: process_sort_key(cycle[i]))
+    return tuple(cycle[start:]) + tuple(cycle[:start])
+
+
+def format_cycle(cycle):
+    return " -> ".join(cycle + cycle[:1])
+
+
+class Bucket:
+    __slots__ = ("records", "deadlocks", "cycles", "edges", "deadlock_edges")
+
+    def __init__(self):
+        self.records = 0
+        self.deadlocks = 0
+        self.cycles = Counter()
+        self.edges = Counter()
+        self.deadlock_edges = Counter()
+
+
+class HistoryIndex:
+    """Hourly aggregates over detection history, updated record by record as history is appended.
+
+    Each hour keeps its record and deadlock counts, a counter of canonical cycles and counters of the
+    dependencies seen, so a query only sums the hours in its range; all-time queries read running totals.
+    """
+
+    def __init__(self, records=()):
+        self.total = Bucket()
+        self.undated = 0
+        self.hours = []      # sorted hour numbers that have a bucket
+        self.buckets = {}
+        self.last_seen = {}  # canonical cycle -> latest hour it was recorded in
+        self._hour_of = {}   # "YYYY-MM-DD HH" prefix -> hour number
+        self.extend(records)
+
+    def _hour(self, timestamp):
+        if not isinstance(timestamp, str):
+            return None
+        # The UTC offset, if any, is part of the key: the same hour prefix is a different hour in another zone.
+        prefix = timestamp[:13] + timestamp[13:].lstrip("0123456789:.")
+        hour = self._hour_of.get(prefix)
+        if hour is None:
+            try:
+                when = datetime.fromisoformat(timestamp)
+                if when.tzinfo is not None:
+                    when = when.astimezone().replace(tzinfo=None)  # the app writes local time without an offset
+                hour = int((when - EPOCH).total_seconds()) // 3600
+            except (ValueError, TypeError, OverflowError):
+                return None
+            self._hour_of[prefix] = hour
+        return hour
+
+    def append(self, record):
+        edges = record_edges(record)
+        deadlocked = bool(record.get("label"))
+        cycle = canonical_cycle(record_cycle(record, edges)) if deadlocked else ()
+        hour = self._hour(record.get("timestamp"))
+        targets = [self.total]
+        if hour is None:
+            self.undated += 1
+        else:
+            bucket = self.buckets.get(hour)
+            if bucket is None:
+                bucket = self.buckets[hour] = Bucket()
+                if self.hours and hour < self.hours[-1]:
+                    insort(self.hours, hour)
+                else:
+                    self.hours.append(hour)
+            targets.append(bucket)
+            if cycle:
+                self.last_seen[cycle] = max(hour, self.last_seen.get(cycle, hour))
+        for bucket in targets:
+            bucket.records += 1
+            bucket.edges.update(edges)
+            if deadlocked:
+                bucket.deadlocks += 1
+                bucket.deadlock_edges.update(edges)
+                if cycle:
+                    bucket.cycles[cycle] += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def _hours(self, since=None, until=None):
+        # Hours with records from `since` (inclusive) to `until` (exclusive).
+        lo = 0 if since is None else bisect_left(self.hours, int((since - EPOCH).total_seconds()) // 3600)
+        hi = len(self.hours) if until is None else bisect_left(self.hours, -(-int((until - EPOCH).total_seconds()) // 3600))
+        return self.hours[lo:hi]
+
+    def _range(self, since=None, until=None):
+        if since is None and until is None:
+            return [self.total]
+        return [self.buckets[h] for h in self._hours(since, until)]
+
+    def rate(self, since=None, until=None):
+        buckets = self._range(since, until)
+        return sum(b.records for b in buckets), sum(b.deadlocks for b in buckets)
+
+    def top_cycles(self, k=10, since=None, until=None):
+        counts = Counter()
+        for bucket in self._range(since, until):
+            counts.update(bucket.cycles)
+        return [(cycle, count, self._time(self.last_seen.get(cycle))) for cycle, count in counts.most_common(k)]
+
+    def hot_edges(self, k=10, since=None, until=None, deadlocked=True):
+        counts = Counter()
+        for bucket in self._range(since, until):
+            counts.update(bucket.deadlock_edges if deadlocked else bucket.edges)
+        return counts.most_common(k)
+
+    def series(self, every=timedelta(days=1), since=None, until=None):
+        """(period start, records, deadlocks) for each period of length `every` that has records."""
+        width = max(int(every.total_seconds()) // 3600, 1)
+        shift = 72 if width % 168 == 0 else 0  # the epoch is a Thursday; weeks start on Monday
+        periods = {}
+        for hour in self._hours(since, until):
+            bucket = self.buckets[hour]
+            counts = periods.setdefault(hour - (hour + shift) % width, [0, 0])
+            counts[0] += bucket.records
+            counts[1] += bucket.deadlocks
+        return [(self._time(start), records, deadlocks) for start, (records, deadlocks) in periods.items()]
+
+    @staticmethod
+    def _time(hour):
+        return None if hour is None else EPOCH + timedelta(hours=hour)
+
+    def report(self, since=None, k=10, every=timedelta(days=1)):
+        """Plain-text summary shared by the History Report dialog and the command line."""
+        records, deadlocks = self.rate(since)
+        span = "all time" if since is None else f"since {since:%Y-%m-%d %H:%M}"
+        lines = [f"{records} detections {span}, {deadlocks} deadlocked ({deadlocks / records:.1%})" if records else f"No detections {span}."]
+        if since is None and self.undated:
+            lines.append(f"({self.undated} records have no usable timestamp and only count towards all time)")
+        series = self.series(every, since)
+        if series:
+            lines += ["", "Deadlock rate:"]
+            lines += [f"  {start:%Y-%m-%d %H:%M}  {d:>6} / {r:<6} {d / r:6.1%}" for start, r, d in series[-30:]]
+        cycles = self.top_cycles(k, since)
+        if cycles:
+            lines += ["", f"Top {len(cycles)} recurring cycles:"]
+            lines += [f"  {count:>6}x  {format_cycle(list(cycle))}" + (f"  (last {seen:%Y-%m-%d %H:00})" if seen else "") for cycle, count, seen in cycles]
+        edges = self.hot_edges(k, since)
+        if edges:
+            lines += ["", "Dependencies most often present in deadlocks:"]
+            lines += [f"  {count:>6}x  {u} -> {v}" for (u, v), count in edges]
+        return "\n".join(lines)
+
+
+def parse_period(text):
+    # "7d", "24h", "2w"; "all" (or nothing) means no limit.
+    if not text or text == "all":
+        return None
+    try:
+        return int(text[:-1]) * PERIODS[text[-1]]
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"expected a period such as 24h, 7d or 2w, got '{text}'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deadlock rate, recurring cycles and hot dependencies from detection history.")
+    parser.add_argument("path", nargs="?", default="deadlock_history.json")
+    parser.add_argument("--last", type=parse_period, default=None, help="Only records from this recent period, e.g. 24h, 7d, 2w (default: all)")
+    parser.add_argument("--top", type=int, default=10, help="Cycles and dependencies to list")
+    parser.add_argument("--every", type=parse_period, default=PERIODS["d"], help="Period of the deadlock rate series (default: 1d)")
+    args = parser.parse_args(argv)
+    try:
+        with open(args.path) as f:
+            records = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    index = HistoryIndex(records)
+    since = datetime.now() - args.last if args.last else None
+    print(index.report(since, args.top, args.every or PERIODS["d"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
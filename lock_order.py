@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import deadlock_core
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+EXAMPLE_THREADS = 16  # threads kept per lock-order edge, enough to match every edge of a cycle to its own thread
+
+
+class ChunkResult:
+    def __init__(self):
+        self.threads = {}  # thread -> ThreadChunk
+        self.records = 0
+        self.errors = 0
+
+
+class ThreadChunk:
+    def __init__(self):
+        self.held = {}  # lock -> [count, site, entry releases of it when acquired], acquired inside this chunk
+        self.entry_released = {}  # lock -> releases of locks held before the chunk started
+        self.pending = {}  # (acquired, entry_released snapshot) -> [count, site], resolved at merge time
+        # Orderings among locks acquired inside the chunk, keyed (entry releases of the held lock, of the
+        # acquired lock) when each was acquired. Either acquire may have been re-entrant on a hold from before
+        # the chunk; that is only known at merge time.
+        self.tentative = {}
+        self.waiting = None  # lock of the last blocked attempt, whose ordering is already counted
+        self.opening = None  # (lock, site) of an acquire that opens the chunk: counted at merge time unless it ends a wait
+
+
+def add_edge(edges, held, acquired, thread, sites, count=1):
+    entry = edges.get((held, acquired))
+    if entry is None:
+        edges[(held, acquired)] = [count, {thread: sites}]
+    else:
+        entry[0] += count
+        if thread not in entry[1] and len(entry[1]) < EXAMPLE_THREADS:
+            entry[1][thread] = sites
+
+
+def distinct_threads(examples):
+    """Assign each edge of a cycle its own thread (bipartite matching), or None if they cannot all differ.
+    Only then can the inversion hang: every thread blocks holding one lock of the cycle."""
+    owner = {}  # thread -> edge index
+
+    def assign(i, seen):
+        for thread in examples[i]:
+            if thread not in seen:
+                seen.add(thread)
+                if thread not in owner or assign(owner[thread], seen):
+                    owner[thread] = i
+                    return True
+        return False
+
+    for i in range(len(examples)):
+        if not assign(i, set()):
+            return None
+    return {i: thread for thread, i in owner.items()}
+
+
+def order_after_held(state, lock, thread, site):
+    # Orders a lock not held inside the chunk after everything held: locks acquired inside the chunk now,
+    # locks held from before it once the chunk is merged.
+    released = state.entry_released.get(lock, 0)
+    for other, (_, held_site, other_released) in state.held.items():
+        add_edge(state.tentative.setdefault((other_released, released), {}), other, lock, thread, (held_site, site))
+    entry = state.pending.setdefault((lock, frozenset(state.entry_released.items())), [0, site])
+    entry[0] += 1
+
+
+def process_records(lines, result):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            thread, lock, op = record["thread"], record["lock"], record["op"]
+        except (ValueError, KeyError, TypeError):
+            result.errors += 1
+            continue
+        result.records += 1
+        site = record.get("site")
+        state = result.threads.get(thread)
+        if state is None:
+            state = result.threads[thread] = ThreadChunk()
+            if op == "acquire":
+                # The wait it may end is in the previous chunk; nothing is held inside this one yet.
+                state.opening = (lock, site)
+                state.held[lock] = [1, site, 0]
+                continue
+
+        waited, state.waiting = state.waiting, None
+        if op == "acquire":
+            held = state.held.get(lock)
+            if held is not None:
+                held[0] += 1  # Re-entrant acquire adds no ordering
+                continue
+            if waited != lock:  # the wait before a successful acquire already counted this ordering
+                order_after_held(state, lock, thread, site)
+            state.held[lock] = [1, site, state.entry_released.get(lock, 0)]
+        elif op == "wait":
+            # A blocked attempt orders the lock after everything held, even if it never succeeds.
+            if lock not in state.held:
+                order_after_held(state, lock, thread, site)
+                state.waiting = lock
+        elif op == "release":
+            held = state.held.get(lock)
+            if held is None:
+                state.entry_released[lock] = state.entry_released.get(lock, 0) + 1
+            else:
+                held[0] -= 1
+                if held[0] == 0:
+                    del state.held[lock]
+        else:
+            result.errors += 1
+    return result
+
+
+def read_range(path, start, end):
+    with open(path, "rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def process_range(args):
+    path, start, end = args
+    return process_records(read_range(path, start, end), ChunkResult())
+
+
+def chunk_ranges(path, chunk_size):
+    size = os.path.getsize(path)
+    return [(path, start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)] or [(path, 0, 0)]
+
+
+class LockOrderAnalyzer:
+    def __init__(self):
+        self.edges = {}  # (held, acquired) -> [count, {thread: (held_site, site)}]
+        self.held = {}  # thread -> {lock: [count, site]} carried between chunks
+        self.waiting = {}  # thread -> lock its last chunk ended waiting for
+        self.records = 0
+        self.errors = 0
+
+    def _merge_edge(self, key, count, examples):
+        entry = self.edges.get(key)
+        if entry is None:
+            self.edges[key] = [count, dict(examples)]
+        else:
+            entry[0] += count
+            for thread, sites in examples.items():
+                if len(entry[1]) >= EXAMPLE_THREADS:
+                    break
+                entry[1].setdefault(thread, sites)
+
+    def merge(self, chunk):
+        self.records += chunk.records
+        self.errors += chunk.errors
+
+        for thread, state in chunk.threads.items():
+            carried = self.held.get(thread, {})
+            # An acquire of a lock still held from before the chunk was re-entrant: it orders nothing, and a lock
+            # re-acquired that way is already ordered through its original hold below.
+            for (other_released, released), edges in state.tentative.items():
+                for (other, lock), (count, examples) in edges.items():
+                    if carried.get(lock, (0,))[0] <= released and carried.get(other, (0,))[0] <= other_released:
+                        self._merge_edge((other, lock), count, examples)
+            if state.opening is not None and self.waiting.get(thread) != state.opening[0]:
+                lock, site = state.opening
+                state.pending.setdefault((lock, frozenset()), [0, site])[0] += 1
+            if state.waiting is None:
+                self.waiting.pop(thread, None)
+            else:
+                self.waiting[thread] = state.waiting
+            # Locks held when the chunk started order before every lock acquired while they were still held.
+            for (lock, released), (times, site) in state.pending.items():
+                released = dict(released)
+                if carried.get(lock, (0,))[0] > released.get(lock, 0):
+                    continue
+                for other, (count, held_site) in carried.items():
+                    if other != lock and count > released.get(other, 0):
+                        add_edge(self.edges, other, lock, thread, (held_site, site), times)
+
+            held = {}
+            for lock, (count, site) in carried.items():
+                remaining = count - state.entry_released.get(lock, 0)
+                if remaining > 0:
+                    held[lock] = [remaining, site]
+            for lock, (count, site, _) in state.held.items():
+                if lock in held:
+                    held[lock][0] += count  # re-entrant on top of the carried hold, which keeps its site
+                else:
+                    held[lock] = [count, site]
+            if held:
+                self.held[thread] = held
+            else:
+                self.held.pop(thread, None)
+
+    def lock_order_graph(self):
+        graph = nx.DiGraph()
+        for (held, acquired), (count, examples) in self.edges.items():
+            graph.add_edge(held, acquired, count=count, examples=examples)
+        return graph
+
+    def potential_deadlocks(self):
+        graph = self.lock_order_graph()
+        reports = []
+        for cycle in deadlock_core.deadlock_cycles(graph):
+            edges = [graph.edges[held, acquired] for held, acquired, _ in cycle]
+            # An inversion can only hang if a different thread can hold each lock of the cycle at once.
+            threads = distinct_threads([data["examples"] for data in edges])
+            steps = []
+            for i, ((held, acquired, _), data) in enumerate(zip(cycle, edges)):
+                thread = threads[i] if threads else next(iter(data["examples"]))
+                held_site, site = data["examples"][thread]
+                steps.append({"held": held, "acquired": acquired, "count": data["count"], "thread": thread,
+                              "held_site": held_site, "site": site})
+            reports.append({"cycle": [step["held"] for step in steps], "steps": steps, "multi_thread": threads is not None})
+        return reports
+
+
+def analyze_trace(path, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    analyzer = LockOrderAnalyzer()
+    ranges = chunk_ranges(path, chunk_size)
+    if workers > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(process_range, ranges):
+                analyzer.merge(chunk)
+    else:
+        for args in ranges:
+            analyzer.merge(process_range(args))
+    return analyzer
+
+
+def format_report(analyzer, reports):
+    lines = [f"Analyzed {analyzer.records} lock events ({analyzer.errors} invalid), "
+             f"{len(analyzer.edges)} lock-order edges."]
+    if not reports:
+        lines.append("No Deadlock Detected: lock acquisition order is consistent.")
+    for i, report in enumerate(reports, 1):
+        kind = "Potential Deadlock" if report["multi_thread"] else "Lock-order inversion (single thread)"
+        lines.append(f"\n{kind} #{i}: {' -> '.join(report['cycle'] + report['cycle'][:1])}")
+        for step in report["steps"]:
+            lines.append(f"  thread {step['thread']} requested {step['acquired']} at {step['site']} "
+                         f"while holding {step['held']} (acquired at {step['held_site']}), seen {step['count']}x")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lock-order analysis of JSONL lock acquire/release traces.")
+    parser.add_argument("trace", help="JSONL file with {thread, lock, op, site} records (op: acquire, wait or release), e.g. from LockTracker.dump_trace")
+    parser.add_argument("--workers", type=int, default=1, help="Process-pool size for parallel chunk parsing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024), help="Chunk size in MB")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    analyzer = analyze_trace(args.trace, workers=args.workers, chunk_size=args.chunk_size * 1024 * 1024)
+    reports = analyzer.potential_deadlocks()
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(format_report(analyzer, reports))
+    return 1 if any(report["multi_thread"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
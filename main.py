@@ -1,25 +1,45 @@
 import sys
 import os
 import networkx as nx
-import numpy as np
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel, QVBoxLayout, QHBoxLayout,
     QWidget, QTextEdit, QTableWidget, QTableWidgetItem, QHeaderView, QGraphicsDropShadowEffect,
-    QTabWidget, QLineEdit, QToolTip, QComboBox, QDialog, QGridLayout, QSpinBox
+    QTabWidget, QLineEdit, QToolTip, QComboBox, QDialog, QGridLayout, QSpinBox, QCheckBox, QSlider, QFileDialog,
+    QInputDialog
 )
-from PyQt6.QtGui import QFont, QColor, QBrush, QLinearGradient
-from PyQt6.QtCore import QTimer, Qt, QPropertyAnimation, QEasingCurve, QSize
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d import Axes3D
+from PyQt6.QtGui import QFont, QColor, QBrush, QLinearGradient, QTextCursor
+from PyQt6.QtCore import QTimer, Qt, QPropertyAnimation, QEasingCurve, QSize, pyqtSignal
 import random
-import requests
 import json
-from sklearn.cluster import KMeans
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import deadlock_core
+import scenario_dsl
+import charts
+import heatmap
+import condensation
+import recovery
+import what_if
+import ai_backends
+import reachability
+import exporter
+import graph_io
+import history_index
+import analysis_cache
+import workspaces
+import risk_stream
+from render_scheduler import RenderScheduler
+from event_log import EventLog, Severity
+from dependency_model import DependencyModel, TableBinding
+from sim_recorder import SimulationRecorder, SimulationReplay, RecordingError
 
 class DeadlockDetectionAI(QMainWindow):
+    export_finished = pyqtSignal(str)
+    import_finished = pyqtSignal(object)  # (path, graph or None, detection or error message, seconds, into a new workspace)
+    workspace_evaluated = pyqtSignal(object)  # (batch, Evaluation or (workspace name, error message))
+    prediction_fragment = pyqtSignal(str, bool)  # html, starts a new block
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AI-Powered Deadlock Detection System")
@@ -28,11 +48,43 @@ class DeadlockDetectionAI(QMainWindow):
             background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #B3E5FC, stop:1 #4FC3F7);
             QToolTip { color: #0A1A44; background-color: #FFFFFF; border: 1px solid #0A1A44; padding: 5px; font-size: 16px; font-weight: bold; }
         """)
-        self.num_processes = 5  # Default number of processes, adjustable up to 9
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        self.deadlock_graph_tab1 = nx.DiGraph()
-        self.deadlock_graph_tab3 = nx.DiGraph()
+        # Both graphs are edited through their version stores, which keep them updated in place; each model
+        # also owns the process list and signals every change, so tables and charts never re-read each other.
+        # Detection works on the current workspace, one of several independent named sessions.
+        self.workspaces = []
+        self.workspace_combo = None
+        self.scheduler = RenderScheduler(lambda tab: self.tabs.currentIndex() == tab)
+        self.workspace = self.add_workspace("Workspace 1", 5)  # Default number of processes, adjustable up to 9
+        self.simulation = DependencyModel(5)
+        self.deadlock_graph_tab3, self.versions_tab3 = self.simulation.graph, self.simulation.versions
+        self.simulation_risk = risk_stream.RiskScorer(self.simulation.graph, 5)
+        self.watch_risk(self.simulation, self.simulation_risk, lambda msg, severity: self.add_sim_message(msg, severity))
+        self.comparison_batch = 0
+        self.comparison_table = None
+        self.comparison_rows = {}
+        self.comparison_pending = 0
+        self.comparison_deadlocked = []
+        self.comparison_start = 0.0
+        self.pending_imports = 0
+        self.reach_index = None
+        self.reach_version = None
+        self.heatmap_pyramid = None
+        self.heatmap_version = None
+        self.heatmap_view = None
+        self.heatmap_drag = None
+        self.condensed = None
+        self.condensed_version = None
+        self.condensed_expanded = set()
+        self.condensed_picks = None
+        self.sim_seed = None
+        self.sim_rng = random.Random()
+        self.recorder = None
+        self.sim_changes = ([], [], [], [])  # added nodes, removed nodes, added edges, removed edges of the step being recorded
+        self.replay = None
+        self.replay_graph = None
         self.history = []
+        self.history_stats = None  # built on first report, then kept up to date by record_history
+        self.analyses = analysis_cache.AnalysisCache()
         try:
             if os.path.exists("deadlock_history.json"):
                 with open("deadlock_history.json", "r") as f:
@@ -42,10 +94,37 @@ class DeadlockDetectionAI(QMainWindow):
         self.current_graph_type = "3D Bar Plot"
         self.recovery_method = "Preemption"
         self.ai_suggested_method = None
-        self.bankers_configured = False
-        self.max_demand = [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]]
-        self.allocation = [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]]
-        self.available = [3, 3, 3]
+        try:
+            self.ai_backend = ai_backends.backend_from_env()
+        except ai_backends.BackendError as e:
+            print(f"{e}; using the local recommender.", file=sys.stderr)
+            self.ai_backend = ai_backends.LocalBackend()
+        self.canvas_tab1 = self.canvas_tab2 = self.canvas_tab3 = None
+        self.message_log = EventLog("detection")
+        self.sim_output = EventLog("simulation")
+        self.table_tab3 = None
+        self.replay_slider = None
+        self.scheduler.register("chart_tab1", self.update_chart_tab1, 0)
+        self.scheduler.register("chart_tab2", self.update_chart_tab2, 1)
+        self.scheduler.register("table_tab3", self.update_table_tab3, 2)
+        self.scheduler.register("chart_tab3", self.update_chart_tab3, 2)
+        self.simulation.changed.connect(lambda: self.scheduler.mark_dirty("chart_tab3"))
+        # Every change to the simulation graph, from a step, an undo or a cell edit, is one recorded step.
+        self.simulation.nodes_changed.connect(self.record_sim_nodes)
+        self.simulation.edge_added.connect(lambda u, v: self.record_sim_edge(u, v, True))
+        self.simulation.edge_removed.connect(lambda u, v: self.record_sim_edge(u, v, False))
+        self.simulation.changed.connect(self.record_sim_step)
+        self.simulation.processes_changed.connect(lambda count: self.scheduler.mark_dirty("chart_tab3"))
+        self.export_finished.connect(lambda msg: self.add_message(msg))
+        self.prediction_fragment.connect(self.append_prediction_fragment)
+        self.import_finished.connect(self.finish_import)
+        self.workspace_evaluated.connect(self.show_evaluation)
+        self.ai_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")  # one stream at a time keeps answers in order
+        self.import_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import")
+        self.workspace_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="workspace")
+        self.exporter = exporter.Exporter(
+            on_done=lambda path: self.export_finished.emit(f"Exported '{path}'"),
+            on_error=lambda e: self.export_finished.emit(f"Export failed: {str(e)}"))
         print("Project Highlight: This tool utilizes a dynamic process table and AI-powered ML clustering to detect deadlock patterns. For patent-related inquiries or code use, please contact the owner at adarshsingh6534@gmail.com.")
         self.initUI()
 
@@ -70,18 +149,40 @@ class DeadlockDetectionAI(QMainWindow):
                            color: #0A1A44; padding: 5px; font-weight: bold; margin-right: 5px; }
             QTabBar::tab:selected { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #FF6F61, stop:1 #26A69A); }
         """)
-        self.tabs.currentChanged.connect(self.animate_tab_transition)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         main_layout.addWidget(self.tabs)
 
-        self.setup_tab1()
-        self.setup_tab2()
-        self.setup_tab3()
-        self.setup_tab4()
+        # Only the first tab is built up front; the rest are populated on first activation.
+        self.tab_builders = [self.setup_tab1, self.setup_tab2, self.setup_tab3, self.setup_tab4]
+        self.built_tabs = set()
+        for title in ["Deadlock Detection", "Dependency Visualization", "Simulation Mode", "AI Prediction"]:
+            self.tabs.addTab(QWidget(), title)
+        self.ensure_tab_built(0)
+        QTimer.singleShot(0, self.setup_chart_tab1)
 
         container = QWidget()
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
+    def ensure_tab_built(self, index):
+        if index not in self.built_tabs and 0 <= index < len(self.tab_builders):
+            self.built_tabs.add(index)
+            self.tab_builders[index](self.tabs.widget(index))
+
+    def on_tab_changed(self, index):
+        self.ensure_tab_built(index)
+        self.scheduler.tab_shown(index)
+        self.animate_tab_transition(index)
+
+    def create_canvas(self, figsize):
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=figsize)
+        figure.patch.set_alpha(0)
+        canvas = FigureCanvas(figure)
+        canvas.setStyleSheet("border: 1px solid #0A1A44; background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #B3E5FC, stop:1 #4FC3F7);")
+        return figure, canvas
+
     def animate_tab_transition(self, index):
         widget = self.tabs.widget(index)
         animation = QPropertyAnimation(widget, b"windowOpacity")
@@ -124,7 +225,6 @@ class DeadlockDetectionAI(QMainWindow):
         combo = QComboBox()
         combo.addItems([str(i) for i in range(1, 10)])
         combo.setCurrentText(str(self.num_processes))
-        combo.currentTextChanged.connect(lambda x: setattr(self, 'num_processes', int(x)))
         combo.setStyleSheet("""
             QComboBox {
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #26A69A, stop:1 #4682B4);
@@ -138,43 +238,220 @@ class DeadlockDetectionAI(QMainWindow):
 
         ok_button = QPushButton("OK")
         ok_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
-        ok_button.clicked.connect(lambda: self.apply_system_size(dialog))
+        ok_button.clicked.connect(lambda: self.apply_system_size(dialog, int(combo.currentText())))
         layout.addWidget(ok_button)
 
         dialog.setLayout(layout)
         dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
         dialog.exec()
 
-    def apply_system_size(self, dialog):
-        self.num_processes = int(self.num_processes)  # Use the updated value from combo
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        self.max_demand = [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]] + [[0, 0, 0]] * (self.num_processes - 5)
-        self.allocation = [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]] + [[0, 0, 0]] * (self.num_processes - 5)
-        self.update_all_tabs()
+    def apply_system_size(self, dialog, num_processes):
+        self.resize_system(num_processes)
         dialog.close()
 
-    def update_all_tabs(self):
-        self.table_tab1.setRowCount(self.num_processes)
-        self.table_tab1.setColumnCount(self.num_processes)
-        self.table_tab1.setHorizontalHeaderLabels(self.processes)
-        self.table_tab1.setVerticalHeaderLabels(self.processes)
-        self.update_table_tab1()
+    def resize_system(self, num_processes):
+        self.workspace.reset_bankers(num_processes)
+        # Tables resize and charts redraw from the models' processes_changed signals.
+        self.detection.set_process_count(num_processes)
+        self.simulation.set_process_count(num_processes)
+
+    @property
+    def detection(self):
+        return self.workspace.model
+
+    @property
+    def deadlock_graph_tab1(self):
+        return self.workspace.model.graph
+
+    @property
+    def versions_tab1(self):
+        return self.workspace.model.versions
+
+    @property
+    def num_processes(self):
+        return self.detection.count
+
+    @property
+    def processes(self):
+        return self.detection.processes
+
+    def add_workspace(self, name, num_processes):
+        workspace = workspaces.Workspace(self.unique_workspace_name(name), num_processes)
+        workspace.model.changed.connect(lambda: self.workspace_changed(workspace))
+        workspace.model.processes_changed.connect(lambda count: self.workspace_changed(workspace))
+        self.watch_risk(workspace.model, workspace.risk, lambda msg, severity: self.add_message(
+            msg if workspace is self.workspace else f"[{workspace.name}] {msg}", severity))
+        self.workspaces.append(workspace)
+        if self.workspace_combo is not None:
+            self.workspace_combo.addItem(workspace.name)
+        return workspace
+
+    def watch_risk(self, model, scorer, log):
+        # Early warning from the live stream of changes: the scorer sees each dependency as the model signals it.
+        model.edge_added.connect(lambda u, v: self.risk_alert(scorer.edge_added(u, v), log))
+        model.edge_removed.connect(lambda u, v: scorer.edge_removed(u, v))
+        model.processes_changed.connect(scorer.set_processes)
+
+    def risk_alert(self, risk, log):
+        if risk is not None:
+            log(f"Early warning: contention is building. {risk.describe()}", Severity.ALERT)
+
+    def unique_workspace_name(self, name):
+        names = {w.name for w in self.workspaces}
+        candidate, n = name, 2
+        while candidate in names:
+            candidate, n = f"{name} ({n})", n + 1
+        return candidate
+
+    def workspace_changed(self, workspace):
+        # Every workspace's model signals its edits; only the one on screen has charts to redraw.
+        if workspace is self.workspace:
+            self.scheduler.mark_dirty("chart_tab1", "chart_tab2")
+
+    def switch_workspace(self, index):
+        if not 0 <= index < len(self.workspaces) or self.workspaces[index] is self.workspace:
+            return
+        self.workspace = self.workspaces[index]
+        self.table_binding_tab1.bind(self.detection)
+        self.scheduler.mark_dirty("chart_tab1", "chart_tab2")
+        if self.workspace_combo.currentIndex() != index:
+            self.workspace_combo.setCurrentIndex(index)
+        graph = self.deadlock_graph_tab1
+        self.add_message(f"Workspace '{self.workspace.name}': {self.num_processes} processes, {graph.number_of_edges()} dependencies, {len(self.versions_tab1.versions)} versions.", Severity.HEADER)
+
+    def new_workspace(self):
+        name, ok = QInputDialog.getText(self, "New Workspace", "Workspace name:", text=f"Workspace {len(self.workspaces) + 1}")
+        if not ok or not name.strip():
+            return
+        workspace = self.add_workspace(name.strip(), self.num_processes)
+        self.switch_workspace(self.workspaces.index(workspace))
+
+    def compare_workspaces(self):
+        # Snapshots are taken here on the GUI thread; the pool only ever sees the copies.
+        self.comparison_batch += 1
+        batch = self.comparison_batch
+        snapshots = [w.snapshot() for w in self.workspaces]
+        self.comparison_rows = {s.name: row for row, s in enumerate(snapshots)}
+        self.comparison_pending = len(snapshots)
+        self.comparison_start = time.perf_counter()
+        self.comparison_deadlocked = []
+        workspaces.evaluate_all(snapshots, self.workspace_pool, lambda result: self.workspace_evaluated.emit((batch, result)))
 
-        self.table_tab3.setRowCount(self.num_processes)
-        self.table_tab3.setColumnCount(self.num_processes)
-        self.table_tab3.setHorizontalHeaderLabels(self.processes)
-        self.table_tab3.setVerticalHeaderLabels(self.processes)
-        self.update_table_tab3()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Compare Workspaces")
+        dialog.setMinimumSize(980, 360)
+        layout = QVBoxLayout()
+        label = QLabel(f"Detection and recovery for {len(snapshots)} workspace(s), evaluated in the background. Double-click a row to open it.")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        label.setWordWrap(True)
+        layout.addWidget(label)
+
+        headers = ["Workspace", "Processes", "Dependencies", "Deadlock Type", "Cycles", "Deadlocked", "Blocked", "Preempt", "Time Out", "Banker's", "ms"]
+        table = QTableWidget(len(snapshots), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        table.setStyleSheet("QTableWidget { background-color: #FFFFFF; color: #0A1A44; } QHeaderView::section { background-color: #26A69A; color: #0A1A44; font-weight: bold; }")
+        for row, snapshot in enumerate(snapshots):
+            table.setItem(row, 0, QTableWidgetItem(snapshot.name))
+            table.setItem(row, 3, QTableWidgetItem("evaluating..."))
+        table.cellDoubleClicked.connect(lambda row, col: (self.switch_workspace(row), dialog.accept()))
+        layout.addWidget(table)
+        self.comparison_table = table
+
+        close_button = QPushButton("Close")
+        close_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        close_button.clicked.connect(dialog.accept)
+        layout.addWidget(close_button)
 
-        self.update_chart_tab1()
-        self.update_chart_tab2()
-        self.update_chart_tab3()
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        dialog.exec()
+        self.comparison_table = None
 
-    def setup_tab1(self):
-        tab1 = QWidget()
+    def show_evaluation(self, result):
+        batch, evaluation = result
+        if batch != self.comparison_batch:
+            return
+        self.comparison_pending -= 1
+        if isinstance(evaluation, tuple):
+            name, error = evaluation
+            self.add_message(f"Workspace '{name}' could not be evaluated: {error}", Severity.ALERT)
+            cells = {3: f"error: {error}"}
+        else:
+            name = evaluation.name
+            if evaluation.is_deadlocked:
+                self.comparison_deadlocked.append(name)
+            victims = f"{', '.join(evaluation.victims)} (cost {evaluation.victim_cost:g})" if evaluation.victims else "-"
+            timeouts = f"{', '.join(f'{u} -> {v}' for u, v in evaluation.timeouts)} (cost {evaluation.timeout_cost:g})" if evaluation.timeouts else "-"
+            cells = {1: evaluation.processes, 2: evaluation.dependencies, 3: evaluation.type, 4: evaluation.cycles,
+                     5: evaluation.deadlocked, 6: evaluation.blocked, 7: victims, 8: timeouts,
+                     9: evaluation.bankers_text(), 10: f"{evaluation.seconds * 1000:.1f}"}
+        table, row = self.comparison_table, self.comparison_rows.get(name)
+        if table is not None and row is not None:
+            color = QColor("#FFCDD2") if name in self.comparison_deadlocked else QColor("#C8E6C9")
+            for col, value in cells.items():
+                table.setItem(row, col, QTableWidgetItem(str(value)))
+            for col in range(table.columnCount()):
+                if table.item(row, col) is not None:
+                    table.item(row, col).setBackground(color)
+        if self.comparison_pending == 0:
+            deadlocked = self.comparison_deadlocked
+            self.add_message(f"Compared {len(self.comparison_rows)} workspace(s) in {time.perf_counter() - self.comparison_start:.2f} s: "
+                             + (f"{len(deadlocked)} deadlocked ({', '.join(deadlocked)})." if deadlocked else "none deadlocked."),
+                             Severity.ALERT if deadlocked else Severity.SUCCESS)
+
+    def setup_tab1(self, tab1):
         two_part_layout = QHBoxLayout()
 
         left_layout = QVBoxLayout()
+        workspace_layout = QHBoxLayout()
+        workspace_label = QLabel("Workspace:")
+        workspace_label.setStyleSheet("color: #0A1A44; font-weight: bold; background: transparent;")
+        workspace_layout.addWidget(workspace_label)
+        self.workspace_combo = QComboBox()
+        self.workspace_combo.addItems([w.name for w in self.workspaces])
+        self.workspace_combo.setCurrentIndex(self.workspaces.index(self.workspace))
+        self.workspace_combo.currentIndexChanged.connect(self.switch_workspace)
+        self.workspace_combo.setToolTip("Each workspace keeps its own dependencies, undo history, Banker's configuration and recovery costs")
+        self.workspace_combo.setStyleSheet("""
+            QComboBox {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #26A69A, stop:1 #4682B4);
+                color: #FFFFFF; font-size: 16px; border: 2px solid #0A1A44; padding: 5px; border-radius: 8px;
+            }
+            QComboBox::drop-down { border: none; }
+            QComboBox QAbstractItemView { color: #0A1A44; background-color: #F5F5F5; selection-background-color: #26A69A; }
+        """)
+        workspace_layout.addWidget(self.workspace_combo, stretch=1)
+
+        self.new_workspace_button = QPushButton("New Workspace")
+        self.new_workspace_button.setStyleSheet(self.button_style("#26A69A"))
+        self.new_workspace_button.clicked.connect(self.new_workspace)
+        self.new_workspace_button.setToolTip("Start an empty, independently versioned dependency graph")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.new_workspace_button.setGraphicsEffect(fix_shadow)
+        workspace_layout.addWidget(self.new_workspace_button)
+
+        self.compare_button = QPushButton("Compare All")
+        self.compare_button.setStyleSheet(self.button_style("#FF6F61"))
+        self.compare_button.clicked.connect(self.compare_workspaces)
+        self.compare_button.setToolTip("Detect, simulate recovery and run Banker's on every workspace in the background, side by side")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.compare_button.setGraphicsEffect(fix_shadow)
+        workspace_layout.addWidget(self.compare_button)
+        left_layout.addLayout(workspace_layout)
+
         self.table_tab1 = QTableWidget(self.num_processes, self.num_processes)
         self.table_tab1.setHorizontalHeaderLabels(self.processes)
         self.table_tab1.setVerticalHeaderLabels(self.processes)
@@ -182,6 +459,7 @@ class DeadlockDetectionAI(QMainWindow):
         self.table_tab1.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table_tab1.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table_tab1.setToolTip("Enter '1' to indicate a process dependency (e.g., P1 waits for P2)")
+        self.table_binding_tab1 = TableBinding(self.detection, self.table_tab1)
         left_layout.addWidget(self.table_tab1)
 
         button_layout = QHBoxLayout()
@@ -224,7 +502,7 @@ class DeadlockDetectionAI(QMainWindow):
         self.export_graph_button = QPushButton("Export Graph")
         self.export_graph_button.setStyleSheet(self.button_style("#3CB371"))
         self.export_graph_button.clicked.connect(self.export_graph)
-        self.export_graph_button.setToolTip("Save the bar chart as PNG")
+        self.export_graph_button.setToolTip("Export the charts as PNG, SVG or PDF in the background")
         fix_shadow = QGraphicsDropShadowEffect()
         fix_shadow.setBlurRadius(15)
         fix_shadow.setXOffset(5)
@@ -236,7 +514,7 @@ class DeadlockDetectionAI(QMainWindow):
         self.export_values_button = QPushButton("Export Values")
         self.export_values_button.setStyleSheet(self.button_style("#4682B4"))
         self.export_values_button.clicked.connect(self.export_values)
-        self.export_values_button.setToolTip("Save the dependency table as CSV")
+        self.export_values_button.setToolTip("Save the dependency matrix as CSV, edge list, NumPy archive or memory-mapped .wfg")
         fix_shadow = QGraphicsDropShadowEffect()
         fix_shadow.setBlurRadius(15)
         fix_shadow.setXOffset(5)
@@ -245,6 +523,18 @@ class DeadlockDetectionAI(QMainWindow):
         self.export_values_button.setGraphicsEffect(fix_shadow)
         button_layout.addWidget(self.export_values_button)
 
+        self.import_button = QPushButton("Import Graph")
+        self.import_button.setStyleSheet(self.button_style("#4682B4"))
+        self.import_button.clicked.connect(self.import_graph)
+        self.import_button.setToolTip("Load a wait-for graph from an edge list, GraphML, exported CSV/NumPy values or a .wfg file")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.import_button.setGraphicsEffect(fix_shadow)
+        button_layout.addWidget(self.import_button)
+
         self.process_size_button = QPushButton("Process Size")
         self.process_size_button.setStyleSheet(self.button_style("#26A69A"))
         self.process_size_button.clicked.connect(self.configure_system_size)
@@ -258,41 +548,79 @@ class DeadlockDetectionAI(QMainWindow):
         button_layout.addWidget(self.process_size_button)
 
         left_layout.addLayout(button_layout)
+
+        history_layout = QHBoxLayout()
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.setStyleSheet(self.button_style("#4682B4"))
+        self.undo_button.clicked.connect(self.undo_tab1)
+        self.undo_button.setToolTip("Revert the last change to the dependency graph")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.undo_button.setGraphicsEffect(fix_shadow)
+        history_layout.addWidget(self.undo_button)
+
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.setStyleSheet(self.button_style("#4682B4"))
+        self.redo_button.clicked.connect(self.redo_tab1)
+        self.redo_button.setToolTip("Reapply the last undone change")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.redo_button.setGraphicsEffect(fix_shadow)
+        history_layout.addWidget(self.redo_button)
+
+        self.costs_button = QPushButton("Recovery Costs")
+        self.costs_button.setStyleSheet(self.button_style("#26A69A"))
+        self.costs_button.clicked.connect(self.show_recovery_costs)
+        self.costs_button.setToolTip("Set per-process priority and work done used to pick the cheapest processes to preempt")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.costs_button.setGraphicsEffect(fix_shadow)
+        history_layout.addWidget(self.costs_button)
+        left_layout.addLayout(history_layout)
         two_part_layout.addLayout(left_layout, stretch=1)
 
         right_layout = QVBoxLayout()
-        self.figure_tab1 = Figure(figsize=(4, 3))
-        self.figure_tab1.patch.set_alpha(0)
-        self.canvas_tab1 = FigureCanvas(self.figure_tab1)
-        self.canvas_tab1.setStyleSheet("border: 1px solid #0A1A44; background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #B3E5FC, stop:1 #4FC3F7);")
-        self.canvas_tab1.mpl_connect('button_press_event', self.on_bar_click)
-        right_layout.addWidget(self.canvas_tab1, stretch=1)
-        self.update_chart_tab1()
+        self.right_layout_tab1 = right_layout
 
-        self.message_log = QTextEdit()
-        self.message_log.setReadOnly(True)
-        self.message_log.setStyleSheet("QTextEdit { background-color: #F5E6E8; color: #0A1A44; font-family: 'Lilita', 'Helvetica', sans-serif; font-size: 16px; font-weight: bold; border: none; }")
+        self.message_log.view.setStyleSheet("QListView { background-color: #F5E6E8; color: #0A1A44; font-family: 'Lilita', 'Helvetica', sans-serif; font-size: 16px; font-weight: bold; border: none; }")
         message_shadow = QGraphicsDropShadowEffect()
         message_shadow.setBlurRadius(15)
         message_shadow.setXOffset(0)
         message_shadow.setYOffset(0)
         message_shadow.setColor(QColor(255, 255, 255, 200))
-        self.message_log.setGraphicsEffect(message_shadow)
-        self.add_message("System initialized...")
-        right_layout.addWidget(self.message_log, stretch=1)
+        self.message_log.view.setGraphicsEffect(message_shadow)
+        self.add_message("System initialized...", Severity.HEADER)
+        right_layout.addWidget(self.message_log.view, stretch=1)
 
         two_part_layout.addLayout(right_layout, stretch=1)
         tab1.setLayout(two_part_layout)
-        self.tabs.addTab(tab1, "Deadlock Detection")
 
-    def setup_tab2(self):
-        tab2 = QWidget()
+    def setup_chart_tab1(self):
+        # Deferred until the window is up, since it pulls in matplotlib.
+        if self.canvas_tab1 is not None:
+            return
+        self.figure_tab1, self.canvas_tab1 = self.create_canvas((4, 3))
+        self.canvas_tab1.mpl_connect('button_press_event', self.on_bar_click)
+        self.right_layout_tab1.insertWidget(0, self.canvas_tab1, stretch=1)
+        self.scheduler.mark_dirty("chart_tab1")
+
+    def setup_tab2(self, tab2):
         layout = QVBoxLayout()
-        self.figure_tab2 = Figure(figsize=(5, 4))
-        self.figure_tab2.patch.set_alpha(0)
-        self.canvas_tab2 = FigureCanvas(self.figure_tab2)
-        self.canvas_tab2.setStyleSheet("border: 1px solid #0A1A44; background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #B3E5FC, stop:1 #4FC3F7);")
+        self.figure_tab2, self.canvas_tab2 = self.create_canvas((5, 4))
         self.canvas_tab2.setToolTip("Visualize dependency from Tab 1 table")
+        self.canvas_tab2.mpl_connect('scroll_event', self.on_heatmap_scroll)
+        self.canvas_tab2.mpl_connect('button_press_event', self.on_heatmap_press)
+        self.canvas_tab2.mpl_connect('motion_notify_event', self.on_heatmap_drag)
+        self.canvas_tab2.mpl_connect('button_release_event', lambda event: setattr(self, 'heatmap_drag', None))
         layout.addWidget(self.canvas_tab2)
 
         button_layout = QHBoxLayout()
@@ -333,12 +661,10 @@ class DeadlockDetectionAI(QMainWindow):
         button_layout.addWidget(self.rotate_v_button)
 
         layout.addLayout(button_layout)
-        self.update_chart_tab2()
+        self.scheduler.mark_dirty("chart_tab2")
         tab2.setLayout(layout)
-        self.tabs.addTab(tab2, "Dependency Visualization")
 
-    def setup_tab3(self):
-        tab3 = QWidget()
+    def setup_tab3(self, tab3):
         main_layout = QHBoxLayout()
         main_layout.setStretch(0, 40)
         main_layout.setStretch(1, 60)
@@ -349,6 +675,7 @@ class DeadlockDetectionAI(QMainWindow):
         self.table_tab3.setVerticalHeaderLabels(self.processes)
         self.table_tab3.setStyleSheet("QTableWidget { background-color: #FFFFFF; color: #0A1A44; font-size: 16px; border: 1px solid #0A1A44; } QHeaderView::section { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #26A69A, stop:1 #FF6F61); color: #0A1A44; font-weight: bold; }")
         self.table_tab3.setToolTip("Watch dependencies change in real-time")
+        self.table_binding_tab3 = TableBinding(self.simulation, self.table_tab3, self.displayed_graph_tab3)
         left_layout.addWidget(self.table_tab3)
 
         button_layout1 = QHBoxLayout()
@@ -375,6 +702,30 @@ class DeadlockDetectionAI(QMainWindow):
         fix_shadow.setColor(QColor(0, 0, 0, 100))
         self.stop_sim_button.setGraphicsEffect(fix_shadow)
         button_layout1.addWidget(self.stop_sim_button)
+
+        self.undo_sim_button = QPushButton("Step Back")
+        self.undo_sim_button.setStyleSheet(self.button_style("#4682B4"))
+        self.undo_sim_button.clicked.connect(self.undo_tab3)
+        self.undo_sim_button.setToolTip("Undo the last simulation step to try another recovery method")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.undo_sim_button.setGraphicsEffect(fix_shadow)
+        button_layout1.addWidget(self.undo_sim_button)
+
+        self.redo_sim_button = QPushButton("Step Forward")
+        self.redo_sim_button.setStyleSheet(self.button_style("#4682B4"))
+        self.redo_sim_button.clicked.connect(self.redo_tab3)
+        self.redo_sim_button.setToolTip("Redo the last undone simulation step")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.redo_sim_button.setGraphicsEffect(fix_shadow)
+        button_layout1.addWidget(self.redo_sim_button)
         left_layout.addLayout(button_layout1)
 
         button_layout2 = QHBoxLayout()
@@ -421,39 +772,50 @@ class DeadlockDetectionAI(QMainWindow):
         button_layout2.addWidget(self.ai_suggest_button)
 
         left_layout.addLayout(button_layout2)
+
+        replay_layout = QHBoxLayout()
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal)
+        self.replay_slider.setRange(0, 0)
+        self.replay_slider.setToolTip("Scrub through the recorded simulation steps")
+        self.replay_slider.valueChanged.connect(self.scrub_replay)
+        replay_layout.addWidget(self.replay_slider, stretch=1)
+        self.replay_label = QLabel("Replay: live")
+        self.replay_label.setStyleSheet("color: #0A1A44; font-weight: bold; background: transparent;")
+        replay_layout.addWidget(self.replay_label)
+
+        self.open_replay_button = QPushButton("Open Recording")
+        self.open_replay_button.setStyleSheet(self.button_style("#3CB371"))
+        self.open_replay_button.clicked.connect(self.open_recording)
+        self.open_replay_button.setToolTip("Load a recorded simulation (.dlsim) to replay")
+        replay_layout.addWidget(self.open_replay_button)
+        left_layout.addLayout(replay_layout)
         left_layout.addStretch()
         main_layout.addLayout(left_layout)
 
         right_layout = QVBoxLayout()
-        self.sim_output = QTextEdit()
-        self.sim_output.setReadOnly(True)
-        self.sim_output.setStyleSheet("QTextEdit { background-color: #F5E6E8; color: #0A1A44; font-family: 'Lilita', 'Helvetica', sans-serif; font-size: 16px; font-weight: bold; border: 1px solid #0A1A44; padding: 5px; }")
-        self.sim_output.setFixedHeight(150)
+        self.sim_output.view.setStyleSheet("QListView { background-color: #F5E6E8; color: #0A1A44; font-family: 'Lilita', 'Helvetica', sans-serif; font-size: 16px; font-weight: bold; border: 1px solid #0A1A44; padding: 5px; }")
+        self.sim_output.view.setFixedHeight(150)
         sim_shadow = QGraphicsDropShadowEffect()
         sim_shadow.setBlurRadius(15)
         sim_shadow.setXOffset(0)
         sim_shadow.setYOffset(0)
         sim_shadow.setColor(QColor(255, 255, 255, 200))
-        self.sim_output.setGraphicsEffect(sim_shadow)
-        right_layout.addWidget(self.sim_output)
+        self.sim_output.view.setGraphicsEffect(sim_shadow)
+        right_layout.addWidget(self.sim_output.view)
 
-        self.figure_tab3 = Figure(figsize=(6, 5))
-        self.figure_tab3.patch.set_alpha(0)
-        self.canvas_tab3 = FigureCanvas(self.figure_tab3)
-        self.canvas_tab3.setStyleSheet("border: 1px solid #0A1A44; background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #B3E5FC, stop:1 #4FC3F7);")
+        self.figure_tab3, self.canvas_tab3 = self.create_canvas((6, 5))
+        self.canvas_tab3.mpl_connect('button_press_event', self.on_condensed_click)
         right_layout.addWidget(self.canvas_tab3, stretch=1)
-        self.update_chart_tab3()
+        self.scheduler.mark_dirty("chart_tab3")
         right_layout.addStretch()
         main_layout.addLayout(right_layout)
 
         tab3.setLayout(main_layout)
-        self.tabs.addTab(tab3, "Simulation Mode")
 
-    def setup_tab4(self):
-        tab4 = QWidget()
+    def setup_tab4(self, tab4):
         layout = QVBoxLayout()
         self.text_input = QLineEdit()
-        self.text_input.setPlaceholderText("Enter scenario (e.g., 'P1 waits for P2, P2 waits for P3')")
+        self.text_input.setPlaceholderText("Enter scenario (e.g., 'P1 waits for P2, P2 waits for P3' or 'ring P1..P5')")
         self.text_input.setStyleSheet("QLineEdit { background-color: #FFFFFF; color: #0A1A44; font-size: 16px; border: 1px solid #0A1A44; padding: 5px; }")
         self.text_input.setToolTip("Type a scenario for AI analysis")
         layout.addWidget(self.text_input)
@@ -470,6 +832,18 @@ class DeadlockDetectionAI(QMainWindow):
         self.predict_button.setGraphicsEffect(fix_shadow)
         layout.addWidget(self.predict_button)
 
+        self.history_button = QPushButton("History Report")
+        self.history_button.setStyleSheet(self.button_style("#4682B4"))
+        self.history_button.clicked.connect(self.show_history_report)
+        self.history_button.setToolTip("Deadlock rate, recurring cycles and hot dependencies from detection history")
+        fix_shadow = QGraphicsDropShadowEffect()
+        fix_shadow.setBlurRadius(15)
+        fix_shadow.setXOffset(5)
+        fix_shadow.setYOffset(5)
+        fix_shadow.setColor(QColor(0, 0, 0, 100))
+        self.history_button.setGraphicsEffect(fix_shadow)
+        layout.addWidget(self.history_button)
+
         self.ai_log = QTextEdit()
         self.ai_log.setReadOnly(True)
         self.ai_log.setStyleSheet("QTextEdit { background-color: #F5E6E8; color: #0A1A44; font-family: 'Lilita', 'Helvetica', sans-serif; font-size: 16px; font-weight: bold; border: none; }")
@@ -481,13 +855,11 @@ class DeadlockDetectionAI(QMainWindow):
         self.ai_log.setGraphicsEffect(ai_shadow)
         layout.addWidget(self.ai_log)
         tab4.setLayout(layout)
-        self.tabs.addTab(tab4, "AI Prediction")
 
     def update_chart_tab1(self):
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        self.series1 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if u == p) for p in self.processes]
-        self.series2 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if v == p) for p in self.processes]
-        self.series3 = [1] * self.num_processes
+        if self.canvas_tab1 is None:
+            return
+        self.series1, self.series2, self.series3 = self.analysis(self.deadlock_graph_tab1).series
         self.waiting_on_details = {p: [] for p in self.processes}
         self.waited_by_details = {p: [] for p in self.processes}
         for u, v in self.deadlock_graph_tab1.edges:
@@ -496,121 +868,65 @@ class DeadlockDetectionAI(QMainWindow):
             if v in self.processes:
                 self.waited_by_details[v].append(u)
 
-        self.figure_tab1.clear()
-        ax = self.figure_tab1.add_subplot(111)
-        ax.set_facecolor('#F5F5F5')
-        x = np.arange(len(self.processes))
-        width = 0.2
-        ax.bar(x - width - 0.02, [s * 0.9 for s in self.series1], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
-        ax.bar(x - 0.02, [s * 0.9 for s in self.series2], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
-        ax.bar(x + width - 0.02, [s * 0.9 for s in self.series3], width, color='gray', alpha=0.3, zorder=1, label="_nolegend_")
-        bars1 = ax.bar(x - width, self.series1, width, label="Waiting On", color='#4682B4', edgecolor='black', hatch='//', zorder=2)
-        bars2 = ax.bar(x, self.series2, width, label="Waited By", color='#FF6347', edgecolor='black', hatch='//', zorder=2)
-        bars3 = ax.bar(x + width, self.series3, width, label="Resources Held", color='#3CB371', edgecolor='black', hatch='//', zorder=2)
-        ax.set_xticks(x)
-        ax.set_xticklabels(self.processes)
-        ax.set_ylabel("Number of Dependencies")
-        ax.set_title("Process Dependency Analysis")
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
+        charts.draw_dependency_bars(self.figure_tab1, self.processes, self.series1, self.series2, self.series3)
         self.canvas_tab1.draw()
 
     def update_chart_tab2(self):
-        self.figure_tab2.clear()
-        self.ax = self.figure_tab2.add_subplot(111, projection='3d')
-        self.ax.set_facecolor('#F5F5F5')
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        self.series1 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if u == p) for p in self.processes]
-        self.series2 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if v == p) for p in self.processes]
-        self.series3 = [1] * self.num_processes
-
-        if self.current_graph_type == "3D Bar Plot":
-            x = np.arange(len(self.processes))
-            y = np.zeros(len(self.processes))
-            z1, z2, z3 = self.series1, self.series2, self.series3
-            dx = dy = 0.5
-            self.ax.bar3d(x - 0.2, y, np.zeros(len(z1)), dx, dy, z1, color='#4682B4', label='Waiting On', edgecolor='black', shade=True)
-            self.ax.bar3d(x, y, np.zeros(len(z2)), dx, dy, z2, color='#FF6347', label='Waited By', edgecolor='black', shade=True)
-            self.ax.bar3d(x + 0.2, y, np.zeros(len(z3)), dx, dy, z3, color='#3CB371', label='Resources Held', edgecolor='black', shade=True)
-            for u, v in self.deadlock_graph_tab1.edges:
-                u_idx = self.processes.index(u)
-                v_idx = self.processes.index(v)
-                self.ax.plot([u_idx, v_idx], [0, 0], [z1[u_idx], z2[v_idx]], c='black', alpha=0.5)
-            self.ax.set_xlabel("Processes")
-            self.ax.set_ylabel("Depth (Fixed)")
-            self.ax.set_zlabel("Number of Dependencies")
-            self._add_legend()
-
-        elif self.current_graph_type == "3D Scatter Plot":
-            pos = nx.spring_layout(self.deadlock_graph_tab1, dim=3)
-            nodes = list(self.deadlock_graph_tab1.nodes)
-            x, y, z = [], [], []
-            for node in nodes:
-                x_i, y_i, z_i = pos[node]
-                x.append(x_i)
-                y.append(y_i)
-                z.append(z_i)
-            scatter = self.ax.scatter(x, y, z, c=['red', 'green', 'blue', 'yellow', 'gray', 'purple', 'orange', 'pink', 'brown'][:len(nodes)], s=100)
-            for u, v in self.deadlock_graph_tab1.edges:
-                x = [pos[u][0], pos[v][0]]
-                y = [pos[u][1], pos[v][1]]
-                z = [pos[u][2], pos[v][2]]
-                self.ax.plot(x, y, z, c='black', alpha=0.5)
-            self.ax.set_xlabel("X Coordinate")
-            self.ax.set_ylabel("Y Coordinate")
-            self.ax.set_zlabel("Z Coordinate")
-            self._add_legend()
-
-        elif self.current_graph_type == "3D Surface Plot":
-            x = np.arange(len(self.processes))
-            y = np.zeros(len(self.processes))
-            X, Y = np.meshgrid(x, y)
-            Z = np.array([self.series1])
-            self.ax.plot_surface(X, Y, Z, cmap='viridis', edgecolor='black')
-            for u, v in self.deadlock_graph_tab1.edges:
-                u_idx = self.processes.index(u)
-                v_idx = self.processes.index(v)
-                self.ax.plot([u_idx, v_idx], [0, 0], [self.series1[u_idx], self.series1[v_idx]], c='black', alpha=0.5)
-            self.ax.set_xlabel("Processes")
-            self.ax.set_ylabel("Depth (Fixed)")
-            self.ax.set_zlabel("Dependency Count")
-            self._add_legend()
-
-        elif self.current_graph_type == "3D Circular Layout":
-            theta = np.linspace(0, 2*np.pi, len(self.processes), endpoint=False)
-            x = np.cos(theta)
-            y = np.sin(theta)
-            z = np.zeros(len(self.processes))
-            self.ax.scatter(x, y, z, c=['red', 'green', 'blue', 'yellow', 'gray', 'purple', 'orange', 'pink', 'brown'][:len(self.processes)], s=100)
-            for u, v in self.deadlock_graph_tab1.edges:
-                u_idx = self.processes.index(u)
-                v_idx = self.processes.index(v)
-                self.ax.plot([x[u_idx], x[v_idx]], [y[u_idx], y[v_idx]], [0, 0], c='black', alpha=0.5)
-            self.ax.set_xlabel("X Coordinate")
-            self.ax.set_ylabel("Y Coordinate")
-            self.ax.set_zlabel("Z Coordinate (Fixed)")
-            self._add_legend()
-
-        else:
+        if self.canvas_tab2 is None:
+            return
+        self.series1, self.series2, self.series3 = self.analysis(self.deadlock_graph_tab1).series
+        if self.current_graph_type not in charts.GRAPH_TYPES:
             self.current_graph_type = "3D Bar Plot"
-            self.update_chart_tab2()
-
-        self.ax.set_title(f"{self.current_graph_type} of Tab 1 Dependencies")
+        if self.current_graph_type == charts.HEATMAP:
+            pyramid = self.heatmap_tab2()
+            self.ax = charts.draw_dependency_heatmap(self.figure_tab2, self.deadlock_graph_tab1, self.processes, pyramid, self.heatmap_view)
+        else:
+            self.ax = charts.draw_dependency_3d(self.figure_tab2, self.deadlock_graph_tab1, self.processes, self.current_graph_type)
         self.canvas_tab2.draw()
 
-    def _add_legend(self):
-        legend_ax = self.figure_tab2.add_axes([0.85, 0.05, 0.15, 0.9])
-        legend_ax.axis('off')
-        handles = [
-            plt.Line2D([0], [0], color='#4682B4', lw=10, label='Waiting On'),
-            plt.Line2D([0], [0], color='#FF6347', lw=10, label='Waited By'),
-            plt.Line2D([0], [0], color='#3CB371', lw=10, label='Resources Held'),
-            plt.Line2D([0, 1], [0, 0], color='black', lw=2, label='Dependency Direction')
-        ]
-        legend_ax.legend(handles=handles, loc='center', frameon=True)
+    def heatmap_tab2(self):
+        # Rebuilt only when the graph moves to another version; the view is kept if the size is unchanged.
+        if self.heatmap_version is not self.versions_tab1.head:
+            pyramid = heatmap.AdjacencyPyramid(self.deadlock_graph_tab1, self.processes)
+            if self.heatmap_view is None or self.heatmap_pyramid.n != pyramid.n:
+                self.heatmap_view = heatmap.HeatmapView(pyramid)
+            self.heatmap_view.pyramid = pyramid
+            self.heatmap_pyramid, self.heatmap_version = pyramid, self.versions_tab1.head
+        return self.heatmap_pyramid
+
+    def heatmap_event(self, event):
+        return self.current_graph_type == charts.HEATMAP and self.heatmap_view is not None and event.inaxes is getattr(self, 'ax', None)
+
+    def refresh_heatmap_tab2(self):
+        charts.refresh_heatmap(self.ax, self.heatmap_pyramid, self.heatmap_view)
+        self.canvas_tab2.draw_idle()
+
+    def on_heatmap_scroll(self, event):
+        if self.heatmap_event(event) and event.xdata is not None:
+            self.heatmap_view.zoom(0.8 if event.button == 'up' else 1.25, event.ydata + 0.5, event.xdata + 0.5)
+            self.refresh_heatmap_tab2()
+
+    def on_heatmap_press(self, event):
+        if not self.heatmap_event(event):
+            return
+        if event.dblclick:
+            self.heatmap_view.reset()
+            self.refresh_heatmap_tab2()
+        else:
+            self.heatmap_drag = (event.x, event.y)
+
+    def on_heatmap_drag(self, event):
+        if self.heatmap_drag is None or self.current_graph_type != charts.HEATMAP:
+            return
+        # Pixel deltas to matrix rows/columns; screen y grows upwards while rows grow downwards.
+        view, box = self.heatmap_view, self.ax.bbox
+        dx, dy = event.x - self.heatmap_drag[0], event.y - self.heatmap_drag[1]
+        self.heatmap_drag = (event.x, event.y)
+        view.pan(dy * (view.r1 - view.r0) / box.height, -dx * (view.c1 - view.c0) / box.width)
+        self.refresh_heatmap_tab2()
 
     def show_graph_selection(self):
-        graph_types = ["3D Bar Plot", "3D Scatter Plot", "3D Surface Plot", "3D Circular Layout"]
+        graph_types = charts.GRAPH_TYPES
         combo = QComboBox()
         combo.addItems(graph_types)
         combo.setCurrentText(self.current_graph_type)
@@ -632,355 +948,497 @@ class DeadlockDetectionAI(QMainWindow):
 
     def set_graph_type(self, graph_type):
         self.current_graph_type = graph_type
-        self.update_chart_tab2()
+        self.scheduler.mark_dirty("chart_tab2")
 
     def update_chart_tab3(self):
-        self.figure_tab3.clear()
-        ax = self.figure_tab3.add_subplot(111, projection='3d')
-        ax.set_facecolor('#F5F5F5')
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        
-        for p in self.processes:
-            if p not in self.deadlock_graph_tab3.nodes:
-                self.deadlock_graph_tab3.add_node(p)
-        
-        if self.deadlock_graph_tab3.edges:
-            pos = nx.circular_layout(self.deadlock_graph_tab3)
+        if self.canvas_tab3 is None:
+            return
+        graph = self.displayed_graph_tab3()
+        for p in self.simulation.processes:
+            if p not in graph.nodes:
+                graph.add_node(p)
+        if graph.number_of_nodes() > charts.CONDENSE_ABOVE:
+            summary = self.condensation_tab3(graph).summary(self.condensed_expanded)
+            self.condensed_picks = charts.draw_condensed_network(self.figure_tab3, summary)
         else:
-            theta = np.linspace(0, 2 * np.pi, len(self.processes), endpoint=False)
-            pos = {p: [np.cos(t), np.sin(t)] for p, t in zip(self.processes, theta)}
-        
-        z = [sum(1 for u, v in self.deadlock_graph_tab3.edges if u == p or v == p) for p in self.processes]
-        max_z = max(z) if z and max(z) > 0 else 1
-        node_sizes = [1000 * (z_i / max_z) + 500 for z_i in z]
-        
-        scatter = ax.scatter([pos[p][0] for p in self.processes], [pos[p][1] for p in self.processes], z,
-                            c=['red', 'green', 'blue', 'yellow', 'gray', 'purple', 'orange', 'pink', 'brown'][:self.num_processes], s=node_sizes, alpha=0.7)
-        for u, v in self.deadlock_graph_tab3.edges:
-            u_idx = self.processes.index(u)
-            v_idx = self.processes.index(v)
-            ax.plot([pos[u][0], pos[v][0]], [pos[u][1], pos[v][1]], [z[u_idx], z[v_idx]],
-                    c='black', linewidth=2, alpha=0.8)
-        
-        ax.set_xlabel("X Coordinate")
-        ax.set_ylabel("Y Coordinate")
-        ax.set_zlabel("Dependency Weight")
-        ax.set_title("Dynamic Dependency Network")
+            self.condensed_picks = None
+            charts.draw_dependency_network(self.figure_tab3, graph, self.simulation.processes)
         self.canvas_tab3.draw()
 
+    def displayed_graph_tab3(self):
+        return self.replay_graph if self.replay_graph is not None else self.deadlock_graph_tab3
+
+    def condensation_tab3(self, graph):
+        # The live graph's condensation follows its versions by net deltas, so a simulation step only
+        # re-splits the components it touched; replayed graphs are condensed from scratch.
+        head = self.versions_tab3.head if graph is self.deadlock_graph_tab3 else None
+        cond = self.condensed
+        if cond is None or cond.graph is not graph:
+            cond = condensation.Condensation(graph)
+        elif head is not None and self.condensed_version is not head:
+            try:
+                cond.apply(*self.versions_tab3.changes(self.condensed_version, head))
+            except KeyError:
+                cond.rebuild()
+        if len(cond.comp_of) != graph.number_of_nodes():
+            cond.rebuild()  # nodes added outside the version history, such as the table's padding
+        self.condensed, self.condensed_version = cond, head
+        return cond
+
+    def on_condensed_click(self, event):
+        if self.condensed_picks is None or event.inaxes is None or event.xdata is None:
+            return
+        for x, y, r, group in self.condensed_picks:
+            if (event.xdata - x) ** 2 + (event.ydata - y) ** 2 <= r * r:
+                if group.expanded:
+                    self.condensed_expanded.difference_update(group.members)
+                else:
+                    self.condensed_expanded.add(group.members[0])
+                self.scheduler.mark_dirty("chart_tab3")
+                return
+
     def start_simulation(self):
         self.simulation_timer = QTimer()
         self.simulation_timer.timeout.connect(self.simulate_step)
-        self.deadlock_graph_tab3 = self.get_table_data_tab3()
-        deadlock_type = self.identify_deadlock_type(self.deadlock_graph_tab3)
+        analysis = self.analysis(self.deadlock_graph_tab3)
+        deadlock_type = analysis.type
         if "No Deadlock" in deadlock_type:
-            self.add_sim_message("<span style='color: #FF4500;'><b>No Deadlock Detected.</b></span>")
+            self.add_sim_message("No Deadlock Detected.", Severity.ALERT)
         else:
-            cycle = list(nx.find_cycle(self.deadlock_graph_tab3, orientation='original')) if "Circular Wait" in deadlock_type else []
-            cycle_str = " -> ".join([f"{u} to {v}" for u, v, _ in cycle]) if cycle else "N/A"
-            processes_involved = [p[0] for p in cycle] if cycle else list(self.deadlock_graph_tab3.nodes)
-            self.add_sim_message(f"<span style='color: #FF4500;'><b>Deadlock Detected! Type: {deadlock_type}</b></span>")
-            self.add_sim_message(f"<b>Processes Involved: {', '.join(processes_involved)}</b>")
-            self.add_sim_message(f"<b>Cycle: {cycle_str}</b>")
+            cycle_str = analysis.cycle_str
+            processes_involved = [u for u, _, _ in analysis.cycle] if analysis.cycle else list(self.deadlock_graph_tab3.nodes)
+            self.add_sim_message(f"Deadlock Detected! Type: {deadlock_type}", Severity.ALERT)
+            self.add_sim_message(f"Processes Involved: {', '.join(processes_involved)}")
+            self.add_sim_message(f"Cycle: {cycle_str}")
             method_to_use = self.ai_suggested_method if self.ai_suggested_method else self.recovery_method
-            self.add_sim_message(f"<span style='color: #006400;'><b>Starting simulation with {method_to_use} method...</b></span>")
+            self.start_recording()
+            self.add_sim_message(f"Starting simulation with {method_to_use} method (seed {self.sim_seed}, recording to '{self.recorder.path}')...", Severity.SUCCESS)
             self.simulation_timer.start(1000)
 
     def fetch_ai_recommendation(self):
-        self.deadlock_graph_tab3 = self.get_table_data_tab3()
         deadlock_type = self.identify_deadlock_type(self.deadlock_graph_tab3)
         if "No Deadlock" in deadlock_type:
-            self.add_sim_message("<span style='color: #FF4500;'><b>No Deadlock Detected. No AI suggestion needed.</b></span>")
+            self.add_sim_message("No Deadlock Detected. No AI suggestion needed.", Severity.ALERT)
             return
-        GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "insert_your_api")
-        GEMINI_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-        headers = {"Content-Type": "application/json", "x-goog-api-key": GEMINI_API_KEY}
-        prompt = f"Given a deadlock of type '{deadlock_type}', recommend the best resolution method (Preemption, Random Kill, or Resource Timeout) in a concise point-wise format."
-        data = {"contents": [{"parts": [{"text": prompt}]}]}
         try:
-            response = requests.post(GEMINI_ENDPOINT, headers=headers, json=data, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            recommendation = result["candidates"][0]["content"]["parts"][0]["text"]
-            lines = [line.strip() for line in recommendation.split('\n') if line.strip()]
-            method = next((m for m in ["Resource Timeout", "Preemption", "Random Kill"] 
-                          if any(m.lower() in line.lower() for line in lines)), "Preemption")
-            explanation = [line.replace('*', '').replace('-', '').strip() 
-                          for line in lines if not any(m.lower() in line.lower() for m in ["preemption", "random kill", "resource timeout"])]
-            self.ai_suggested_method = method
-            self.add_sim_message(f"<span style='color: #006400;'><b>AI Recommended Method: {method}</b></span>")
-            self.add_sim_message("<b>Reasons:</b><br>" + "<br>".join(f"- {exp}" for exp in explanation[:3]))
-            self.add_sim_message("<span style='color: #FF4500;'><b>Click 'Start Simulation' to use this method.</b></span>")
-        except requests.exceptions.RequestException as e:
-            self.add_sim_message(f"<span style='color: #FF4500;'><b>API Error: {str(e)}. Falling back to selected method.</b></span>")
+            recommendation = self.ai_backend.recommend(ai_backends.Features(self.deadlock_graph_tab3))
+        except ai_backends.BackendError as e:
+            self.add_sim_message(f"API Error: {str(e)}. Falling back to selected method.", Severity.ALERT)
+            return
+        self.ai_suggested_method = recommendation.method
+        self.add_sim_message(f"AI Recommended Method: {recommendation.method} ({recommendation.backend}, confidence {recommendation.confidence:.0%})", Severity.SUCCESS)
+        self.add_sim_message("Reasons:\n" + "\n".join(f"- {reason}" for reason in recommendation.reasons[:3]))
+        self.add_sim_message("Click 'Start Simulation' to use this method.", Severity.ALERT)
 
     def stop_simulation(self):
         if hasattr(self, 'simulation_timer'):
             self.simulation_timer.stop()
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def start_recording(self):
+        # A fresh seed per run, stored in the recording, makes every run reproducible.
+        if self.recorder is not None:
+            self.recorder.close()
+        self.sim_seed = random.SystemRandom().randrange(2 ** 32)
+        self.sim_rng = random.Random(self.sim_seed)
+        path = exporter.unique_path(".", "simulation", "dlsim")
+        self.recorder = SimulationRecorder(path, self.deadlock_graph_tab3, self.sim_seed)
+        self.set_replay(None)
+        self.replay_graph = None
+        self.update_replay_slider()
+
+    def record_sim_nodes(self, added, removed):
+        if self.recorder is not None:
+            self.sim_changes[0].extend(added)
+            self.sim_changes[1].extend(removed)
+
+    def record_sim_edge(self, u, v, present):
+        if self.recorder is not None:
+            self.sim_changes[2 if present else 3].append((u, v))
+
+    def record_sim_step(self):
+        if self.recorder is None:
+            return
+        changes, self.sim_changes = self.sim_changes, ([], [], [], [])
+        self.recorder.step(*changes)
+        self.update_replay_slider()
+
+    def update_replay_slider(self):
+        if self.replay_slider is None or self.replay is not None and self.replay.path != self.recorder.path:
+            return
+        live = self.replay_slider.value() == self.replay_slider.maximum()
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setMaximum(self.recorder.steps)
+        if live:
+            self.replay_slider.setValue(self.recorder.steps)
+        self.replay_slider.blockSignals(False)
+        if live:
+            self.replay_label.setText(f"Replay: live ({self.recorder.steps} steps)")
+
+    def scrub_replay(self, step):
+        # With no recording opened from disk, the slider scrubs the run being recorded; its last step is the live graph.
+        following = self.replay is None or self.recorder is not None and self.replay.path == self.recorder.path
+        if following:
+            if self.recorder is None:
+                return
+            if step >= self.recorder.steps:
+                self.replay_graph = None
+                self.replay_label.setText(f"Replay: live ({self.recorder.steps} steps)")
+                self.scheduler.mark_dirty("table_tab3", "chart_tab3")
+                return
+            if self.replay is None or self.replay.steps != self.recorder.steps:
+                self.set_replay(self.recorder.replay(self.replay))
+        self.replay_graph = self.replay.graph_at(step)
+        self.replay_label.setText(f"Replay: step {step} / {self.replay.steps}")
+        self.scheduler.mark_dirty("table_tab3", "chart_tab3")
+
+    def set_replay(self, replay):
+        if self.replay is not None and self.replay is not replay:
+            self.replay.close()
+        self.replay = replay
+
+    def open_recording(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Simulation Recording", "", "Simulation recordings (*.dlsim)")
+        if not path:
+            return
+        try:
+            replay = SimulationReplay(path)
+        except (OSError, RecordingError) as e:
+            self.add_sim_message(f"Could not open recording: {e}", Severity.ALERT)
+            return
+        self.stop_simulation()
+        self.set_replay(replay)
+        self.add_sim_message(f"Loaded '{os.path.basename(path)}': {replay.steps} steps, seed {replay.seed}.", Severity.SUCCESS)
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setRange(0, replay.steps)
+        self.replay_slider.setValue(0)
+        self.replay_slider.blockSignals(False)
+        self.scrub_replay(0)
 
     def clear_sim_output(self):
         self.sim_output.clear()
 
     def simulate_step(self):
-        if "No Deadlock" not in self.identify_deadlock_type(self.deadlock_graph_tab3):
+        before = self.versions_tab3.head
+        analysis = self.analysis(self.deadlock_graph_tab3)
+        if analysis.deadlocked:
             try:
-                cycle = list(nx.find_cycle(self.deadlock_graph_tab3, orientation='original'))
+                cycle = analysis.first_cycle
                 method_to_use = self.ai_suggested_method if self.ai_suggested_method else self.recovery_method
-                if method_to_use == "Preemption" and cycle:
-                    process_to_remove = cycle[0][0]
-                    self.deadlock_graph_tab3.remove_node(process_to_remove)
-                    self.add_sim_message(f"<span style='color: #006400;'><b>Deadlock Resolved! Preempted process {process_to_remove} using {method_to_use}.</b></span>")
-                elif method_to_use == "Random Kill" and self.deadlock_graph_tab3.nodes:
-                    process_to_remove = random.choice(list(self.deadlock_graph_tab3.nodes))
-                    self.deadlock_graph_tab3.remove_node(process_to_remove)
-                    self.add_sim_message(f"<span style='color: #006400;'><b>Deadlock Resolved! Randomly killed process {process_to_remove} using {method_to_use}.</b></span>")
-                elif method_to_use == "Resource Timeout" and cycle:
-                    edge_to_remove = random.choice(cycle)[:2]
-                    if (edge_to_remove[0], edge_to_remove[1]) in self.deadlock_graph_tab3.edges:
-                        self.deadlock_graph_tab3.remove_edge(*edge_to_remove)
-                        self.add_sim_message(f"<span style='color: #006400;'><b>Deadlock Resolved! Timed out dependency {edge_to_remove[0]} -> {edge_to_remove[1]} using {method_to_use}.</b></span>")
+                if not cycle:
+                    self.add_sim_message("Deadlock Resolved! No cycle remaining.", Severity.SUCCESS)
+                elif method_to_use == "Preemption":
+                    plan = recovery.plan_victims(self.deadlock_graph_tab3, self.recovery_costs())
+                    victims = ", ".join(plan.victims)
+                    self.versions_tab3.record(f"Preempt {victims}", removed_nodes=plan.victims)
+                    self.add_sim_message(f"Deadlock Resolved! Preempted process(es) {victims} using {method_to_use} (total cost {plan.cost:g}).", Severity.SUCCESS)
+                elif method_to_use == "Random Kill":
+                    # Only processes inside a deadlocked group are candidates; killing any other one frees nothing.
+                    deadlocked = recovery.deadlocked_components(recovery.successor_sets(self.deadlock_graph_tab3))
+                    process_to_remove = self.sim_rng.choice(sorted(set().union(*deadlocked), key=deadlock_core.process_sort_key))
+                    self.versions_tab3.remove_node(process_to_remove, f"Kill {process_to_remove}")
+                    self.add_sim_message(f"Deadlock Resolved! Randomly killed process {process_to_remove} using {method_to_use}.", Severity.SUCCESS)
+                elif method_to_use == "Resource Timeout":
+                    costs = self.recovery_costs()
+                    plan = recovery.plan_timeouts(self.deadlock_graph_tab3, lambda u, v: costs.get(u, 1))
+                    timed_out = ", ".join(f"{u} -> {v}" for u, v in plan.edges)
+                    self.versions_tab3.record(f"Time out {timed_out}", removed_edges=plan.edges)
+                    self.add_sim_message(f"Deadlock Resolved! Timed out dependencies {timed_out} using {method_to_use} (total cost {plan.cost:g}).", Severity.SUCCESS)
                 else:
-                    self.add_sim_message("<span style='color: #FF4500;'><b>No valid cycle or node to resolve deadlock.</b></span>")
-            except nx.NetworkXNoCycle:
-                self.add_sim_message("<span style='color: #006400;'><b>Deadlock Resolved! No cycle remaining.</b></span>")
+                    self.add_sim_message("No valid cycle or node to resolve deadlock.", Severity.ALERT)
             except Exception as e:
-                self.add_sim_message(f"<span style='color: #FF4500;'><b>Error resolving deadlock: {e}</b></span>")
+                self.add_sim_message(f"Error resolving deadlock: {e}", Severity.ALERT)
         else:
-            self.add_sim_message("<span style='color: #FF4500;'><b>No Deadlock Remaining.</b></span>")
+            self.add_sim_message("No Deadlock Remaining.", Severity.ALERT)
             self.stop_simulation()
-        self.update_table_tab3()
-        self.update_chart_tab3()
+        if self.versions_tab3.head is before:
+            self.record_sim_step()  # a tick that changed nothing is still a step of the run
 
     def update_table_tab3(self):
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        for i in range(self.num_processes):
-            for j in range(self.num_processes):
-                item = QTableWidgetItem("1" if (self.processes[i], self.processes[j]) in self.deadlock_graph_tab3.edges else "0")
-                self.table_tab3.setItem(i, j, item)
+        if self.table_tab3 is None:
+            return
+        self.table_binding_tab3.reload()
 
     def predict_deadlock(self):
         scenario = self.text_input.text()
         current_state = {f"{u}->{v}": 1 for u, v in self.deadlock_graph_tab1.edges}
         if current_state:
-            self.history.append({"state": current_state, "label": 1 if self.identify_deadlock_type(self.deadlock_graph_tab1) != "No Deadlock" else 0, "timestamp": str(datetime.now())})
+            self.record_history({"state": current_state, "label": 1 if self.identify_deadlock_type(self.deadlock_graph_tab1) != "No Deadlock" else 0, "timestamp": str(datetime.now())})
             try:
                 with open("deadlock_history.json", "w") as f:
                     json.dump(self.history, f, indent=2)
             except Exception as e:
                 self.ai_log.append(f"<b>Error saving history:</b> {str(e)}")
 
-        GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "insert_your_api")
-        GEMINI_ENDPOINT = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
-        
-        headers = {"Content-Type": "application/json", "x-goog-api-key": GEMINI_API_KEY}
-        prompt = f"Analyze this scenario: '{scenario}' and historical data: {self.history}. Predict if a deadlock is likely and suggest prevention strategies. If the scenario is a question, provide a clear explanation."
-        data = {"contents": [{"parts": [{"text": prompt}]}]}
+        # Snapshots, since the stream reads them on the AI pool while the scenario below edits the graph.
+        graph = nx.DiGraph(self.deadlock_graph_tab1)
+        self.ai_pool.submit(self.stream_prediction, scenario, list(self.history), graph)
+
+        if scenario:
+            warnings = []
+            edges = scenario_dsl.compile_text(scenario, strict=False, warnings=warnings,
+                                              max_edges=scenario_dsl.INTERACTIVE_MAX_EDGES)
+            for e in warnings:
+                self.ai_log.append(f"<b>Warning:</b> {e}")
+            known = set(self.processes)
+            accepted = [(u, v) for u, v in edges if u in known and v in known]
+            index = self.reachability_tab1()
+            closing = [f"{u} -> {v}" for u, v in accepted if index.would_close_cycle(u, v)]
+            if closing:
+                self.ai_log.append(f"<b>Warning:</b> {', '.join(closing)} would close a wait cycle with the current dependencies.")
+            self.versions_tab1.add_edges(accepted, "Scenario")
+            if len(accepted) < len(edges):
+                self.ai_log.append(f"<b>Warning:</b> {len(edges) - len(accepted)} dependencies reference processes outside P1..P{self.num_processes}; increase Process Size to include them.")
+
+    def stream_prediction(self, scenario, history, graph):
+        # Runs on the AI pool; formatted fragments reach ai_log through a queued signal as chunks arrive.
+        formatter = ai_backends.PredictionFormatter(scenario)
+        self.prediction_fragment.emit(formatter.header(), True)
         try:
-            response = requests.post(GEMINI_ENDPOINT, headers=headers, json=data, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            prediction = result["candidates"][0]["content"]["parts"][0]["text"]
-        except requests.exceptions.HTTPError as http_err:
-            self.ai_log.append(f"<b>HTTP Error:</b> {str(http_err)} - Please check your API key and endpoint.")
-        except requests.exceptions.RequestException as req_err:
-            self.ai_log.append(f"<b>Request Error:</b> {str(req_err)} - Check your internet connection or API service.")
-        except (KeyError, IndexError) as parse_err:
-            self.ai_log.append(f"<b>Parsing Error:</b> {str(parse_err)} - Invalid response format from API.")
+            for chunk in self.ai_backend.predict_stream(scenario, history, graph):
+                fragment = formatter.feed(chunk)
+                if fragment:
+                    self.prediction_fragment.emit(fragment, False)
+            self.prediction_fragment.emit(formatter.finish(), False)
+        except ai_backends.BackendError as e:
+            self.prediction_fragment.emit(formatter.finish() + f"<br><b>AI Error:</b> {str(e)}", False)
         except Exception as e:
-            self.ai_log.append(f"<b>Unexpected Error:</b> {str(e)} - Contact support if persistent.")
-        else:
-            formatted_prediction = "<b><u>AI Prediction Result</u></b><br>"
-            formatted_prediction += f"<br><b style='color: #0A1A44;'>Scenario:</b> {scenario}<br>"
-            lines = prediction.split('\n')
-            current_section = ""
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                if "likelihood of deadlock" in line.lower():
-                    current_section = "prediction"
-                    formatted_prediction += f"<br><b style='color: #FF6F61;'>Prediction:</b><br>"
-                elif "prevention strategies" in line.lower():
-                    current_section = "prevention"
-                    formatted_prediction += f"<br><b style='color: #006400;'>Prevention Strategies:</b><br>"
-                elif "improving prediction" in line.lower():
-                    current_section = "improving"
-                    formatted_prediction += f"<br><b style='color: #4682B4;'>Improving Prediction:</b><br>"
-                elif "conclusion" in line.lower():
-                    current_section = "conclusion"
-                    formatted_prediction += f"<br><b style='color: #4682B4;'>Conclusion:</b><br>"
-                elif "analysis" in line.lower():
-                    current_section = "analysis"
-                    formatted_prediction += f"<br><b style='color: #26A69A;'>Analysis:</b><br>"
-                elif "explanation" in line.lower() or "what is" in scenario.lower():
-                    current_section = "explanation"
-                    formatted_prediction += f"<br><b style='color: #26A69A;'>Explanation:</b><br>"
-                else:
-                    clean_line = line.replace('- -', '-').replace('*-', '-').replace('*', '').strip()
-                    if clean_line.startswith('-'):
-                        formatted_prediction += f"- {clean_line[1:].strip()}<br>"
-                    else:
-                        formatted_prediction += f"{clean_line}<br>"
+            self.prediction_fragment.emit(formatter.finish() + f"<br><b>Unexpected Error:</b> {str(e)} - Contact support if persistent.", False)
 
-            self.ai_log.append(formatted_prediction)
-
-        if scenario:
-            self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-            parts = scenario.split(", ")
-            for part in parts:
-                if "waits for" in part:
-                    try:
-                        p1, p2 = part.split(" waits for ")
-                        p1, p2 = p1.strip(), p2.strip()
-                        if p1 in self.processes and p2 in self.processes:
-                            self.deadlock_graph_tab1.add_edge(p1, p2)
-                    except ValueError:
-                        self.ai_log.append(f"<b>Warning:</b> Invalid format in '{part}', expected 'P1 waits for P2'")
-            self.update_chart_tab1()
-            self.update_table_tab3()
-            self.update_chart_tab2()
+    def append_prediction_fragment(self, fragment, new_block):
+        if new_block:
+            self.ai_log.append(fragment)
+            return
+        if fragment:
+            cursor = self.ai_log.textCursor()
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertHtml(fragment)
+            self.ai_log.ensureCursorVisible()
 
     def export_graph(self):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"deadlock_graph_{timestamp}.png"
-        self.figure_tab1.savefig(filename)
-        self.add_message(f"Graph exported as '{filename}'")
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Export Graph")
+        dialog.setMinimumSize(300, 200)
+        layout = QVBoxLayout()
+
+        label = QLabel("Format:")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        layout.addWidget(label)
+        format_combo = QComboBox()
+        format_combo.addItems([fmt.upper() for fmt in exporter.FIGURE_FORMATS])
+        layout.addWidget(format_combo)
+
+        label = QLabel("Charts:")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        layout.addWidget(label)
+        chart_combo = QComboBox()
+        chart_combo.addItems(["All Charts"] + [title for title, _ in exporter.CHART_KINDS.values()])
+        layout.addWidget(chart_combo)
+
+        history_check = QCheckBox(f"Also export every history snapshot ({len(self.history)})")
+        history_check.setStyleSheet("color: #0A1A44;")
+        layout.addWidget(history_check)
+
+        ok_button = QPushButton("OK")
+        ok_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        ok_button.clicked.connect(lambda: (self.start_graph_export(format_combo.currentText().lower(), chart_combo.currentIndex(), history_check.isChecked()), dialog.close()))
+        layout.addWidget(ok_button)
+
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        dialog.exec()
+
+    def start_graph_export(self, fmt, chart_index, include_history):
+        kinds = list(exporter.CHART_KINDS)
+        if chart_index > 0:
+            kinds = [kinds[chart_index - 1]]
+        jobs = self.exporter.export_charts(self.deadlock_graph_tab1, self.processes, kinds, fmt, self.current_graph_type)
+        if include_history:
+            jobs += self.exporter.export_history(self.history, kinds, fmt, self.current_graph_type)
+        self.add_message(f"Exporting {len(jobs)} chart{'s' if len(jobs) != 1 else ''} as {fmt.upper()} in the background...")
 
     def export_values(self):
-        import csv
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dependency_values_{timestamp}.csv"
-        with open(filename, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([""] + self.processes)
-            for i, row in enumerate(range(self.num_processes)):
-                data = [f"P{i+1}"] + [self.table_tab1.item(row, col).text() if self.table_tab1.item(row, col) else "0" for col in range(self.num_processes)]
-                writer.writerow(data)
-        self.add_message(f"Values exported as '{filename}'")
-
-    def add_message(self, msg):
-        if "System initialized" in msg:
-            formatted_msg = f'<b><u>{msg}</u></b>'
-        elif "No Deadlock Detected" in msg or "Deadlock Detected" in msg or "No Deadlock Remaining" in msg or "ML Analysis" in msg:
-            formatted_msg = f'<span style="color: #FF4500;"><b>{msg}</b></span>'
-        elif "Deadlock Resolved" in msg:
-            formatted_msg = f'<span style="color: #006400;"><b>{msg}</b></span>'
-        elif "Process" in msg and ("Waited By" in msg or "Waiting On" in msg):
-            formatted_msg = f'<span style="color: #0A1A44;">{msg}</span>'
-        else:
-            formatted_msg = msg
-        self.message_log.append(f'<span style="font-family: \'Lilita\', \'Helvetica\', sans-serif; font-size: 16px; font-weight: bold;">{formatted_msg}</span>')
-        self.message_log.ensureCursorVisible()
-
-    def add_sim_message(self, msg):
-        if "System initialized" in msg:
-            formatted_msg = f'<b><u>{msg}</u></b>'
-        elif "No Deadlock Detected" in msg or "Deadlock Detected" in msg or "No Deadlock Remaining" in msg or "Okay, now let's fix this deadlock" in msg:
-            formatted_msg = f'<span style="color: #FF4500;"><b>{msg}</b></span>'
-        elif "Deadlock Resolved" in msg:
-            formatted_msg = f'<span style="color: #006400;"><b>{msg}</b></span>'
-        elif "Process" in msg and ("Waited By" in msg or "Waiting On" in msg):
-            formatted_msg = f'<span style="color: #0A1A44;">{msg}</span>'
-        else:
-            formatted_msg = msg
-        self.sim_output.append(f'<span style="font-family: \'Lilita\', \'Helvetica\', sans-serif; font-size: 16px; font-weight: bold;">{formatted_msg}</span>')
-        self.sim_output.ensureCursorVisible()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Export Values")
+        dialog.setMinimumSize(300, 150)
+        layout = QVBoxLayout()
 
-    def get_table_data_tab1(self):
-        graph = nx.DiGraph()
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        for i in range(self.num_processes):
-            for j in range(self.num_processes):
-                item = self.table_tab1.item(i, j)
-                if item and item.text() == "1":
-                    graph.add_edge(self.processes[i], self.processes[j])
-        return graph
-
-    def get_table_data_tab3(self):
-        graph = nx.DiGraph()
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        for i in range(self.num_processes):
-            for j in range(self.num_processes):
-                item = self.table_tab3.item(i, j)
-                if item and item.text() == "1":
-                    graph.add_edge(self.processes[i], self.processes[j])
-        return graph
+        label = QLabel("Format:")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        layout.addWidget(label)
+        format_combo = QComboBox()
+        format_combo.addItems(["CSV Matrix", "Edge List", "Compressed NumPy (.npz)", "Wait-For Graph (.wfg)"])
+        layout.addWidget(format_combo)
 
-    def analyze_ml_deadlock(self):
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        self.series1 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if u == p) for p in self.processes]  # Waiting On
-        self.series2 = [sum(1 for u, v in self.deadlock_graph_tab1.edges if v == p) for p in self.processes]  # Waited By
-        self.series3 = [1] * self.num_processes  # Resources Held
-        try:
-            cycle = list(nx.find_cycle(self.deadlock_graph_tab1, orientation='original'))
-            cycle_nodes = set([n for edge in cycle for n in edge[:2]])
-            cycle_feature = [1 if p in cycle_nodes else 0 for p in self.processes]
-        except nx.NetworkXNoCycle:
-            cycle_feature = [0] * self.num_processes
+        ok_button = QPushButton("OK")
+        ok_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        ok_button.clicked.connect(lambda: (self.start_values_export(exporter.MATRIX_FORMATS[format_combo.currentIndex()]), dialog.close()))
+        layout.addWidget(ok_button)
 
-        X = np.array([[w, wb, r, c] for w, wb, r, c in zip(self.series1, self.series2, self.series3, cycle_feature)])
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        dialog.exec()
 
-        kmeans = KMeans(n_clusters=2, random_state=42)
-        clusters = kmeans.fit_predict(X)
+    def start_values_export(self, fmt):
+        self.exporter.export_matrix(self.deadlock_graph_tab1, self.processes, fmt)
+        self.add_message(f"Exporting dependency values as {fmt} in the background...")
 
-        risky_processes = [self.processes[i] for i in range(len(clusters)) if cycle_feature[i] == 1]
+    def import_graph(self):
+        # One file loads into the current workspace; several become one workspace each, then compared side by side.
+        paths, _ = QFileDialog.getOpenFileNames(self, "Import Wait-For Graphs", "", graph_io.FILE_FILTER)
+        if not paths:
+            return
+        batch = len(paths) > 1
+        if batch:
+            self.pending_imports += len(paths)
+            self.add_message(f"Importing {len(paths)} graphs into new workspaces in the background...")
+        else:
+            self.add_message(f"Importing '{os.path.basename(paths[0])}' in the background...")
+        for path in paths:
+            self.import_pool.submit(self.load_imported_graph, path, batch)
 
-        if risky_processes:
-            message = f"ML Analysis: Potential deadlock risk detected in processes {', '.join(risky_processes)} due to cycle involvement."
+    def load_imported_graph(self, path, batch=False):
+        # Runs on the import pool: parsing and the array-based check never touch the Qt widgets.
+        start = time.perf_counter()
+        try:
+            graph = graph_io.load(path)
+            detection = graph.detect()
+        except (OSError, MemoryError, graph_io.GraphFormatError) as e:
+            self.import_finished.emit((path, None, str(e), 0.0, batch))
         else:
-            message = "ML Analysis: No significant deadlock risk detected based on clustering."
+            self.import_finished.emit((path, graph, detection, time.perf_counter() - start, batch))
+
+    def finish_import(self, result):
+        batch = result[4]
+        self.load_import(*result[:4], batch)
+        if batch:
+            self.pending_imports -= 1
+            if self.pending_imports == 0:
+                self.compare_workspaces()
+
+    def load_import(self, path, graph, detection, seconds, batch):
+        name = os.path.basename(path)
+        if graph is None:
+            self.add_message(f"Import of '{name}' failed: {detection}", Severity.ALERT)
+            return
+        self.add_message(f"Imported {graph.n} processes and {graph.edges} dependencies from '{name}' in {seconds:.2f} s.")
+        self.add_message(detection.describe(), Severity.ALERT if detection.deadlocked else Severity.SUCCESS)
+        if not 0 < graph.n <= 9:
+            self.add_message("The table holds 1-9 processes, so this graph was checked without loading it into the table.", Severity.DETAIL)
+            return
+        names = graph.process_names()
+        imported = graph.to_networkx()
+        if graph.names is not None:
+            imported = nx.relabel_nodes(imported, {p: f"P{i+1}" for i, p in enumerate(names)})
+            self.add_message("Renamed " + ", ".join(f"{p} -> P{i+1}" for i, p in enumerate(names)), Severity.DETAIL)
+        if batch:
+            workspace = self.add_workspace(os.path.splitext(name)[0], graph.n)
+            with workspace.risk.bulk():
+                workspace.model.versions.commit(imported, f"Import {name}")
+            self.add_message(f"Opened as workspace '{workspace.name}'.", Severity.DETAIL)
+            return
+        self.resize_system(graph.n)
+        with self.workspace.risk.bulk():
+            self.versions_tab1.commit(imported, f"Import {name}")
+
+    def record_history(self, record):
+        self.history.append(record)
+        if self.history_stats is not None:
+            self.history_stats.append(record)
+
+    def show_history_report(self):
+        if self.history_stats is None:
+            self.history_stats = history_index.HistoryIndex(self.history)
+        dialog = QDialog(self)
+        dialog.setWindowTitle("History Report")
+        dialog.setMinimumSize(560, 480)
+        layout = QVBoxLayout()
 
-        self.add_message(message)
+        label = QLabel("Period:")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        layout.addWidget(label)
+        periods = [("Last 24 hours", timedelta(hours=24), timedelta(hours=1)), ("Last 7 days", timedelta(days=7), timedelta(days=1)),
+                   ("Last 30 days", timedelta(days=30), timedelta(days=1)), ("All time", None, timedelta(weeks=1))]
+        period_combo = QComboBox()
+        period_combo.addItems([name for name, _, _ in periods])
+        period_combo.setCurrentIndex(1)
+        layout.addWidget(period_combo)
+
+        report = QTextEdit()
+        report.setReadOnly(True)
+        report.setStyleSheet("QTextEdit { background-color: #FFFFFF; color: #0A1A44; font-family: monospace; font-size: 13px; }")
+        layout.addWidget(report)
+
+        def refresh(index):
+            _, last, every = periods[index]
+            report.setPlainText(self.history_stats.report(datetime.now() - last if last else None, 10, every))
+        period_combo.currentIndexChanged.connect(refresh)
+        refresh(period_combo.currentIndex())
+
+        close_button = QPushButton("Close")
+        close_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        close_button.clicked.connect(dialog.close)
+        layout.addWidget(close_button)
 
-    def identify_deadlock_type(self, graph):
-        if not graph or not graph.edges:
-            return "No Deadlock"
-        
-        edges = list(graph.edges)
-        edges_set = set(edges)
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-
-        # Check for Mutual Exclusion (self-loops)
-        has_self_loop = any(u == v for u, v in edges)
-        if has_self_loop:
-            return "Mutual Exclusion Deadlock (Self-loop detected)"
-
-        # Check for Circular Wait (cycles in the graph)
-        try:
-            cycle = nx.find_cycle(graph, orientation="original")
-            if cycle:
-                return "Circular Wait Deadlock"
-        except nx.NetworkXNoCycle:
-            pass
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        dialog.exec()
 
-        # Check for No Preemption (bidirectional dependencies)
-        has_bidirectional = any((v, u) in edges_set for u, v in edges if u != v)
-        if has_bidirectional:
-            return "No Preemption Deadlock"
+    def add_message(self, msg, severity=Severity.INFO):
+        self.message_log.log(msg, severity)
 
-        return "No Deadlock"
+    def add_sim_message(self, msg, severity=Severity.INFO):
+        self.sim_output.log(msg, severity)
+
+    def analyze_ml_deadlock(self):
+        analysis = self.analysis(self.deadlock_graph_tab1)
+        self.series1, self.series2, self.series3 = analysis.series
+        risky_processes, message = analysis.ml_risk()
+        self.add_message(message, Severity.ALERT)
+        # The snapshot above cannot see a trend; the streaming scorer reports how contention has been moving.
+        self.add_message("Streaming risk: " + self.workspace.risk.risk().describe(), Severity.DETAIL)
+
+    def analysis(self, graph):
+        # Memoized by graph fingerprint: a matrix seen before is not classified or clustered again.
+        model = self.simulation if graph is self.deadlock_graph_tab3 else self.detection
+        return self.analyses.get(graph, model.processes)
+
+    def identify_deadlock_type(self, graph):
+        return self.analysis(graph).type
+
+    def reachability_tab1(self):
+        # Rebuilt only when the graph moves to another version.
+        if self.reach_version is not self.versions_tab1.head:
+            self.reach_index = reachability.ReachabilityIndex(self.deadlock_graph_tab1)
+            self.reach_version = self.versions_tab1.head
+        return self.reach_index
 
     def detect_deadlock_tab1(self):
-        self.deadlock_graph_tab1 = self.get_table_data_tab1()
-        if len(self.deadlock_graph_tab1.nodes) == 0:
+        if self.deadlock_graph_tab1.number_of_edges() == 0:
             self.add_message("No valid process dependencies found.")
-            self.update_table_tab1()
             return
 
-        deadlock_type = self.identify_deadlock_type(self.deadlock_graph_tab1)
+        analysis = self.analysis(self.deadlock_graph_tab1)
+        deadlock_type = analysis.type
         self.analyze_ml_deadlock()
-        matrix = [[self.table_tab1.item(i, j).text() if self.table_tab1.item(i, j) else "0" for j in range(self.num_processes)] for i in range(self.num_processes)]
+        self.add_message(self.analyses.describe(), Severity.DETAIL)
+        matrix = self.detection.matrix()
         if "No Deadlock" in deadlock_type:
-            self.history.append({"matrix": matrix, "label": 0, "timestamp": str(datetime.now())})
-            self.add_message("No Deadlock Detected.")
+            self.record_history({"matrix": matrix, "label": 0, "timestamp": str(datetime.now())})
+            self.add_message("No Deadlock Detected.", Severity.ALERT)
         else:
-            cycle = list(nx.find_cycle(self.deadlock_graph_tab1, orientation='original')) if "Circular Wait" in deadlock_type else []
-            cycle_str = " -> ".join([f"{u} to {v}" for u, v, _ in cycle]) if cycle else "N/A"
-            processes_involved = [p[0] for p in cycle] if cycle else [n for n in self.deadlock_graph_tab1.nodes if any(n in edge for edge in self.deadlock_graph_tab1.edges)]
-            explanation = f"Deadlock Detected! Type: {deadlock_type}<br>Processes Involved: {', '.join(processes_involved)}<br>Cycle: {cycle_str}"
-            self.add_message(explanation)
+            cycle_str = analysis.cycle_str
+            processes_involved = analysis.involved
+            explanation = f"Deadlock Detected! Type: {deadlock_type}\nProcesses Involved: {', '.join(processes_involved)}\nCycle: {cycle_str}"
+            self.add_message(explanation, Severity.ALERT)
+            index = self.reachability_tab1()
+            blockers = index.top_blockers(5)
+            if blockers:
+                self.add_message("Top blockers: " + ", ".join(f"{p} ({count} blocked)" for p, count in blockers))
+            self.add_message(f"Longest wait chain ({index.chain_length()} processes): {reachability.format_chain(index.longest_chain())}", Severity.DETAIL)
             self.highlight_deadlock_tab1(processes_involved)
-            self.history.append({"matrix": matrix, "label": 1, "cycle": cycle_str, "timestamp": str(datetime.now())})
+            self.record_history({"matrix": matrix, "label": 1, "cycle": cycle_str, "timestamp": str(datetime.now())})
 
         try:
             with open("deadlock_history.json", "w") as f:
@@ -988,17 +1446,12 @@ class DeadlockDetectionAI(QMainWindow):
         except Exception as e:
             self.add_message(f"Error saving history: {str(e)}")
 
-        self.update_table_tab1()
-        self.update_chart_tab1()
-        self.update_chart_tab2()
-
     def show_bankers_config(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Configure Banker's Algorithm")
         dialog.setMinimumSize(400, 600)  # Increased size for better visibility
         layout = QGridLayout()
 
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
         resources = ["R1", "R2", "R3"]
         available = [QSpinBox() for _ in range(3)]
         max_demand = [[QSpinBox() for _ in range(3)] for _ in range(self.num_processes)]
@@ -1021,7 +1474,7 @@ class DeadlockDetectionAI(QMainWindow):
             layout.addWidget(label, i + 5, 0)
             for j in range(3):
                 max_demand[i][j].setRange(0, 10)
-                max_demand[i][j].setValue(self.max_demand[i][j])
+                max_demand[i][j].setValue(self.workspace.max_demand[i][j])
                 max_demand[i][j].setStyleSheet("color: black; background-color: white;")
                 layout.addWidget(max_demand[i][j], i + 5, j + 1)
 
@@ -1032,7 +1485,7 @@ class DeadlockDetectionAI(QMainWindow):
             layout.addWidget(label, i + 6 + self.num_processes, 0)
             for j in range(3):
                 allocation[i][j].setRange(0, 10)
-                allocation[i][j].setValue(self.allocation[i][j])
+                allocation[i][j].setValue(self.workspace.allocation[i][j])
                 allocation[i][j].setStyleSheet("color: black; background-color: white;")
                 layout.addWidget(allocation[i][j], i + 6 + self.num_processes, j + 1)
 
@@ -1045,39 +1498,71 @@ class DeadlockDetectionAI(QMainWindow):
         dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
         dialog.exec()
 
+    def recovery_costs(self):
+        return recovery.process_costs(self.processes, self.workspace.allocation, self.workspace.process_priority, self.workspace.process_work)
+
+    def show_recovery_costs(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Recovery Costs")
+        dialog.setMinimumSize(400, 300)
+        layout = QGridLayout()
+
+        priority = [QSpinBox() for _ in range(self.num_processes)]
+        work = [QSpinBox() for _ in range(self.num_processes)]
+        for j, title in enumerate(["Process", "Priority", "Work Done", "Resources Held"]):
+            label = QLabel(title)
+            label.setStyleSheet("color: black; font-weight: bold;")
+            layout.addWidget(label, 0, j)
+        for i, p in enumerate(self.processes):
+            label = QLabel(p)
+            label.setStyleSheet("color: black; font-weight: bold;")
+            layout.addWidget(label, i + 1, 0)
+            priority[i].setRange(0, 100)
+            priority[i].setValue(self.workspace.process_priority.get(p, 1))
+            priority[i].setStyleSheet("color: black; background-color: white;")
+            layout.addWidget(priority[i], i + 1, 1)
+            work[i].setRange(0, 1000)
+            work[i].setValue(self.workspace.process_work.get(p, 0))
+            work[i].setStyleSheet("color: black; background-color: white;")
+            layout.addWidget(work[i], i + 1, 2)
+            held = sum(self.workspace.allocation[i]) if i < len(self.workspace.allocation) else 0
+            layout.addWidget(QLabel(str(held)), i + 1, 3)
+
+        ok_button = QPushButton("OK")
+        ok_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        ok_button.clicked.connect(lambda: self.apply_recovery_costs(priority, work, dialog))
+        layout.addWidget(ok_button, self.num_processes + 1, 1)
+
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        dialog.exec()
+
+    def apply_recovery_costs(self, priority, work, dialog):
+        self.workspace.process_priority = {p: spin.value() for p, spin in zip(self.processes, priority)}
+        self.workspace.process_work = {p: spin.value() for p, spin in zip(self.processes, work)}
+        costs = self.recovery_costs()
+        self.add_message("Recovery costs: " + ", ".join(f"{p}={costs[p]:g}" for p in self.processes))
+        dialog.close()
+
     def configure_bankers_and_detect(self, available, max_demand, allocation, dialog):
-        self.available = [spin.value() for spin in available]
-        self.max_demand = [[spin.value() for spin in row] for row in max_demand]
-        self.allocation = [[spin.value() for spin in row] for row in allocation]
-        self.bankers_configured = True
+        self.workspace.available = [spin.value() for spin in available]
+        self.workspace.max_demand = [[spin.value() for spin in row] for row in max_demand]
+        self.workspace.allocation = [[spin.value() for spin in row] for row in allocation]
+        self.workspace.bankers_configured = True
         dialog.close()
         self.detect_deadlock_bankers()
 
     def detect_deadlock_bankers(self):
-        if not self.bankers_configured:
+        if not self.workspace.bankers_configured:
             self.add_message("Please configure Banker's Algorithm parameters first.")
             return
 
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        work = self.available.copy()
-        need = [[max(0, m - a) for m, a in zip(max_d, alloc)] for max_d, alloc in zip(self.max_demand, self.allocation)]
-        finish = [False] * self.num_processes
-        safe_sequence = []
-
-        while False in finish:
-            found = False
-            for p in range(self.num_processes):
-                if not finish[p] and all(n <= w for n, w in zip(need[p], work)):
-                    for j in range(len(work)):
-                        work[j] += self.allocation[p][j]
-                    safe_sequence.append(f"P{self.processes[p][1:]}")
-                    finish[p] = True
-                    found = True
-            if not found:
-                self.add_message("Deadlock Detected! Unsafe state identified by Banker's Algorithm.")
-                return
+        safe, sequence = deadlock_core.bankers_safety(self.workspace.available, self.workspace.max_demand[:self.num_processes], self.workspace.allocation[:self.num_processes])
+        if not safe:
+            self.add_message("Deadlock Detected! Unsafe state identified by Banker's Algorithm.", Severity.ALERT)
+            return
 
-        self.add_message(f"No Deadlock Detected! Safe sequence: {' -> '.join(safe_sequence)}")
+        self.add_message(f"No Deadlock Detected! Safe sequence: {' -> '.join(self.processes[p] for p in sequence)}", Severity.ALERT)
 
     def highlight_deadlock_tab1(self, deadlocked_processes):
         gradient = QLinearGradient(0, 0, 100, 100)
@@ -1094,44 +1579,105 @@ class DeadlockDetectionAI(QMainWindow):
     def fix_deadlock_tab1(self):
         if not self.deadlock_graph_tab1 or not self.deadlock_graph_tab1.edges:
             self.add_message("No deadlock detected to fix.")
-            self.update_table_tab1()
             return
 
         deadlock_type = self.identify_deadlock_type(self.deadlock_graph_tab1)
         if "No Deadlock" in deadlock_type:
             self.add_message("No deadlock to fix.")
-            self.update_table_tab1()
             return
 
         try:
-            cycle = list(nx.find_cycle(self.deadlock_graph_tab1, orientation='original')) if "Circular Wait" in deadlock_type else []
-            if cycle:
-                process_to_remove = cycle[0][0]
-                self.deadlock_graph_tab1.remove_node(process_to_remove)
-                self.add_message(f"Deadlock Resolved! Process {process_to_remove} preempted to break Circular Wait.")
-            elif "Mutual Exclusion" in deadlock_type:
-                self_loop = next((u, v) for u, v in self.deadlock_graph_tab1.edges if u == v)
-                self.deadlock_graph_tab1.remove_edge(*self_loop)
-                self.add_message(f"Deadlock Resolved! Removed self-loop {self_loop[0]} to fix Mutual Exclusion.")
-            elif "No Preemption" in deadlock_type:
-                bidirectional_edge = next(((u, v) for u, v in self.deadlock_graph_tab1.edges if (v, u) in self.deadlock_graph_tab1.edges), None)
-                if bidirectional_edge:
-                    self.deadlock_graph_tab1.remove_edge(*bidirectional_edge)
-                    self.add_message(f"Deadlock Resolved! Removed bidirectional edge {bidirectional_edge[0]} -> {bidirectional_edge[1]} to fix No Preemption.")
-                else:
-                    self.add_message("Error: Could not identify bidirectional edge to fix No Preemption.")
-                    return
-
-            self.update_table_tab1()
-            self.update_chart_tab1()
+            # After an undo, fixing differently starts a new branch next to the undone one.
+            previous = self.versions_tab1.head.last_child
+            results = what_if.evaluate(self.deadlock_graph_tab1, costs=self.recovery_costs())
+            choice = self.choose_recovery_action(deadlock_type, results)
+            if choice is None:
+                self.add_message("Fix cancelled.")
+                return
+            action = choice.action
+            self.versions_tab1.record(action.label, removed_nodes=action.processes, removed_edges=action.edges)
+            self.add_message(f"Deadlock Resolved! {action.label} (cost {action.cost:g}, {choice.unblocked} process(es) unblocked).", Severity.SUCCESS)
+            if choice.deadlock_groups:
+                self.add_message(f"{choice.deadlock_groups} deadlock group(s) with {choice.deadlocked} process(es) remain; press Fix Deadlock again.", Severity.ALERT)
+            if previous is not None and previous is not self.versions_tab1.head:
+                added, removed = self.versions_tab1.diff(previous)
+                self.add_message(f"Branched: '{self.versions_tab1.head.label}' instead of '{previous.label}' (keeps {len(added)} dependencies it removed, removes {len(removed)} it kept).", Severity.DETAIL)
+
+            # The table already holds the fixed cells: the model updated them as the version was recorded.
             self.highlight_fix_tab1()
-            self.update_chart_tab2()
-        except nx.NetworkXNoCycle:
-            self.add_message("No cycle detected to fix. Please verify the deadlock condition.")
-            self.update_table_tab1()
         except Exception as e:
             self.add_message(f"Error resolving deadlock: {str(e)}")
-            self.update_table_tab1()
+
+    def choose_recovery_action(self, deadlock_type, results):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Recovery Options")
+        dialog.setMinimumSize(560, 320)
+        layout = QVBoxLayout()
+
+        label = QLabel(f"{deadlock_type}: {len(results)} option(s), best first")
+        label.setStyleSheet("color: #0A1A44; font-weight: bold;")
+        layout.addWidget(label)
+
+        table = QTableWidget(len(results), 4)
+        table.setHorizontalHeaderLabels(["Action", "Deadlocks Left", "Unblocked", "Cost"])
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        table.setStyleSheet("QTableWidget { background-color: #FFFFFF; color: #0A1A44; font-size: 14px; } QHeaderView::section { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #26A69A, stop:1 #FF6F61); color: #0A1A44; font-weight: bold; }")
+        for row, result in enumerate(results):
+            table.setItem(row, 0, QTableWidgetItem(result.action.label))
+            table.setItem(row, 1, QTableWidgetItem(str(result.deadlock_groups)))
+            table.setItem(row, 2, QTableWidgetItem(str(result.unblocked)))
+            table.setItem(row, 3, QTableWidgetItem(f"{result.action.cost:g}"))
+        if results:
+            table.selectRow(0)
+        table.cellDoubleClicked.connect(lambda row, col: dialog.accept())
+        layout.addWidget(table)
+
+        button_layout = QHBoxLayout()
+        apply_button = QPushButton("Apply")
+        apply_button.setStyleSheet("background-color: #4CAF50; color: black; font-weight: bold; padding: 5px;")
+        apply_button.clicked.connect(dialog.accept)
+        button_layout.addWidget(apply_button)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setStyleSheet("background-color: #FF6F61; color: black; font-weight: bold; padding: 5px;")
+        cancel_button.clicked.connect(dialog.reject)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        dialog.setLayout(layout)
+        dialog.setStyleSheet("background-color: #E0F7FA; color: black;")
+        if dialog.exec() != QDialog.DialogCode.Accepted or table.currentRow() < 0:
+            return None
+        return results[table.currentRow()]
+
+    def undo_tab1(self):
+        self.step_history(self.versions_tab1, False, self.add_message)
+
+    def redo_tab1(self):
+        self.step_history(self.versions_tab1, True, self.add_message)
+
+    def undo_tab3(self):
+        self.stop_simulation()
+        self.step_history(self.versions_tab3, False, self.add_sim_message)
+
+    def redo_tab3(self):
+        self.stop_simulation()
+        self.step_history(self.versions_tab3, True, self.add_sim_message)
+
+    def step_history(self, versions, forward, log):
+        before = versions.head
+        version = versions.redo() if forward else versions.undo()
+        if version is None:
+            if not forward and versions.head.barrier:
+                log(f"Cannot undo '{versions.head.label}'.")
+            else:
+                log("Nothing to redo." if forward else "Nothing to undo.")
+            return
+        added, removed = versions.diff(before)
+        action = "Redid" if forward else "Undid"
+        log(f"{action} '{version.label}': {len(added)} dependencies restored, {len(removed)} removed.", Severity.DETAIL)
 
     def highlight_fix_tab1(self):
         gradient = QLinearGradient(0, 0, 100, 100)
@@ -1145,13 +1691,6 @@ class DeadlockDetectionAI(QMainWindow):
                 self.table_tab1.setItem(row, col, item)
         QTimer.singleShot(15000, self.reset_table_tab1)
 
-    def update_table_tab1(self):
-        self.processes = [f"P{i+1}" for i in range(self.num_processes)]
-        for i in range(self.num_processes):
-            for j in range(self.num_processes):
-                item = QTableWidgetItem("1" if (self.processes[i], self.processes[j]) in self.deadlock_graph_tab1.edges else "0")
-                self.table_tab1.setItem(i, j, item)
-
     def reset_table_tab1(self):
         for row in range(self.table_tab1.rowCount()):
             for col in range(self.table_tab1.columnCount()):
@@ -1179,11 +1718,19 @@ class DeadlockDetectionAI(QMainWindow):
                     f"  Definition: This indicates the number of processes that {process} is waiting for to release resources.",
                     f"  Processes: {', '.join(self.waiting_on_details[process]) if self.waiting_on_details[process] else 'None'}"
                 ]
+                index = self.reachability_tab1()
+                chain = index.longest_chain(process)
+                details += [
+                    f"Process {process} - Transitive Details:",
+                    f"  Blocked behind {process}: {index.blocked_count(process)} process(es), directly or through others.",
+                    f"  {process} ultimately waits on: {index.waits_on_count(process)} process(es).",
+                    f"  Longest wait chain through {process}: {reachability.format_chain(chain) if len(chain) > 1 else 'None'}"
+                ]
                 for detail in details:
-                    self.add_message(detail)
+                    self.add_message(detail, Severity.DETAIL)
 
     def rotate_view(self, horizontal, vertical):
-        if hasattr(self, 'ax'):
+        if hasattr(self, 'ax') and hasattr(self.ax, 'elev'):
             current_elev = self.ax.elev
             current_azim = self.ax.azim
             # Horizontal rotation adjusts azimuth (around vertical axis)
@@ -1194,8 +1741,19 @@ class DeadlockDetectionAI(QMainWindow):
                 self.ax.view_init(elev=current_elev + 15, azim=current_azim)
             self.canvas_tab2.draw()
 
+    def closeEvent(self, event):
+        if self.recorder is not None:
+            self.recorder.close()
+        self.exporter.shutdown()
+        self.ai_pool.shutdown(wait=False, cancel_futures=True)
+        self.import_pool.shutdown(wait=False, cancel_futures=True)
+        self.workspace_pool.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setApplicationName("DeadlockDetectionAI")  # names the data directory the event log is written to
     window = DeadlockDetectionAI()
     window.show()
     sys.exit(app.exec())
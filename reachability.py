@@ -0,0 +1,188 @@
+import heapq
+import random
+
+import recovery
+from what_if import bits
+
+CLOSURE_LIMIT = 8192   # components up to which the full bitset closure is kept (8 MB at the limit)
+BLOCK_BITS = 4096      # closure columns computed per pass when counting on larger graphs
+INTERVAL_LABELS = 2
+
+
+class ReachabilityIndex:
+    """Transitive wait-for queries over the SCC condensation of one graph version.
+
+    A process waits (transitively) on everything it can reach; it is blocked behind everything that can
+    reach it. Counts and chain lengths are precomputed, so the per-process queries are lookups.
+    """
+
+    def __init__(self, graph):
+        succ = recovery.successor_sets(graph)
+        # Tarjan emits components children first: every condensation edge goes from a higher id to a lower one.
+        self.components = recovery.strongly_connected(succ)
+        self.component_of = {n: c for c, members in enumerate(self.components) for n in members}
+        count = len(self.components)
+        self.size = [len(members) for members in self.components]
+        self.cyclic = [len(m) > 1 or next(iter(m)) in succ[next(iter(m))] for m in self.components]
+        self.children = [set() for _ in range(count)]
+        self.parents = [set() for _ in range(count)]
+        for u, targets in succ.items():
+            cu = self.component_of[u]
+            for v in targets:
+                cv = self.component_of[v]
+                if cu != cv:
+                    self.children[cu].add(cv)
+                    self.parents[cv].add(cu)
+        self.descendants = None
+        self.waits_on = self._closure_counts(self.children, range(count))
+        self.blocked_behind = self._closure_counts(self.parents, range(count - 1, -1, -1))
+        self._chains()
+        if self.descendants is None:
+            self._interval_labels()
+
+    def _closure_counts(self, edges, order):
+        # Bit-parallel closure in column blocks, so memory stays at components x BLOCK_BITS bits.
+        count = len(self.size)
+        totals = [0] * count
+        weighted = [c for c in range(count) if self.size[c] > 1]
+        keep = count <= CLOSURE_LIMIT and edges is self.children
+        block = max(count, 1) if keep else BLOCK_BITS
+        for lo in range(0, count, block):
+            hi = min(lo + block, count)
+            reach = [0] * count
+            for c in order:
+                mask = 1 << (c - lo) if lo <= c < hi else 0
+                for d in edges[c]:
+                    mask |= reach[d]
+                reach[c] = mask
+            heavy = 0
+            for c in weighted:
+                if lo <= c < hi:
+                    heavy |= 1 << (c - lo)
+            for c in range(count):
+                mask = reach[c]
+                extra = sum(self.size[d + lo] - 1 for d in bits(mask & heavy)) if mask & heavy else 0
+                totals[c] += mask.bit_count() + extra
+            if keep:
+                self.descendants = reach
+        return [t - 1 for t in totals]  # a process does not wait on itself, but does on the rest of its cycle
+
+    def _chains(self):
+        count = len(self.size)
+        self.down, self.next_down = [0] * count, [None] * count
+        for c in range(count):
+            best = max(self.children[c], key=self.down.__getitem__, default=None)
+            self.down[c] = self.size[c] + (self.down[best] if best is not None else 0)
+            self.next_down[c] = best
+        self.up, self.next_up = [0] * count, [None] * count
+        for c in range(count - 1, -1, -1):
+            best = max(self.parents[c], key=self.up.__getitem__, default=None)
+            self.up[c] = self.size[c] + (self.up[best] if best is not None else 0)
+            self.next_up[c] = best
+
+    def _interval_labels(self):
+        # GRAIL-style: if u reaches v then v's post-order interval nests inside u's in every labelling.
+        count = len(self.size)
+        rng = random.Random(0)
+        self.labels = []
+        for _ in range(INTERVAL_LABELS):
+            low, post, counter = [0] * count, [0] * count, 0
+            seen = [False] * count
+            roots = [c for c in range(count) if not self.parents[c]]
+            rng.shuffle(roots)
+            for root in roots:
+                stack = [(root, iter(rng.sample(sorted(self.children[root]), len(self.children[root]))))]
+                seen[root] = True
+                low[root] = count
+                while stack:
+                    node, children = stack[-1]
+                    child = next(children, None)
+                    if child is None:
+                        stack.pop()
+                        post[node] = counter
+                        low[node] = min(low[node], counter)
+                        counter += 1
+                        if stack:
+                            parent = stack[-1][0]
+                            low[parent] = min(low[parent], low[node])
+                    elif not seen[child]:
+                        seen[child] = True
+                        low[child] = count
+                        stack.append((child, iter(rng.sample(sorted(self.children[child]), len(self.children[child])))))
+                    else:
+                        low[node] = min(low[node], low[child])
+            self.labels.append((low, post))
+
+    def _component_reaches(self, source, target):
+        if source == target:
+            return True
+        if target > source:
+            return False
+        if self.descendants is not None:
+            return bool(self.descendants[source] >> target & 1)
+        stack, seen = [source], {source}
+        while stack:
+            c = stack.pop()
+            for d in self.children[c]:
+                if d == target:
+                    return True
+                if d in seen or d < target or any(not (low[d] <= post[target] <= post[d]) for low, post in self.labels):
+                    continue
+                seen.add(d)
+                stack.append(d)
+        return False
+
+    def reaches(self, u, v):
+        if u not in self.component_of or v not in self.component_of:
+            return u == v
+        return self._component_reaches(self.component_of[u], self.component_of[v])
+
+    def would_close_cycle(self, u, v):
+        """Adding u -> v closes a cycle exactly when v already waits (transitively) on u."""
+        return u == v or self.reaches(v, u)
+
+    def blocked_count(self, process):
+        c = self.component_of.get(process)
+        return self.blocked_behind[c] if c is not None else 0
+
+    def waits_on_count(self, process):
+        c = self.component_of.get(process)
+        return self.waits_on[c] if c is not None else 0
+
+    def is_deadlocked(self, process):
+        c = self.component_of.get(process)
+        return c is not None and self.cyclic[c]
+
+    def longest_chain(self, process=None):
+        """Longest wait chain (as groups of processes, a deadlocked cycle being one group) through process,
+        or through the whole graph when process is None."""
+        if not self.size:
+            return []
+        if process is None:
+            c = max(range(len(self.size)), key=lambda c: self.up[c] + self.down[c] - self.size[c])
+        elif process in self.component_of:
+            c = self.component_of[process]
+        else:
+            return []
+        upstream = []
+        node = self.next_up[c]
+        while node is not None:
+            upstream.append(node)
+            node = self.next_up[node]
+        chain = upstream[::-1] + [c]
+        node = self.next_down[c]
+        while node is not None:
+            chain.append(node)
+            node = self.next_down[node]
+        return [sorted(self.components[k], key=str) for k in chain]
+
+    def chain_length(self, process=None):
+        return sum(len(group) for group in self.longest_chain(process))
+
+    def top_blockers(self, k=5):
+        nodes = [(n, c) for n, c in self.component_of.items() if self.blocked_behind[c] > 0]
+        return [(n, self.blocked_behind[c]) for n, c in heapq.nlargest(k, nodes, key=lambda item: self.blocked_behind[item[1]])]
+
+
+def format_chain(chain):
+    return " -> ".join(group[0] if len(group) == 1 else "{" + ", ".join(group) + "}" for group in chain)
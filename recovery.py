@@ -0,0 +1,270 @@
+import heapq
+from collections import deque
+
+from deadlock_core import process_sort_key
+
+DEFAULT_WEIGHTS = {"priority": 1.0, "work": 1.0, "held": 1.0}
+REFINE_BUDGET = 20_000_000  # chosen items x edges worth of cycle checks in the pruning pass
+RESPLIT_FRACTION = 0.2  # share of the remaining nodes picked before components are re-split
+
+
+class RecoveryPlan:
+    def __init__(self, victims=(), edges=(), cost=0.0, components=0):
+        self.victims = list(victims)
+        self.edges = list(edges)
+        self.cost = cost
+        self.components = components
+
+    def describe(self):
+        if self.victims:
+            return f"preempt {', '.join(map(str, self.victims))} (cost {self.cost:g}, {self.components} deadlocked group(s))"
+        if self.edges:
+            return f"time out {', '.join(f'{u} -> {v}' for u, v in self.edges)} (cost {self.cost:g}, {self.components} deadlocked group(s))"
+        return "nothing to do"
+
+
+def process_costs(processes, allocation=(), priority=None, work=None, weights=None):
+    # cost = w_priority * priority + w_work * work done + w_held * resources held (Banker's allocation row).
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    priority = priority or {}
+    work = work or {}
+    costs = {}
+    for i, p in enumerate(processes):
+        held = sum(allocation[i]) if i < len(allocation) else 0
+        costs[p] = weights["priority"] * priority.get(p, 1) + weights["work"] * work.get(p, 0) + weights["held"] * held
+    return costs
+
+
+def successor_sets(graph):
+    return {n: set(neighbours) for n, neighbours in graph.adj.items()}
+
+
+def strongly_connected(succ):
+    # Iterative Tarjan over a dict of successor sets.
+    index, low, on_stack, stack, components = {}, {}, set(), [], []
+    counter = 0
+    for root in succ:
+        if root in index:
+            continue
+        work = [(root, iter(succ[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(succ[child])))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def deadlocked_components(succ):
+    return [c for c in strongly_connected(succ) if len(c) > 1 or next(iter(c)) in succ[next(iter(c))]]
+
+
+def _restrict(succ, nodes):
+    sub_succ = {n: succ[n] & nodes for n in nodes}
+    sub_pred = {n: set() for n in nodes}
+    for u, targets in sub_succ.items():
+        for v in targets:
+            sub_pred[v].add(u)
+    return sub_succ, sub_pred
+
+
+def _on_cycle(succ, node, excluded):
+    # Can node reach itself without passing through excluded nodes?
+    seen, queue = {node}, deque([node])
+    while queue:
+        for child in succ[queue.popleft()]:
+            if child == node:
+                return True
+            if child not in seen and child not in excluded:
+                seen.add(child)
+                queue.append(child)
+    return False
+
+
+def plan_victims(graph, costs=None):
+    """Weighted feedback vertex set over every deadlocked component, in one pass."""
+    costs = costs or {}
+    components = deadlocked_components(successor_sets(graph))
+    nodes = set().union(*components) if components else set()
+    succ, pred = _restrict(successor_sets(graph), nodes)
+    original = {n: set(targets) for n, targets in succ.items()}
+    chosen = []
+    removed = set()
+
+    def remove(n):
+        removed.add(n)
+        for v in succ[n]:
+            pred[v].discard(n)
+        for u in pred[n]:
+            succ[u].discard(n)
+
+    def score(n):
+        return costs.get(n, 1) / (len(pred[n]) * len(succ[n]))
+
+    # Ties go to the lowest process name, never to set or hash order, so a graph always gets the same plan.
+    key = {n: process_sort_key(n) for n in nodes}
+
+    remaining = set(nodes)
+    while remaining:
+        # Drop nodes that can no longer be on a cycle: sources, sinks, and nodes between components.
+        live = set().union(*deadlocked_components({n: succ[n] for n in remaining}))
+        for n in remaining - live:
+            remove(n)
+        remaining = live
+        for n in sorted((n for n in remaining if n in succ[n]), key=key.get):
+            chosen.append(n)
+            remove(n)
+            remaining.discard(n)
+        heap = [(score(n), key[n], n) for n in remaining if pred[n] and succ[n]]
+        heapq.heapify(heap)
+        budget = max(1, int(len(remaining) * RESPLIT_FRACTION))
+        prune = deque()
+        while heap and budget:
+            value, _, n = heapq.heappop(heap)
+            if n in removed or not pred[n] or not succ[n] or value != score(n):
+                continue
+            chosen.append(n)
+            neighbours = succ[n] | pred[n]
+            remove(n)
+            remaining.discard(n)
+            budget -= 1
+            prune.extend(neighbours)
+            while prune:
+                m = prune.popleft()
+                if m in removed:
+                    continue
+                if not pred[m] or not succ[m]:
+                    prune.extend(succ[m] | pred[m])
+                    remove(m)
+                    remaining.discard(m)
+                else:
+                    heapq.heappush(heap, (score(m), key[m], m))
+    victims = _prune_victims(original, chosen, costs)
+    return RecoveryPlan(victims, cost=sum(costs.get(n, 1) for n in victims), components=len(components))
+
+
+def _prune_victims(succ, chosen, costs):
+    # Greedy picks can become redundant once later picks break the same cycles; put those processes back.
+    edge_count = sum(len(s) for s in succ.values())
+    victims = set(chosen)
+    if len(chosen) * max(edge_count, 1) <= REFINE_BUDGET:
+        for n in sorted(chosen, key=lambda n: (-costs.get(n, 1), process_sort_key(n))):
+            if n not in succ[n] and not _on_cycle(succ, n, victims - {n}):
+                victims.discard(n)
+    return [n for n in chosen if n in victims]
+
+
+def plan_timeouts(graph, edge_cost=None):
+    """Weighted feedback arc set (Eades-Lin-Smyth ordering) over every deadlocked component."""
+    edge_cost = edge_cost or (lambda u, v: 1)
+    succ = successor_sets(graph)
+    components = deadlocked_components(succ)
+    feedback = []
+    # Components, processes and dependencies are walked in name order, so ties always break the same way.
+    for component in sorted(components, key=lambda c: min(map(process_sort_key, c))):
+        c_succ, c_pred = _restrict(succ, component)
+        ordered = sorted(component, key=process_sort_key)
+        key = {n: process_sort_key(n) for n in ordered}
+        feedback.extend((n, n) for n in ordered if n in c_succ[n])
+        for n in ordered:
+            c_succ[n].discard(n)
+            c_pred[n].discard(n)
+        weight = {(u, v): edge_cost(u, v) for u in ordered for v in sorted(c_succ[u], key=key.get)}
+        out_w = {n: sum(weight[n, v] for v in c_succ[n]) for n in component}
+        in_w = {n: sum(weight[u, n] for u in c_pred[n]) for n in component}
+        left, right = [], []
+        heap = [(in_w[n] - out_w[n], key[n], n) for n in ordered]
+        heapq.heapify(heap)
+        alive = set(component)
+        queue = deque(n for n in ordered if not c_succ[n] or not c_pred[n])
+
+        def take(n):
+            alive.discard(n)
+            for v in sorted(c_succ[n], key=key.get):
+                if v in alive:
+                    in_w[v] -= weight[n, v]
+                    c_pred[v].discard(n)
+                    queue.append(v)
+            for u in sorted(c_pred[n], key=key.get):
+                if u in alive:
+                    out_w[u] -= weight[u, n]
+                    c_succ[u].discard(n)
+                    queue.append(u)
+
+        while alive:
+            while queue:
+                n = queue.popleft()
+                if n not in alive:
+                    continue
+                if not c_succ[n]:
+                    right.append(n)
+                    take(n)
+                elif not c_pred[n]:
+                    left.append(n)
+                    take(n)
+                else:
+                    heapq.heappush(heap, (in_w[n] - out_w[n], key[n], n))
+            if not alive:
+                break
+            value, _, n = heapq.heappop(heap)
+            if n not in alive or value != in_w[n] - out_w[n]:
+                continue
+            left.append(n)
+            take(n)
+        position = {n: i for i, n in enumerate(left + right[::-1])}
+        backward = [(u, v) for (u, v) in weight if position[u] > position[v]]
+        feedback.extend(_prune_arcs(succ, component, backward, weight))
+    cost = sum(edge_cost(u, v) for u, v in feedback)
+    return RecoveryPlan(edges=feedback, cost=cost, components=len(components))
+
+
+def _prune_arcs(succ, component, backward, weight):
+    # Put back any timed-out dependency that no longer closes a cycle once the others are removed.
+    kept = set(backward)
+    c_succ = {n: {v for v in succ[n] if v in component and v != n} for n in component}
+    for u, v in backward:
+        c_succ[u].discard(v)
+    if len(backward) * max(len(weight), 1) <= REFINE_BUDGET:
+        for u, v in sorted(backward, key=lambda e: -weight[e]):
+            if not _reaches(c_succ, v, u):
+                c_succ[u].add(v)
+                kept.discard((u, v))
+    return [e for e in backward if e in kept]
+
+
+def _reaches(succ, source, target):
+    seen, queue = {source}, deque([source])
+    while queue:
+        node = queue.popleft()
+        if node == target:
+            return True
+        for child in succ[node]:
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return False
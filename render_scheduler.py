@@ -0,0 +1,37 @@
+from PyQt6.QtCore import QTimer
+
+FRAME_INTERVAL_MS = 16
+
+
+class RenderScheduler:
+    def __init__(self, is_tab_visible, interval=FRAME_INTERVAL_MS):
+        self.is_tab_visible = is_tab_visible
+        self.views = {}  # name -> (render, tab index), in registration order
+        self.dirty = set()
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def register(self, name, render, tab):
+        self.views[name] = (render, tab)
+
+    def mark_dirty(self, *names):
+        self.dirty.update(names)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        # Hidden views stay dirty and are painted by tab_shown() when their tab comes up.
+        for name, (render, tab) in self.views.items():
+            if name in self.dirty and self.is_tab_visible(tab):
+                self._render(name, render)
+
+    def tab_shown(self, tab):
+        for name, (render, view_tab) in self.views.items():
+            if view_tab == tab and name in self.dirty:
+                self._render(name, render)
+
+    def _render(self, name, render):
+        self.dirty.discard(name)
+        render()
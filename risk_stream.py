@@ -0,0 +1,197 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 20.0        # seconds of changes the trends are measured over
+HORIZON = 30.0       # warn when a deadlock is likely within this many seconds
+THRESHOLD = 0.7      # probability of a deadlock within the horizon that raises an alert (see bench_risk_stream.py)
+REBUILD_RATIO = 0.5  # removals, as a share of live dependencies, before the structure is rebuilt
+
+
+class Risk:
+    __slots__ = ("score", "eta", "rate", "chain", "chain_growth", "concentration", "hotspot",
+                 "group", "group_growth", "closing", "horizon")
+
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, fields[field])
+
+    def describe(self):
+        eta = f"about {self.eta:.0f} s" if math.isfinite(self.eta) else "never at this rate"
+        hotspot = f" on {self.hotspot}" if self.hotspot else ""
+        return (f"{self.score:.0%} chance of a deadlock within {self.horizon:g} s (next closing dependency {eta}). "
+                f"{self.rate * 60:.1f} dependencies/min, wait chain {self.chain} ({self.chain_growth * 60:+.1f}/min), "
+                f"in-degree concentration {self.concentration:.2f}{hotspot}, largest wait group {self.group} processes "
+                f"({self.group_growth * 60:+.1f}/min), {self.closing * 100:.2g}% of new dependencies would close a cycle.")
+
+
+class RiskScorer:
+    """Streaming deadlock risk for a live wait-for graph, fed one dependency change at a time.
+
+    Each update touches only the changed dependency: windowed arrival times, running in-degree sums
+    (for the concentration index), a union-find of processes that share a wait group and the longest
+    known chain ending and starting at each process. Removals cannot be undone in a union-find, and a
+    chain would have to be re-walked, so removals leave the groups and chains alone: they are
+    over-estimates, and `chain` never shrinks, until enough removals pile up to rebuild them from the
+    graph. That keeps updates O(1) amortized.
+
+    The score is the chance that, at the current arrival rate, a dependency closing a cycle arrives
+    within the horizon, where the share of closing dependencies is estimated from the wait groups and
+    the longest chain.
+    """
+
+    def __init__(self, graph, processes=0, window=WINDOW, horizon=HORIZON, threshold=THRESHOLD, clock=time.monotonic):
+        self.graph = graph
+        self.processes = processes
+        self.window = window
+        self.horizon = horizon
+        self.threshold = threshold
+        self.clock = clock
+        self.muted = 0
+        self.reset()
+
+    def reset(self):
+        """Rebuild from the graph as it is now; the trend windows start over."""
+        self.arrivals = deque()
+        self.chains = deque()   # (time, longest chain)
+        self.groups = deque()   # (time, largest group)
+        self.started = None     # first arrival since the reset; the rate is taken over the time since, up to a window
+        self.alerted = None     # time of the last alert
+        self.armed = True
+        self._rebuild()
+
+    def _rebuild(self):
+        self.indegree = {}
+        self.top = None         # most waited-on process; only corrected by a rebuild once it loses waiters
+        self.edges = 0
+        self.square_sum = 0     # sum of squared in-degrees
+        self.parent = {}
+        self.size = {}
+        self.pair_sum = 0       # ordered pairs of distinct processes in the same wait group
+        self.largest = 1
+        self.tail = {}          # longest known chain ending at a process
+        self.head = {}          # longest known chain starting at a process
+        self.chain = 0
+        self.removed = 0
+        for u, v in self.graph.edges:
+            self._add(u, v)
+
+    def set_processes(self, count):
+        self.processes = count
+
+    @contextmanager
+    def bulk(self):
+        # Loads replace the graph at once: the structure follows them, but they are not arrivals.
+        self.muted += 1
+        try:
+            yield
+        finally:
+            self.muted -= 1
+
+    def _find(self, n):
+        parent = self.parent
+        if n not in parent:
+            parent[n] = n
+            self.size[n] = 1
+            return n
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    def _add(self, u, v):
+        d = self.indegree.get(v, 0) + 1
+        self.indegree[v] = d
+        if d > self.indegree.get(self.top, 0):
+            self.top = v
+        self.square_sum += 2 * d - 1
+        self.edges += 1
+        a, b = self._find(u), self._find(v)
+        if a != b:
+            if self.size[a] < self.size[b]:
+                a, b = b, a
+            self.pair_sum += 2 * self.size[a] * self.size[b]
+            self.parent[b] = a
+            self.size[a] += self.size.pop(b)
+            self.largest = max(self.largest, self.size[a])
+        tail, head = self.tail, self.head
+        through = tail.get(u, 0) + 1 + head.get(v, 0)
+        tail[v] = max(tail.get(v, 0), tail.get(u, 0) + 1)
+        head[u] = max(head.get(u, 0), head.get(v, 0) + 1)
+        self.chain = max(self.chain, min(through, len(self.parent) - 1))  # longer only around a cycle
+
+    def edge_added(self, u, v, now=None):
+        """Account for a new dependency u -> v; returns a Risk when it crosses the alert threshold."""
+        self._add(u, v)
+        if self.muted:
+            return None
+        now = self.clock() if now is None else now
+        if self.started is None:
+            self.started = now
+        self.arrivals.append(now)
+        self._sample(self.chains, now, self.chain)
+        self._sample(self.groups, now, self.largest)
+        risk = self.risk(now)
+        if risk.score < self.threshold / 2:
+            self.armed = True
+        elif risk.score >= self.threshold and (self.armed or now - self.alerted >= self.horizon):
+            # An alert speaks for one horizon; if the risk is still high after it, it is raised again.
+            self.armed = False
+            self.alerted = now
+            return risk
+        return None
+
+    def edge_removed(self, u, v, now=None):
+        d = self.indegree.get(v, 0)
+        if d:
+            self.indegree[v] = d - 1
+            self.square_sum -= 2 * d - 1
+            self.edges -= 1
+        # Groups and chain ends are left as they are until the next rebuild.
+        self.removed += 1
+        if self.removed > REBUILD_RATIO * max(self.edges, 1):
+            self._rebuild()
+        if not self.muted:
+            now = self.clock() if now is None else now
+            self._sample(self.chains, now, self.chain)
+            self._sample(self.groups, now, self.largest)
+
+    def _sample(self, samples, now, value):
+        if not samples or samples[-1][1] != value:
+            samples.append((now, value))
+        self._trim(samples, now)
+
+    def _trim(self, samples, now):
+        # Keeps one sample at or before the window start, so growth is measured over the whole window.
+        start = now - self.window
+        while len(samples) > 1 and samples[1][0] <= start:
+            samples.popleft()
+
+    def _growth(self, samples, now, value):
+        self._trim(samples, now)
+        if not samples:
+            return 0.0
+        t, old = samples[0]
+        return (value - old) / max(now - t, 1.0)
+
+    def risk(self, now=None):
+        now = self.clock() if now is None else now
+        arrivals = self.arrivals
+        while arrivals and arrivals[0] <= now - self.window:
+            arrivals.popleft()
+        span = self.window if self.started is None else min(self.window, max(now - self.started, 1.0))
+        rate = len(arrivals) / span
+        n = max(len(self.parent), self.processes, 2)
+        # A new u -> v closes a cycle only if v already reaches u: u and v must share a wait group, and
+        # within a group about half the pairs are ordered the right way along a chain as long as the group.
+        reach = min(1.0, self.chain / max(self.largest - 1, 1))
+        closing = self.pair_sum / (n * (n - 1)) * 0.5 * reach
+        expected = rate * closing
+        score = 1.0 - math.exp(-expected * self.horizon)
+        concentration = self.square_sum / (self.edges * self.edges) if self.edges else 0.0
+        return Risk(score=score, eta=1.0 / expected if expected else math.inf, rate=rate, chain=self.chain,
+                    chain_growth=self._growth(self.chains, now, self.chain), concentration=concentration,
+                    hotspot=self.top if concentration >= 0.5 else None,
+                    group=self.largest if self.pair_sum else 1, group_growth=self._growth(self.groups, now, self.largest),
+                    closing=closing, horizon=self.horizon)
@@ -0,0 +1,269 @@
+import re
+import sys
+import time
+import random
+import argparse
+
+KEYWORDS = {"waits", "for", "ring", "chain", "random", "edges", "over", "seed"}
+TOKEN_RE = re.compile(r"""
+    (?P<space>[ \t\r]+)
+  | (?P<comment>\#[^\n]*)
+  | (?P<newline>\n)
+  | (?P<range>\.\.)
+  | (?P<name>[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<number>\d+)
+  | (?P<punct>[{},;])
+  | (?P<other>.)
+""", re.VERBOSE)
+NAME_NUMBER_RE = re.compile(r"^(.*?)(\d+)$")
+MAX_EDGES = 1_000_000            # dependencies one compile_text call may expand to; ranges are checked before expanding
+INTERACTIVE_MAX_EDGES = 10_000   # scenarios typed in the app, which compiles them on the GUI thread
+
+
+class ScenarioError(ValueError):
+    def __init__(self, message, line, column):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+
+
+class Token:
+    __slots__ = ("kind", "text", "line", "column")
+
+    def __init__(self, kind, text, line, column):
+        self.kind = kind
+        self.text = text
+        self.line = line
+        self.column = column
+
+    def is_keyword(self, word):
+        return self.kind == "name" and self.text.lower() == word
+
+
+def tokenize(text, first_line=1):
+    line, line_start = first_line, 0
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "newline":
+            yield Token("separator", "\n", line, match.start() - line_start + 1)
+            line += 1
+            line_start = match.end()
+        elif kind not in ("space", "comment"):
+            value = match.group()
+            if kind == "punct" and value in ",;":
+                kind = "separator"
+            yield Token(kind, value, line, match.start() - line_start + 1)
+
+
+def split_statements(tokens):
+    statement, depth = [], 0
+    for token in tokens:
+        if token.text == "{":
+            depth += 1
+        elif token.text == "}":
+            depth -= 1
+        if token.kind == "separator" and depth <= 0:
+            if statement:
+                yield statement
+            statement, depth = [], 0
+        elif token.text != "\n":
+            statement.append(token)
+    if statement:
+        yield statement
+
+
+def is_dsl_statement(statement):
+    first = statement[0]
+    if first.is_keyword("ring") or first.is_keyword("chain") or first.is_keyword("random"):
+        return True
+    return any(a.is_keyword("waits") and b.is_keyword("for") for a, b in zip(statement, statement[1:]))
+
+
+class StatementParser:
+    def __init__(self, statement, max_edges=MAX_EDGES, used=0):
+        self.tokens = statement
+        self.pos = 0
+        self.max_edges = max_edges
+        self.used = used  # dependencies earlier statements already expanded to
+
+    def error(self, message, token=None):
+        token = token or (self.tokens[self.pos] if self.pos < len(self.tokens) else self.tokens[-1])
+        column = token.column if self.pos < len(self.tokens) else token.column + len(token.text)
+        raise ScenarioError(message, token.line, column)
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            self.error("unexpected end of statement")
+        self.pos += 1
+        return token
+
+    def expect_keyword(self, word):
+        token = self.take()
+        if not token.is_keyword(word):
+            self.pos -= 1
+            self.error(f"expected '{word}', found '{token.text}'")
+        return token
+
+    def expect_number(self):
+        token = self.take()
+        if token.kind != "number":
+            self.pos -= 1
+            self.error(f"expected a number, found '{token.text}'")
+        return int(token.text)
+
+    def done(self):
+        if self.pos < len(self.tokens):
+            self.error(f"unexpected '{self.tokens[self.pos].text}'")
+
+    def processes(self):
+        token = self.take()
+        if token.text == "{":
+            names = self.processes()
+            while self.peek() is not None and self.peek().text == ",":
+                self.take()
+                names += self.processes()
+                self.check_size(len(names), "processes", token)
+            closing = self.take()
+            if closing.text != "}":
+                self.pos -= 1
+                self.error(f"expected '}}', found '{closing.text}'")
+            return names
+        if token.kind != "name" or token.text.lower() in KEYWORDS:
+            self.pos -= 1
+            self.error(f"expected a process name, found '{token.text}'")
+        if self.peek() is None or self.peek().kind != "range":
+            return [token.text]
+        self.take()
+        end = self.take()
+        start_match = NAME_NUMBER_RE.match(token.text)
+        if not start_match:
+            self.error(f"range start '{token.text}' must end in a number", token)
+        prefix, first = start_match.group(1), int(start_match.group(2))
+        if end.kind == "number":
+            last = int(end.text)
+        else:
+            end_match = NAME_NUMBER_RE.match(end.text) if end.kind == "name" else None
+            if not end_match or end_match.group(1) != prefix:
+                self.error(f"range end '{end.text}' must be a number or '{prefix}<number>'", end)
+            last = int(end_match.group(2))
+        if last < first:
+            self.error(f"empty range {token.text}..{end.text}", end)
+        self.check_size(last - first + 1, "processes", end)
+        return [f"{prefix}{i}" for i in range(first, last + 1)]
+
+    def check_size(self, size, what, token):
+        if self.used + size > self.max_edges:
+            raise ScenarioError(f"{size} {what} would exceed the limit of {self.max_edges} dependencies",
+                                token.line, token.column)
+
+    def parse(self, edges):
+        first = self.peek()
+        if first.is_keyword("ring") or first.is_keyword("chain"):
+            self.take()
+            names = self.processes()
+            self.done()
+            edges.extend(zip(names, names[1:]))
+            if first.is_keyword("ring") and len(names) > 1:
+                edges.append((names[-1], names[0]))
+        elif first.is_keyword("random"):
+            self.take()
+            count = self.expect_number()
+            self.check_size(count, "edges", self.tokens[self.pos - 1])
+            self.expect_keyword("edges")
+            self.expect_keyword("over")
+            names = self.processes()
+            seed = None
+            if self.peek() is not None:
+                self.expect_keyword("seed")
+                seed = self.expect_number()
+            self.done()
+            edges.extend(random_edges(names, count, seed))
+        else:
+            waiting = self.processes()
+            self.expect_keyword("waits")
+            self.expect_keyword("for")
+            held = self.processes()
+            self.done()
+            self.check_size(len(waiting) * len(held), "dependencies", first)
+            edges.extend((u, v) for u in waiting for v in held)
+
+
+def random_edges(names, count, seed):
+    rng = random.Random(seed)
+    n = len(names)
+    limit = n * (n - 1)
+    count = min(count, limit)
+    chosen = set()
+    while len(chosen) < count:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            chosen.add((u, v))
+    return [(names[u], names[v]) for u, v in sorted(chosen)]
+
+
+def compile_text(text, strict=True, first_line=1, warnings=None, max_edges=MAX_EDGES):
+    # Non-strict mode skips free-text statements and collects errors instead of raising.
+    edges = []
+    for statement in split_statements(tokenize(text, first_line)):
+        if not strict and not is_dsl_statement(statement):
+            continue
+        try:
+            StatementParser(statement, max_edges, len(edges)).parse(edges)
+        except ScenarioError as e:
+            if strict or warnings is None:
+                raise
+            warnings.append(e)
+    return edges
+
+
+def iter_file_edges(path, strict=True):
+    # Statements end at line breaks outside braces, so the file is compiled one statement group at a time.
+    with open(path) as f:
+        pending, start_line, depth = [], 1, 0
+        for number, line in enumerate(f, 1):
+            if not pending:
+                start_line = number
+            pending.append(line)
+            depth += line.count("{") - line.count("}")
+            if depth <= 0:
+                yield compile_text("".join(pending), strict, start_line)
+                pending, depth = [], 0
+        if pending:
+            yield compile_text("".join(pending), strict, start_line)
+
+
+def compile_file(path, strict=True):
+    edges = []
+    for batch in iter_file_edges(path, strict):
+        edges.extend(batch)
+    return edges
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a deadlock scenario file into a wait-for graph.")
+    parser.add_argument("scenario", help="Scenario file, e.g. 'ring P1..P50' or 'P1..P1000 waits for P1001' per line")
+    args = parser.parse_args(argv)
+
+    import networkx as nx
+    import deadlock_core
+    start = time.perf_counter()
+    try:
+        graph = nx.DiGraph()
+        for batch in iter_file_edges(args.scenario):
+            graph.add_edges_from(batch)
+    except ScenarioError as e:
+        print(f"{args.scenario}:{e.line}:{e.column}: {e.message}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    print(f"{graph.number_of_nodes()} processes, {graph.number_of_edges()} dependencies loaded in {elapsed * 1000:.1f} ms")
+    print(deadlock_core.identify_deadlock_type(graph))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+import re
+import sys
+import json
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import networkx as nx
+import deadlock_core
+import recovery
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+MAX_PENDING = 256            # queued computations per worker before requests are refused with 503
+SMALL_BODY = 16 * 1024       # JSON bodies up to this size are micro-batched
+MAX_BATCH = 128
+MAX_JSON_BODY = 64 * 1024 * 1024
+EDGE_LINE = re.compile(r"\s*(?:->|,|\s)\s*")
+
+
+class RequestError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def graph_from_payload(payload):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(str(p) for p in payload.get("processes", ()))
+    try:
+        graph.add_edges_from((str(u), str(v)) for u, v in payload.get("edges", ()))
+    except (TypeError, ValueError):
+        raise RequestError("'edges' must be a list of [waiting, holding] pairs")
+    return graph
+
+
+def detect(payload):
+    graph = payload if isinstance(payload, nx.DiGraph) else graph_from_payload(payload)
+    deadlock_type = deadlock_core.identify_deadlock_type(graph)
+    cycles = deadlock_core.deadlock_cycles(graph) if deadlock_type != "No Deadlock" else []
+    return {
+        "deadlock_type": deadlock_type,
+        "deadlocked": deadlock_type != "No Deadlock",
+        "cycles": [[u for u, _, _ in cycle] for cycle in cycles],
+        "processes": graph.number_of_nodes(),
+        "dependencies": graph.number_of_edges(),
+    }
+
+
+def _matrices(payload):
+    try:
+        available = [int(x) for x in payload["available"]]
+        max_demand = [[int(x) for x in row] for row in payload["max_demand"]]
+        allocation = [[int(x) for x in row] for row in payload["allocation"]]
+    except KeyError as e:
+        raise RequestError(f"missing field {e}")
+    except (TypeError, ValueError):
+        raise RequestError("'available', 'max_demand' and 'allocation' must hold integers")
+    if len(max_demand) != len(allocation) or any(len(row) != len(available) for row in max_demand + allocation):
+        raise RequestError("'max_demand' and 'allocation' must have one row per process and one column per resource")
+    return available, max_demand, allocation
+
+
+def bankers_safety(payload):
+    safe, sequence = deadlock_core.bankers_safety(*_matrices(payload))
+    return {"safe": safe, "sequence": [f"P{p + 1}" for p in sequence]}
+
+
+def bankers_request(payload):
+    available, max_demand, allocation = _matrices(payload)
+    try:
+        process = payload["process"]
+        # Either a 0-based row index or a process name such as "P3".
+        process = int(process[1:]) - 1 if isinstance(process, str) and process[:1] == "P" else int(process)
+        request = [int(x) for x in payload["request"]]
+    except KeyError as e:
+        raise RequestError(f"missing field {e}")
+    except (TypeError, ValueError):
+        raise RequestError("'process' must be an index or a P-name and 'request' a list of integers")
+    if not 0 <= process < len(allocation) or len(request) != len(available):
+        raise RequestError("'process' or 'request' does not match the matrices")
+    granted, reason, sequence = deadlock_core.bankers_request(available, max_demand, allocation, process, request)
+    return {"granted": granted, "reason": reason, "sequence": [f"P{p + 1}" for p in sequence]}
+
+
+def plan_recovery(payload):
+    graph = payload if isinstance(payload, nx.DiGraph) else graph_from_payload(payload)
+    costs = {str(p): float(c) for p, c in (payload.get("costs", {}) if isinstance(payload, dict) else {}).items()}
+    victims = recovery.plan_victims(graph, costs)
+    timeouts = recovery.plan_timeouts(graph, lambda u, v: costs.get(u, 1))
+    return {
+        "components": victims.components,
+        "preempt": {"processes": victims.victims, "cost": victims.cost},
+        "timeout": {"dependencies": [list(e) for e in timeouts.edges], "cost": timeouts.cost},
+    }
+
+
+OPERATIONS = {
+    "detect": detect,
+    "bankers/safety": bankers_safety,
+    "bankers/request": bankers_request,
+    "recovery": plan_recovery,
+}
+
+
+def run_operation(op, payload):
+    handler = OPERATIONS.get(op)
+    if handler is None:
+        raise RequestError(f"unknown operation '{op}'", 404)
+    if not isinstance(payload, (dict, nx.DiGraph)):
+        raise RequestError("request body must be a JSON object")
+    return handler(payload)
+
+
+def run_batch(payload):
+    # Explicit batches: one round trip for many checks, each answered (or failed) on its own.
+    requests = payload.get("requests")
+    if not isinstance(requests, list):
+        raise RequestError("'requests' must be a list of {\"op\": ..., ...} objects")
+    results = []
+    for item in requests:
+        try:
+            results.append(run_operation(item.get("op") if isinstance(item, dict) else None, item))
+        except (RequestError, nx.NetworkXError) as e:
+            results.append({"error": str(e)})
+    return {"results": results}
+
+
+class MicroBatcher:
+    # Small requests queue here; one thread drains whatever has arrived and runs it as one pool task.
+    # With a free worker a lone request runs at once, so batching adds no latency; under load the queue
+    # grows while the workers are busy and later batches get larger. Identical bodies in a batch are
+    # computed once.
+    def __init__(self, pool, workers):
+        self.pool = pool
+        self.queue = queue.Queue()
+        self.slots = threading.Semaphore(workers)
+        self.batches = self.batched = 0
+        self.thread = threading.Thread(target=self._drain, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, op, body):
+        future = Future()
+        self.queue.put((op, body, future))
+        return future
+
+    def _drain(self):
+        while True:
+            batch = [self.queue.get()]
+            if batch[0] is None:
+                return
+            self.slots.acquire()
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                batch.append(item)
+            self.batches += 1
+            self.batched += len(batch)
+            self.pool.submit(self._run, batch)
+
+    def _run(self, batch):
+        try:
+            done = {}
+            for op, body, future in batch:
+                key = (op, body)
+                if key not in done:
+                    try:
+                        done[key] = (True, run_operation(op, json.loads(body)))
+                    except Exception as e:
+                        done[key] = (False, e)
+                ok, value = done[key]
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        finally:
+            self.slots.release()
+
+    def close(self):
+        self.queue.put(None)
+
+
+class DeadlockServer(ThreadingHTTPServer):
+    # Connections get their own I/O threads (so keep-alive clients do not hold workers); all computation
+    # runs in a bounded pool, and requests beyond max_pending are refused rather than queued without limit.
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; the socketserver default of 5 resets bursts of new connections
+
+    def __init__(self, address, workers=DEFAULT_WORKERS, max_pending=None):
+        super().__init__(address, DeadlockRequestHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deadlock-worker")
+        self.pending = threading.BoundedSemaphore(max_pending or workers * MAX_PENDING)
+        self.batcher = MicroBatcher(self.pool, workers)
+
+    def compute(self, fn, *args):
+        if not self.pending.acquire(blocking=False):
+            raise RequestError("server busy, retry later", 503)
+        try:
+            return self.pool.submit(fn, *args).result()
+        finally:
+            self.pending.release()
+
+    def compute_small(self, op, body):
+        if not self.pending.acquire(blocking=False):
+            raise RequestError("server busy, retry later", 503)
+        try:
+            return self.batcher.submit(op, body).result()
+        finally:
+            self.pending.release()
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class DeadlockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't let them wait on delayed ACKs
+    server_version = "DeadlockDetection/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/health":
+            batcher = self.server.batcher
+            self._reply(200, {"status": "ok", "operations": sorted(OPERATIONS), "batches": batcher.batches, "batched_requests": batcher.batched})
+        else:
+            self._reply(404, {"error": f"no such endpoint '{self.path}'"})
+
+    def do_POST(self):
+        op = self.path.strip("/")
+        op = op[3:] if op.startswith("v1/") else op
+        streamed = self.headers.get("Content-Type", "").split(";")[0].strip() == "text/plain"
+        try:
+            if streamed:
+                # Streamed edge list: parsed line by line as it arrives, never held as one body.
+                if op not in ("detect", "recovery"):
+                    raise RequestError("edge-list bodies are accepted by /v1/detect and /v1/recovery only", 415)
+                graph = nx.DiGraph()
+                add_edge = graph.add_edge
+                for line in self._body_lines():
+                    line = line.split(b"#", 1)[0].strip()
+                    if line:
+                        line = line.decode()
+                        parts = line.split()
+                        if len(parts) != 2:
+                            parts = EDGE_LINE.split(line)
+                        if len(parts) != 2:
+                            raise RequestError(f"expected 'waiting holding' per line, got {line!r}")
+                        add_edge(*parts)
+                result = self.server.compute(run_operation, op, graph)
+            else:
+                body = b"".join(self._body_chunks(MAX_JSON_BODY))
+                if op == "batch":
+                    result = self.server.compute(run_batch, self._json(body))
+                elif len(body) <= SMALL_BODY and op in OPERATIONS:
+                    result = self.server.compute_small(op, body)
+                else:
+                    result = self.server.compute(run_operation, op, self._json(body))
+        except RequestError as e:
+            if streamed:
+                self.close_connection = True  # the rest of the body may still be unread
+            self._reply(e.status, {"error": str(e)})
+        except json.JSONDecodeError as e:
+            self._reply(400, {"error": f"invalid JSON: {e}"})
+        except Exception as e:
+            self._reply(500, {"error": str(e)})
+        else:
+            self._reply(200, result)
+
+    @staticmethod
+    def _json(body):
+        return json.loads(body) if body else {}
+
+    def _body_chunks(self, limit=None):
+        rfile = self.rfile
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            total = 0
+            while True:
+                size = int(rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                total += size
+                if limit is not None and total > limit:
+                    self.close_connection = True
+                    raise RequestError("request body too large", 413)
+                yield rfile.read(size)
+                rfile.readline()
+        remaining = int(self.headers.get("Content-Length") or 0)
+        if limit is not None and remaining > limit:
+            self.close_connection = True
+            raise RequestError("request body too large", 413)
+        while remaining > 0:
+            chunk = rfile.read(min(remaining, 1 << 16))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    def _body_lines(self):
+        tail = b""
+        for chunk in self._body_chunks():
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve deadlock detection, Banker's checks and recovery planning on localhost.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Size of the computation pool")
+    args = parser.parse_args(argv)
+
+    # Bound to the loopback interface only: the endpoints are for tools on the same machine.
+    server = DeadlockServer(("127.0.0.1", args.port), workers=args.workers)
+    print(f"Listening on http://127.0.0.1:{server.server_address[1]}/v1/ ({', '.join(sorted(OPERATIONS))}, batch, health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import os
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+
+import networkx as nx
+
+MAGIC = b"DLSIM\0"
+TRAILER_MAGIC = b"DLIX"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<6sHQI")      # magic, format version, seed, keyframe interval
+NAME = struct.Struct("<BIH")          # tag, name id, utf-8 length
+EVENT = struct.Struct("<BII")         # tag, node id, second node id (edges only)
+STEP = struct.Struct("<B")
+KEYFRAME = struct.Struct("<BIII")     # tag, step, node count, edge count
+INDEX = struct.Struct("<BII")         # tag, keyframe count, name count; then step start offsets
+INDEX_ENTRY = struct.Struct("<IQ")    # step, keyframe offset
+TRAILER = struct.Struct("<QI4s")      # index offset, step count, magic
+
+T_NAME, T_ADD_NODE, T_REMOVE_NODE, T_ADD_EDGE, T_REMOVE_EDGE, T_STEP, T_KEYFRAME, T_INDEX = range(1, 9)
+DEFAULT_KEYFRAME_INTERVAL = 1000
+KEYFRAME_RATIO = 4
+KEYFRAME_COST = 0.5  # rebuilding a keyframe node or edge costs about half as much as replaying one record
+FLUSH_BYTES = 1 << 20
+
+
+class RecordingError(ValueError):
+    pass
+
+
+class SimulationRecorder:
+    # Append-only: names are interned on first use and events are fixed-size records. A keyframe with
+    # the full graph is written once the records since the last one reach max(keyframe_interval,
+    # graph size / KEYFRAME_RATIO), so keyframes stay within a constant factor of the event stream.
+    # Only real changes are written and new endpoints get their own node record, so every step can be
+    # undone record by record: replays walk from where they are in either direction.
+    def __init__(self, path, graph, seed, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.path = path
+        self.seed = seed
+        self.keyframe_interval = keyframe_interval
+        self.file = open(path, "wb")
+        self.buffer = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, seed, keyframe_interval))
+        self.written = 0
+        self.ids = {}
+        self.names = []
+        self.nodes = set()
+        self.edges = set()
+        self.steps = 0
+        self.starts = array("Q")  # file offset of each step's first record
+        self.keyframes = []  # (step, file offset)
+        self.since_keyframe = 0
+        for node in graph.nodes:
+            self.nodes.add(self._id(node))
+        for u, v in graph.edges:
+            self.edges.add((self._id(u), self._id(v)))
+        self._keyframe()
+
+    def _offset(self):
+        return self.written + len(self.buffer)
+
+    def _id(self, name):
+        node_id = self.ids.get(name)
+        if node_id is None:
+            node_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            encoded = str(name).encode()
+            self.buffer += NAME.pack(T_NAME, node_id, len(encoded))
+            self.buffer += encoded
+        return node_id
+
+    def _keyframe(self):
+        self.since_keyframe = 0
+        self.keyframes.append((self.steps, self._offset()))
+        self.buffer += KEYFRAME.pack(T_KEYFRAME, self.steps, len(self.nodes), len(self.edges))
+        self.buffer += array("I", self.nodes).tobytes()
+        self.buffer += array("I", [i for edge in self.edges for i in edge]).tobytes()
+
+    def step(self, added_nodes=(), removed_nodes=(), added_edges=(), removed_edges=()):
+        # Same order and contract as a GraphHistory version: a removed node's edges are listed in removed_edges.
+        self.starts.append(self._offset())
+        buffer, ids, nodes, edges = self.buffer, self._id, self.nodes, self.edges
+        records = 1
+        for u, v in removed_edges:
+            edge = (ids(u), ids(v))
+            if edge in edges:
+                edges.discard(edge)
+                buffer += EVENT.pack(T_REMOVE_EDGE, *edge)
+                records += 1
+        for node in removed_nodes:
+            node_id = ids(node)
+            if node_id in nodes:
+                nodes.discard(node_id)
+                buffer += EVENT.pack(T_REMOVE_NODE, node_id, 0)
+                records += 1
+        for node in added_nodes:
+            node_id = ids(node)
+            if node_id not in nodes:
+                nodes.add(node_id)
+                buffer += EVENT.pack(T_ADD_NODE, node_id, 0)
+                records += 1
+        for u, v in added_edges:
+            edge = (ids(u), ids(v))
+            if edge in edges:
+                continue
+            for node_id in edge:
+                if node_id not in nodes:
+                    nodes.add(node_id)
+                    buffer += EVENT.pack(T_ADD_NODE, node_id, 0)
+                    records += 1
+            edges.add(edge)
+            buffer += EVENT.pack(T_ADD_EDGE, *edge)
+            records += 1
+        buffer += STEP.pack(T_STEP)
+        self.steps += 1
+        self.since_keyframe += records
+        if self.since_keyframe >= max(self.keyframe_interval, (len(nodes) + len(edges)) // KEYFRAME_RATIO):
+            self._keyframe()
+        if len(buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self.buffer and not self.file.closed:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.written += len(self.buffer)
+            self.buffer = bytearray()
+
+    def close(self):
+        # The footer repeats the keyframe index and name table, so a reader can seek without scanning.
+        if self.file.closed:
+            return
+        index_offset = self._offset()
+        self.buffer += INDEX.pack(T_INDEX, len(self.keyframes), len(self.names))
+        for step, offset in self.keyframes:
+            self.buffer += INDEX_ENTRY.pack(step, offset)
+        for name in self.names:
+            encoded = str(name).encode()
+            self.buffer += struct.pack("<H", len(encoded)) + encoded
+        self.buffer += self.starts.tobytes()
+        self.buffer += TRAILER.pack(index_offset, self.steps, TRAILER_MAGIC)
+        self.flush()
+        self.file.close()
+
+    def replay(self, previous=None):
+        # What has been recorded so far, sharing this recorder's index and names. Passing the previous
+        # replay of this recording extends it in place, so its position and graph are kept.
+        self.flush()
+        index = (list(self.keyframes), list(self.names), self.steps, self._offset(), array("Q", self.starts))
+        if previous is not None and previous.path == self.path:
+            previous._load(index)
+            return previous
+        return SimulationReplay(self.path, index=index)
+
+
+class SimulationReplay:
+    # graph_at() moves one reused graph: forward or backward from the current step, record by record,
+    # or from the nearest keyframe when that is cheaper. Scrubbing to a neighbouring step costs only
+    # the changes between the two steps.
+    def __init__(self, path, index=None):
+        self.path = path
+        self.data = None
+        self.graph = nx.DiGraph()
+        self.position = None  # step self.graph shows
+        self._load(index)
+
+    def _load(self, index):
+        # (Re)maps the file, which a live recording keeps growing.
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise RecordingError(f"'{self.path}' is too short to be a simulation recording")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data is not None:
+            self.data.close()
+        self.data = data
+        magic, version, self.seed, self.keyframe_interval = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise RecordingError(f"'{self.path}' is not a simulation recording")
+        if index is not None:
+            keyframes, self.names, self.steps, self.end, self.starts = index
+        else:
+            keyframes = self._read_footer() or self._scan()
+        self.keyframe_steps = [step for step, _ in keyframes]
+        self.keyframe_offsets = [offset for _, offset in keyframes]
+
+    def _read_footer(self):
+        data = self.data
+        if len(data) < HEADER.size + TRAILER.size:
+            return None
+        index_offset, steps, magic = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+        if magic != TRAILER_MAGIC or index_offset >= len(data):
+            return None
+        tag, count, name_count = INDEX.unpack_from(data, index_offset)
+        if tag != T_INDEX:
+            return None
+        pos = index_offset + INDEX.size
+        keyframes = [INDEX_ENTRY.unpack_from(data, pos + i * INDEX_ENTRY.size) for i in range(count)]
+        pos += count * INDEX_ENTRY.size
+        self.names = []
+        for _ in range(name_count):
+            (length,) = struct.unpack_from("<H", data, pos)
+            self.names.append(data[pos + 2:pos + 2 + length].decode())
+            pos += 2 + length
+        self.starts = array("Q", data[pos:pos + 8 * steps])
+        self.steps, self.end = steps, index_offset
+        return keyframes
+
+    def _scan(self):
+        # Recordings cut short (e.g. a crash) have no footer; rebuild the index with one pass.
+        data, pos, end = self.data, HEADER.size, len(self.data)
+        keyframes, self.names, steps = [], [], 0
+        self.starts = starts = array("Q")
+        step_start = None
+        while pos < end:
+            tag = data[pos]
+            if step_start is None:
+                step_start = pos
+            if tag == T_STEP:
+                starts.append(step_start)
+                step_start = None
+                steps += 1
+                pos += STEP.size
+            elif T_ADD_NODE <= tag <= T_REMOVE_EDGE:
+                pos += EVENT.size
+            elif tag == T_NAME:
+                _, _, length = NAME.unpack_from(data, pos)
+                self.names.append(data[pos + NAME.size:pos + NAME.size + length].decode())
+                pos += NAME.size + length
+            elif tag == T_KEYFRAME and pos + KEYFRAME.size <= end:
+                _, step, node_count, edge_count = KEYFRAME.unpack_from(data, pos)
+                keyframes.append((step, pos))
+                pos += KEYFRAME.size + 4 * (node_count + 2 * edge_count)
+                step_start = None  # the next step starts after the keyframe (and the names it interned)
+            else:
+                break
+        self.steps, self.end = steps, min(pos, end)
+        return keyframes
+
+    def graph_at(self, step):
+        """The graph after `step` steps. The replay's own graph is returned and moved by the next call;
+        copy it to keep it."""
+        step = max(0, min(step, self.steps))
+        k = bisect_right(self.keyframe_steps, step) - 1
+        if k < 0:
+            raise RecordingError(f"'{self.path}' has no keyframe")
+        target = self._start(step)
+        # Walking costs the records in between, in either direction; a keyframe costs rebuilding its whole graph first.
+        keyframe = self.keyframe_offsets[k]
+        _, _, node_count, edge_count = KEYFRAME.unpack_from(self.data, keyframe)
+        rebuild = (node_count + edge_count) * KEYFRAME_COST * EVENT.size + target - self._start(self.keyframe_steps[k])
+        if self.position is None or abs(target - self._start(self.position)) > rebuild:
+            self._load_keyframe(keyframe)
+            self.position = self.keyframe_steps[k]
+        current = self._start(self.position)
+        if target > current:
+            self._walk(current, target, forward=True)
+        elif target < current:
+            self._walk(target, current, forward=False)
+        self.position = step
+        return self.graph
+
+    def _start(self, step):
+        return self.starts[step] if step < self.steps else self.end
+
+    def _load_keyframe(self, pos):
+        data, names = self.data, self.names
+        _, _, node_count, edge_count = KEYFRAME.unpack_from(data, pos)
+        pos += KEYFRAME.size
+        nodes = array("I", data[pos:pos + 4 * node_count])
+        pos += 4 * node_count
+        flat = array("I", data[pos:pos + 8 * edge_count])
+        graph = self.graph = nx.DiGraph()
+        graph.add_nodes_from(names[i] for i in nodes)
+        graph.add_edges_from((names[u], names[v]) for u, v in zip(flat[0::2], flat[1::2]))
+
+    def _walk(self, pos, end, forward):
+        # Applies the records in [pos, end), or undoes them last to first. Every record is a real change and
+        # new endpoints have their own node record, so each one inverts exactly.
+        data, events = self.data, []
+        while pos < end:
+            tag = data[pos]
+            if tag == T_STEP:
+                pos += STEP.size
+            elif tag == T_NAME:
+                pos += NAME.size + NAME.unpack_from(data, pos)[2]
+            elif tag == T_KEYFRAME:
+                _, _, node_count, edge_count = KEYFRAME.unpack_from(data, pos)
+                pos += KEYFRAME.size + 4 * (node_count + 2 * edge_count)
+            else:
+                events.append(EVENT.unpack_from(data, pos))
+                pos += EVENT.size
+        if forward:
+            add_node, remove_node, add_edge, remove_edge = T_ADD_NODE, T_REMOVE_NODE, T_ADD_EDGE, T_REMOVE_EDGE
+        else:
+            add_node, remove_node, add_edge, remove_edge = T_REMOVE_NODE, T_ADD_NODE, T_REMOVE_EDGE, T_ADD_EDGE
+            events.reverse()
+        graph, names = self.graph, self.names
+        for tag, a, b in events:
+            if tag == remove_edge:
+                graph.remove_edge(names[a], names[b])
+            elif tag == remove_node:
+                graph.remove_node(names[a])
+            elif tag == add_node:
+                graph.add_node(names[a])
+            elif tag == add_edge:
+                graph.add_edge(names[a], names[b])
+
+    def close(self):
+        self.data.close()
@@ -0,0 +1,54 @@
+import networkx as nx
+import pytest
+
+import ai_backends
+from ai_backends import GeminiBackend, LocalBackend, MockGeminiServer, RoutedBackend
+
+
+@pytest.fixture
+def mock_server():
+    server = MockGeminiServer(prediction_text="Analysis:\nÉtat bloqué — P1 ⇄ P2 attend 🔒.\nPrevention strategies:\n- Ordonner l’accès.")
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_stream_decodes_non_ascii_text(mock_server):
+    backend = GeminiBackend("key", mock_server.endpoint)
+    chunks = list(backend.predict_stream("what happens?", [], nx.DiGraph()))
+    assert len(chunks) > 1
+    assert "".join(chunks) == mock_server.prediction_text
+    assert backend.predict("what happens?", [], nx.DiGraph()).text == mock_server.prediction_text
+
+
+def test_remote_recommendation_is_parsed(mock_server):
+    features = ai_backends.Features(nx.DiGraph([("P1", "P2"), ("P2", "P1")]))
+    recommendation = GeminiBackend("key", mock_server.endpoint).recommend(features)
+    assert recommendation.method == "Resource Timeout"
+    assert recommendation.reasons[0] == "Breaks the cycle without losing work"
+
+
+def test_local_rules_answer_without_escalating(mock_server):
+    routed = RoutedBackend(LocalBackend(), GeminiBackend("key", mock_server.endpoint))
+    features = ai_backends.Features(nx.DiGraph([("P1", "P2"), ("P2", "P1")]))
+    assert routed.recommend(features).method == "Preemption"
+    assert routed.escalations == 0 and mock_server.prompts == []
+
+
+def test_unreachable_remote_falls_back_to_local():
+    routed = RoutedBackend(LocalBackend(), GeminiBackend("key", "http://127.0.0.1:9/v1beta/models/x:generateContent", timeout=1))
+    prediction = routed.predict("is this safe?", [], nx.DiGraph())
+    assert prediction.backend == LocalBackend.name and routed.escalations == 1
+
+
+def test_sse_events_join_data_lines():
+    lines = ["data: a", "data: b", "", ": comment", "", "data: c"]
+    assert list(ai_backends.sse_events(lines)) == ["a\nb", "c"]
+
+
+@pytest.mark.parametrize("value", ["high", "", "1.5", "nan"])
+def test_bad_threshold_is_a_backend_error(value):
+    with pytest.raises(ai_backends.BackendError):
+        ai_backends.backend_from_env({"DEADLOCK_AI_THRESHOLD": value})
+    assert ai_backends.backend_from_env({"DEADLOCK_AI_THRESHOLD": "0.4"}).threshold == 0.4
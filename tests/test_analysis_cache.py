@@ -0,0 +1,52 @@
+import random
+
+import networkx as nx
+
+from analysis_cache import AnalysisCache, fingerprint
+
+
+def test_fingerprint_ignores_construction_order():
+    edges = [("P1", "P2"), ("P2", "P3"), ("P3", "P1"), ("P4", "P4")]
+    shuffled = edges[:]
+    random.Random(0).shuffle(shuffled)
+    a = nx.DiGraph(edges)
+    b = nx.DiGraph()
+    b.add_nodes_from(["P4", "P3", "P2", "P1"])
+    b.add_edges_from(shuffled)
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint(nx.DiGraph(edges[:3] + [("P1", "P4")]))
+    assert fingerprint(a, ["P1"]) != fingerprint(a, ["P1", "P2"])
+    # Names are separated, so regrouping the characters of the names is a different graph.
+    assert fingerprint(nx.DiGraph([("P1", "P12")])) != fingerprint(nx.DiGraph([("P11", "P2")]))
+
+
+def test_cache_hits_and_evicts_least_recently_used():
+    cache = AnalysisCache(maxsize=2)
+    cycle = nx.DiGraph([("P1", "P2"), ("P2", "P1")])
+    chain = nx.DiGraph([("P1", "P2")])
+    loop = nx.DiGraph([("P1", "P1")])
+    first = cache.get(cycle, ["P1", "P2"])
+    assert cache.get(nx.DiGraph([("P2", "P1"), ("P1", "P2")]), ["P1", "P2"]) is first
+    cache.get(chain, ["P1", "P2"])
+    cache.get(cycle, ["P1", "P2"])
+    cache.get(loop, ["P1"])  # evicts the chain, the least recently used
+    assert cache.get(cycle, ["P1", "P2"]) is first
+    assert cache.stats() == {"entries": 2, "maxsize": 2, "hits": 3, "misses": 3, "evictions": 1, "hit_rate": 0.5}
+    cache.get(chain, ["P1", "P2"])
+    assert cache.misses == 4 and cache.evictions == 2
+
+
+def test_analysis_of_a_circular_wait():
+    analysis = AnalysisCache().get(nx.DiGraph([("P1", "P2"), ("P2", "P3"), ("P3", "P1")]), ["P1", "P2", "P3", "P4"])
+    assert analysis.deadlocked and "Circular Wait" in analysis.type
+    assert sorted(analysis.involved) == ["P1", "P2", "P3"]
+    assert analysis.series[0] == [1, 1, 1, 0] and analysis.series[1] == [1, 1, 1, 0]
+    risky, message = analysis.ml_risk()
+    assert sorted(risky) == ["P1", "P2", "P3"] and analysis.ml_risk()[0] is risky
+    assert "P1" in message
+
+
+def test_analysis_without_deadlock():
+    analysis = AnalysisCache().get(nx.DiGraph([("P1", "P2")]), ["P1", "P2", "P3"])
+    assert not analysis.deadlocked and analysis.cycle_str == "N/A" and analysis.cycles == []
+    assert analysis.ml_risk()[0] == []
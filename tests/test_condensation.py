@@ -0,0 +1,54 @@
+import random
+from collections import Counter
+
+import networkx as nx
+
+from condensation import Condensation
+
+
+def canonical(cond):
+    key = {c: frozenset(members) for c, members in cond.members.items()}
+    components = {key[c]: cond.cyclic[c] for c in cond.members}
+    links = Counter({(key[a], key[b]): n for a, targets in cond.links.items() for b, n in targets.items()})
+    back = Counter({(key[a], key[b]): n for b, sources in cond.back.items() for a, n in sources.items()})
+    assert links == back
+    assert all(cond.comp_of[n] == c for c, members in cond.members.items() for n in members)
+    return components, links
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = random.Random(7)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(20))
+    cond = Condensation(graph)
+    for _ in range(400):
+        added_nodes, removed_nodes, added_edges, removed_edges = [], [], [], []
+        roll = rng.random()
+        if roll < 0.55:
+            u, v = rng.randrange(24), rng.randrange(24)
+            if not graph.has_edge(u, v):
+                added_nodes = [n for n in (u, v) if n not in graph]
+                graph.add_edge(u, v)
+                added_edges = [(u, v)]
+        elif roll < 0.9 and graph.number_of_edges():
+            u, v = rng.choice(list(graph.edges))
+            graph.remove_edge(u, v)
+            removed_edges = [(u, v)]
+        elif len(graph) > 2:
+            n = rng.choice(list(graph))
+            removed_edges = list(set(graph.in_edges(n)) | set(graph.out_edges(n)))
+            graph.remove_node(n)
+            removed_nodes = [n]
+        cond.apply(added_nodes, removed_nodes, added_edges, removed_edges)
+        assert canonical(cond) == canonical(Condensation(graph))
+
+
+def test_summary_folds_blocked_processes_into_their_group():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P1"), ("P3", "P1"), ("P4", "P3"), ("P5", "P5"), ("P6", "P5"), ("P7", "P8")])
+    summary = Condensation(graph).summary(expanded=["P1"])
+    assert [g.members for g in summary.groups] == [["P1", "P2"], ["P5"]]
+    first, second = summary.groups
+    assert (first.waiting, first.chain, first.expanded) == (2, 2, True)
+    assert sorted(first.edges) == [("P1", "P2"), ("P2", "P1")]
+    assert (second.waiting, second.expanded) == (1, False)
+    assert (summary.deadlocked, summary.blocked, summary.free, summary.hidden) == (3, 3, 2, 0)
@@ -0,0 +1,60 @@
+import pytest
+from PyQt6.QtWidgets import QApplication, QTableWidget
+
+from dependency_model import DependencyModel, TableBinding
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def cells(table):
+    return [[table.item(i, j).text() for j in range(table.columnCount())] for i in range(table.rowCount())]
+
+
+def test_model_emits_each_change(app):
+    model = DependencyModel(3)
+    seen = []
+    model.edge_added.connect(lambda u, v: seen.append(("+", u, v)))
+    model.edge_removed.connect(lambda u, v: seen.append(("-", u, v)))
+    model.nodes_changed.connect(lambda added, removed: seen.append(("nodes", sorted(added), sorted(removed))))
+    model.changed.connect(lambda: seen.append("changed"))
+    model.set_edge("P1", "P2", True)
+    assert model.set_edge("P1", "P2", True) is None
+    model.versions.undo()
+    assert seen == [("nodes", ["P1", "P2"], []), ("+", "P1", "P2"), "changed",
+                    ("nodes", [], ["P1", "P2"]), ("-", "P1", "P2"), "changed"]
+
+
+def test_shrinking_drops_processes_for_good(app):
+    model = DependencyModel(4)
+    model.set_edge("P1", "P4", True)
+    model.set_edge("P2", "P1", True)
+    model.set_process_count(2)
+    assert model.processes == ["P1", "P2"] and set(model.graph.edges) == {("P2", "P1")}
+    assert not model.versions.can_undo() and model.versions.undo() is None
+    assert "P4" not in model.graph
+    model.set_process_count(4)  # growing adds empty rows, nothing to record
+    assert model.matrix() == [["0", "0", "0", "0"], ["1", "0", "0", "0"], ["0"] * 4, ["0"] * 4]
+    model.set_edge("P3", "P4", True)
+    model.versions.undo()
+    assert set(model.graph.edges) == {("P2", "P1")} and not model.versions.can_undo()
+
+
+def test_table_binding_follows_both_ways(app):
+    model = DependencyModel(3)
+    table = QTableWidget()
+    TableBinding(model, table)
+    model.set_edge("P1", "P3", True)
+    assert cells(table)[0] == ["0", "0", "1"]
+    table.item(2, 1).setText("1")
+    assert model.graph.has_edge("P3", "P2")
+    table.item(2, 1).setText("yes")  # anything but "1" is no dependency, and the cell says so
+    assert not model.graph.has_edge("P3", "P2") and table.item(2, 1).text() == "0"
+    model.versions.undo()
+    assert cells(table)[2] == ["0", "1", "0"]
+    model.versions.undo()
+    assert cells(table)[2] == ["0", "0", "0"]
+    model.set_process_count(2)
+    assert cells(table) == [["0", "0"], ["0", "0"]]
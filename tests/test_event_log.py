@@ -0,0 +1,64 @@
+import logging
+
+import pytest
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+import event_log
+from event_log import EventLog, Severity
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    # A private file handler, so the tests never write to the user's real log.
+    path = tmp_path / "deadlock_app.log"
+    monkeypatch.setattr(event_log, "log_path", lambda: str(path))
+    monkeypatch.setattr(event_log, "_file_handler", None)
+    yield path
+    logging.getLogger("deadlock").removeHandler(event_log._file_handler)
+    event_log._file_handler.close()
+
+
+def texts(log):
+    return [text for text, _ in log.model.entries]
+
+
+def test_lines_are_batched_into_one_insert(app, log_file):
+    log = EventLog("batched")
+    inserts = []
+    log.model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+    log.log("first")
+    log.log("second\nthird", Severity.ALERT)
+    assert log.model.rowCount() == 0 and len(log.pending) == 3
+    QTest.qWait(60)
+    assert texts(log) == ["first", "second", "third"] and inserts == [(0, 2)]
+    assert log.model.entries[1][1] is Severity.ALERT
+
+
+def test_ring_buffer_keeps_the_latest_entries(app, log_file):
+    log = EventLog("ring", capacity=5)
+    for i in range(3):
+        log.log(f"line {i}")
+    log.flush()
+    # A full batch flushes at once instead of waiting for the frame timer.
+    for i in range(3, 12):
+        log.log(f"line {i}")
+    assert texts(log) == [f"line {i}" for i in range(3, 8)] and len(log.pending) == 4
+    log.log("line 12")
+    assert log.text().splitlines() == [f"line {i}" for i in range(8, 13)]
+
+
+def test_every_line_reaches_the_log_file(app, log_file):
+    log = EventLog("file", capacity=2)
+    for i in range(4):
+        log.log(f"entry {i}", Severity.ALERT if i == 3 else Severity.INFO)
+    log.flush()
+    event_log._file_handler.flush()
+    lines = log_file.read_text().splitlines()
+    assert [line.split()[-1] for line in lines] == ["0", "1", "2", "3"]
+    assert "deadlock.file WARNING entry 3" in lines[-1]
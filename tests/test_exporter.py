@@ -0,0 +1,71 @@
+import os
+import random
+import threading
+
+import networkx as nx
+import pytest
+
+import exporter
+import graph_io
+
+
+def random_graph(n, p, seed, names=None):
+    rng = random.Random(seed)
+    processes = names or [f"P{i + 1}" for i in range(n)]
+    graph = nx.DiGraph()
+    graph.add_edges_from((u, v) for u in processes for v in processes if rng.random() < p)
+    return graph, processes
+
+
+@pytest.mark.parametrize("fmt", exporter.MATRIX_FORMATS)
+@pytest.mark.parametrize("names", [None, ["Alpha", "B2", "c", "P9", "P1"]])
+def test_matrix_formats_round_trip_through_load(tmp_path, monkeypatch, fmt, names):
+    # Small blocks, so the CSV writer covers full blocks, a partial last block and rows in between.
+    monkeypatch.setattr(exporter, "CSV_BLOCK_ROWS", 2)
+    graph, processes = random_graph(5, 0.4, 1, names)
+    graph.add_edge(processes[0], processes[0])
+    ext = "txt" if fmt == "edgelist" else fmt
+    path = exporter.write_matrix(graph, processes, str(tmp_path / f"values.{ext}"), fmt)
+    loaded = graph_io.load(path)
+    assert set(loaded.to_networkx().edges) == set(graph.edges)
+    if fmt != "edgelist":  # an edge list only names the processes that have dependencies
+        assert loaded.process_names() == processes
+
+
+def test_csv_blocks_match_a_dense_matrix(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "CSV_BLOCK_ROWS", 7)
+    graph, processes = random_graph(40, 0.1, 2)
+    path = exporter.write_matrix(graph, processes, str(tmp_path / "values.csv"))
+    with open(path, newline="") as f:
+        rows = f.read().split("\r\n")
+    assert rows[0] == "," + ",".join(processes) and rows[-1] == ""
+    for u, row in zip(processes, rows[1:-1]):
+        label, *cells = row.split(",")
+        assert label == u and cells == ["1" if graph.has_edge(u, v) else "0" for v in processes]
+
+
+@pytest.mark.parametrize("kind", list(exporter.CHART_KINDS))
+@pytest.mark.parametrize("fmt, magic", [("png", b"\x89PNG"), ("svg", b"<?xml"), ("pdf", b"%PDF")])
+def test_render_chart_writes_each_format(tmp_path, kind, fmt, magic):
+    graph, processes = random_graph(4, 0.5, 3)
+    path = exporter.render_chart(kind, graph, processes, str(tmp_path / f"chart.{fmt}"), fmt)
+    with open(path, "rb") as f:
+        assert f.read(len(magic)) == magic
+
+
+def test_exports_in_the_same_second_get_distinct_paths(tmp_path):
+    done, finished = [], threading.Event()
+    export = exporter.Exporter(str(tmp_path), on_done=lambda path: (done.append(path), len(done) == 3 and finished.set()))
+    graph, processes = random_graph(3, 0.5, 4)
+    for _ in range(3):
+        export.export_matrix(graph, processes, "csv")
+    assert finished.wait(10)
+    export.shutdown()
+    assert sorted(os.path.basename(path) for path in done) == sorted(path.name for path in tmp_path.iterdir())
+    assert len(set(done)) == 3 and all(graph_io.load(path).n == 3 for path in done)
+
+
+def test_unique_path_claims_the_name(tmp_path):
+    first = exporter.unique_path(str(tmp_path), "simulation", "dlsim")
+    second = exporter.unique_path(str(tmp_path), "simulation", "dlsim")
+    assert second != first and os.path.exists(first) and os.path.exists(second)
@@ -0,0 +1,73 @@
+import networkx as nx
+
+from graph_history import GraphHistory
+
+
+def edges(graph):
+    return set(graph.edges)
+
+
+def test_undo_and_redo_restore_exact_graphs():
+    history = GraphHistory()
+    history.add_edges([("P1", "P2"), ("P2", "P3")])
+    history.remove_node("P2")
+    assert edges(history.graph) == set() and "P2" not in history.graph
+    history.undo()
+    assert edges(history.graph) == {("P1", "P2"), ("P2", "P3")}
+    history.undo()
+    assert history.graph.number_of_nodes() == 0 and not history.can_undo()
+    history.redo()
+    history.redo()
+    assert "P2" not in history.graph and not history.can_redo()
+
+
+def test_versions_store_only_real_changes():
+    history = GraphHistory()
+    first = history.add_edges([("P1", "P2")])
+    assert history.add_edges([("P1", "P2")]) is first
+    assert history.remove_edge("P3", "P4") is first
+    assert first.size() == 3  # two nodes and one edge
+
+
+def test_branching_after_undo_keeps_both_branches_reachable():
+    history = GraphHistory()
+    base = history.add_edges([("P1", "P2"), ("P2", "P1")])
+    kill = history.remove_node("P1")
+    history.undo()
+    timeout = history.remove_edge("P2", "P1")
+    assert history.branches(base) == [kill, timeout]
+    added, removed = history.diff(kill)
+    assert added == {("P1", "P2")} and removed == set()
+    history.checkout(kill)
+    assert edges(history.graph) == set()
+    assert edges(history.snapshot(timeout)) == {("P1", "P2")}
+    assert edges(history.graph) == set()
+
+
+def test_commit_records_the_difference_to_a_whole_graph():
+    history = GraphHistory()
+    history.add_edges([("P1", "P2"), ("P2", "P3")])
+    version = history.commit(nx.DiGraph([("P2", "P3"), ("P3", "P4")]), "Import")
+    assert set(version.added_edges) == {("P3", "P4")}
+    assert set(version.removed_edges) == {("P1", "P2")}
+    assert history.changes(0) == (["P2", "P3", "P4"], [], [("P2", "P3"), ("P3", "P4")], [])
+
+
+def test_listeners_see_every_change_including_undo():
+    history = GraphHistory()
+    seen = []
+    history.listeners.append(lambda *change: seen.append(tuple(map(list, change))))
+    history.add_edges([("P1", "P2")])
+    history.undo()
+    assert seen == [(["P1", "P2"], [], [("P1", "P2")], []), ([], ["P1", "P2"], [], [("P1", "P2")])]
+
+
+def test_barrier_versions_cannot_be_undone():
+    history = GraphHistory()
+    first = history.add_edges([("P1", "P2")])
+    barrier = history.record("Resize", removed_nodes=["P2"], barrier=True)
+    history.add_edges([("P1", "P3")])
+    assert history.undo() is not None and history.head is barrier
+    assert not history.can_undo() and history.undo() is None
+    assert history.checkout(first) is None and history.head is barrier
+    assert edges(history.graph) == set() and history.redo() is not None
@@ -0,0 +1,107 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import graph_io
+from graph_io import GraphFormatError, WaitForGraph
+
+
+def never_finish(graph):
+    cyclic = set()
+    for component in nx.strongly_connected_components(graph):
+        node = next(iter(component))
+        if len(component) > 1 or graph.has_edge(node, node):
+            cyclic |= component
+    return cyclic.union(*(nx.ancestors(graph, n) for n in cyclic))
+
+
+def test_reduce_matches_networkx():
+    rng = random.Random(2)
+    for _ in range(30):
+        n = rng.randint(1, 40)
+        graph = nx.gnp_random_graph(n, rng.choice([0.02, 0.05, 0.1]), seed=rng.randrange(10 ** 6), directed=True)
+        if rng.random() < 0.3:
+            graph.add_edge(0, 0)
+        src, dst = zip(*graph.edges) if graph.number_of_edges() else ((), ())
+        wfg = WaitForGraph.from_edges(src, dst, n)
+        stuck = wfg.reduce()
+        assert set(np.flatnonzero(stuck).tolist()) == never_finish(graph)
+        cycle = wfg.find_cycle(stuck)
+        assert bool(cycle) == bool(stuck.any())
+        assert all(graph.has_edge(u, v) for u, v in zip(cycle, cycle[1:] + cycle[:1]))
+
+
+def test_deep_chain_reduces():
+    n = 200_000
+    chain = WaitForGraph.from_edges(np.arange(n - 1), np.arange(1, n), n)
+    assert not chain.reduce().any()
+    closed = WaitForGraph.from_edges(np.arange(n), (np.arange(n) + 1) % n, n)
+    assert closed.detect().stuck == n
+
+
+def test_formats_round_trip(tmp_path):
+    edges = [("A", "B"), ("B", "C"), ("C", "A"), ("D", "A"), ("E", "E"), ("F", "G")]
+    text = tmp_path / "graph.txt"
+    text.write_text("# waits\nA B\nB,C\nC -> A\nD\tA  # comment\nE;E\nF G\n")
+    loaded = graph_io.load(str(text))
+    assert set(loaded.to_networkx().edges) == set(edges)
+    detection = loaded.detect()
+    assert detection.stuck == 5 and detection.deadlocked and "processes can never finish" in detection.describe()
+
+    binary = graph_io.load(loaded.save(str(tmp_path / "graph.wfg")))
+    assert binary.process_names() == loaded.process_names()
+    assert set(binary.to_networkx().edges) == set(edges)
+
+    nx.write_graphml(nx.DiGraph(edges), str(tmp_path / "graph.graphml"))
+    assert set(graph_io.load(str(tmp_path / "graph.graphml")).to_networkx().edges) == set(edges)
+
+
+def test_numbered_edge_list_needs_no_name_table(tmp_path):
+    path = tmp_path / "numbered.edgelist"
+    path.write_text("P1 P2\nP2 P3\nP3 P1\n")
+    graph = graph_io.load(str(path))
+    assert graph.names is None and graph.n == 3 and graph.detect().cycle[0] in ("P1", "P2", "P3")
+
+
+@pytest.mark.parametrize("content", [b"", b"DLWFG\0" + b"\0" * 40, b"not a graph at all, just some text"])
+def test_bad_binary_files_are_rejected(tmp_path, content):
+    path = tmp_path / "bad.wfg"
+    path.write_bytes(content)
+    with pytest.raises(GraphFormatError):
+        graph_io.load(str(path))
+
+
+def test_odd_edge_list_is_rejected(tmp_path):
+    path = tmp_path / "odd.txt"
+    path.write_text("P1 P2\nP3\n")
+    with pytest.raises(GraphFormatError):
+        graph_io.load(str(path))
+
+
+@pytest.mark.parametrize("cell", ["x1", "x", "1e"])
+def test_non_numeric_csv_cell_is_rejected(tmp_path, cell):
+    path = tmp_path / "matrix.csv"
+    path.write_text(f",P1,P2\nP1,0,{cell}\nP2,1,0\n")
+    with pytest.raises(GraphFormatError):
+        graph_io.load(str(path))
+    assert graph_io.main([str(path)]) == 1
+
+
+@pytest.mark.parametrize("section, value", [(1, 7), (1, -1), (0, 5)])
+def test_corrupt_binary_arrays_are_rejected(tmp_path, section, value):
+    path = tmp_path / "corrupt.wfg"
+    WaitForGraph.from_edges([0, 1, 2], [1, 2, 0], 3).save(str(path))
+    data = path.read_bytes()
+    # Section 0 is out_indptr (int64), section 1 out_indices (int32), right after the header.
+    offset = graph_io.HEADER.size + (-graph_io.HEADER.size % graph_io.ALIGN)
+    if section == 0:
+        patch = np.int64(value).tobytes()
+        offset += 8
+    else:
+        patch = np.int32(value).tobytes()
+        offset += 4 * 8
+    path.write_bytes(data[:offset] + patch + data[offset + len(patch):])
+    with pytest.raises(GraphFormatError):
+        graph_io.load(str(path)).detect()
@@ -0,0 +1,103 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import heatmap
+from heatmap import AdjacencyPyramid, HeatmapView
+
+
+def random_graph(n, edges, seed):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(f"P{i + 1}" for i in range(n))
+    graph.add_edges_from((f"P{rng.randrange(n) + 1}", f"P{rng.randrange(n) + 1}") for _ in range(edges))
+    return graph
+
+
+def dense_matrix(pyramid, graph):
+    position = {node: i for i, node in enumerate(pyramid.order)}
+    matrix = np.zeros((pyramid.n, pyramid.n), dtype=np.int64)
+    for u, v in graph.edges:
+        matrix[position[u], position[v]] += 1
+    return matrix
+
+
+def reference_tile(matrix, r0, r1, c0, c1, block):
+    # Whole blocks covering the range, cut short only at the edge of the matrix.
+    rows = range(r0 // block, -(-r1 // block))
+    cols = range(c0 // block, -(-c1 // block))
+    return np.array([[matrix[i * block:(i + 1) * block, j * block:(j + 1) * block].sum() for j in cols] for i in rows])
+
+
+@pytest.mark.parametrize("dense_cells", [1 << 22, 16, 1])
+@pytest.mark.parametrize("n", [1, 7, 33, 64])
+def test_tiles_match_a_dense_reference(monkeypatch, dense_cells, n):
+    # Small dense budgets push the finer levels onto the sparse path.
+    monkeypatch.setattr(heatmap, "DENSE_CELLS", dense_cells)
+    graph = random_graph(n, 3 * n, n)
+    pyramid = AdjacencyPyramid(graph)
+    matrix = dense_matrix(pyramid, graph)
+    assert pyramid.levels[pyramid.top_level].shape == (1, 1)
+    assert pyramid.levels[pyramid.top_level].sum() == graph.number_of_edges()
+    rng = random.Random(n)
+    for _ in range(40):
+        r0, r1 = sorted(rng.sample(range(n + 1), 2)) if n > 1 else (0, 1)
+        c0, c1 = sorted(rng.sample(range(n + 1), 2)) if n > 1 else (0, 1)
+        pixels = rng.choice([1, 2, 3, 5, 16, 100])
+        counts, block, (row, col) = pyramid.tile(r0, r1, c0, c1, pixels)
+        assert block == 1 << pyramid.level_for(max(r1 - r0, c1 - c0), pixels)
+        assert (row, col) == (r0 // block * block, c0 // block * block)
+        expected = reference_tile(matrix, r0, r1, c0, c1, block)
+        assert np.array_equal(counts, expected)
+
+
+def test_level_is_the_smallest_that_fits_the_pixels():
+    pyramid = AdjacencyPyramid(random_graph(100, 300, 1))
+    assert pyramid.top_level == 7
+    for span in range(1, 101):
+        for pixels in (1, 3, 10, 64, 200):
+            k = pyramid.level_for(span, pixels)
+            assert span >> k <= pixels and (k == 0 or span >> (k - 1) > pixels)
+    assert pyramid.level_for(1 << 20, 1) == pyramid.top_level
+
+
+def test_components_are_ordered_sources_first_with_cycles_as_diagonal_blocks():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P3"), ("P3", "P2"), ("P3", "P4"), ("P4", "P5"), ("P5", "P4"),
+                        ("P6", "P6"), ("P1", "P6")])
+    pyramid = AdjacencyPyramid(graph, ["P7"])
+    position = {node: i for i, node in enumerate(pyramid.order)}
+    assert sorted(pyramid.order) == sorted(graph.nodes) + ["P7"]
+    components = [{"P2", "P3"}, {"P4", "P5"}, {"P6"}]
+    assert {frozenset(pyramid.order[first:first + size]) for first, size in pyramid.groups} == set(map(frozenset, components))
+    for u, v in graph.edges:
+        same = any(u in c and v in c for c in components)
+        assert position[u] < position[v] or same
+
+
+def test_zoom_and_pan_stay_inside_the_matrix():
+    pyramid = AdjacencyPyramid(random_graph(50, 100, 2))
+    view = HeatmapView(pyramid)
+    rng = random.Random(3)
+    for _ in range(500):
+        if rng.random() < 0.5:
+            view.zoom(rng.choice([0.5, 0.8, 1.25, 2.0]), rng.uniform(-10, 60), rng.uniform(-10, 60))
+        else:
+            view.pan(rng.uniform(-30, 30), rng.uniform(-30, 30))
+        for start, stop in ((view.r0, view.r1), (view.c0, view.c1)):
+            assert 0 <= start and stop <= 50 and stop - start >= heatmap.MIN_SPAN - 1e-9
+        r0, r1, c0, c1 = view.bounds()
+        assert 0 <= r0 < r1 <= 50 and 0 <= c0 < c1 <= 50
+    view.reset()
+    assert view.bounds() == (0, 50, 0, 50)
+
+
+def test_zoom_keeps_the_cell_under_the_cursor():
+    view = HeatmapView(AdjacencyPyramid(random_graph(100, 200, 4)))
+    view.zoom(0.5, 30, 70)
+    assert (view.r0, view.r1, view.c0, view.c1) == (15, 65, 35, 85)
+    view.zoom(0.01, 40, 40)  # clamped at the deepest zoom
+    assert view.r1 - view.r0 == heatmap.MIN_SPAN
+    view.zoom(100, 50, 50)  # and at the whole matrix
+    assert view.bounds() == (0, 100, 0, 100)
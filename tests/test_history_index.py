@@ -0,0 +1,68 @@
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from history_index import HistoryIndex, canonical_cycle, find_cycle, record_edges
+
+START = datetime(2024, 3, 1, 9, 30)
+CYCLES = [["P1", "P2"], ["P3", "P4", "P5"], ["P2", "P6", "P3"]]
+
+
+def random_records(rng, count):
+    records = []
+    for _ in range(count):
+        when = START + timedelta(minutes=rng.randrange(60 * 24 * 20))
+        if rng.random() < 0.4:
+            cycle = rng.choice(CYCLES)
+            shift = rng.randrange(len(cycle))
+            cycle = cycle[shift:] + cycle[:shift]
+            state = {f"{u}->{v}": 1 for u, v in zip(cycle, cycle[1:] + cycle[:1])}
+            records.append({"timestamp": when.isoformat(sep=" "), "state": state, "label": 1,
+                            "cycle": " -> ".join(f"{u} to {v}" for u, v in zip(cycle, cycle[1:] + cycle[:1]))})
+        else:
+            records.append({"timestamp": when.isoformat(sep=" "), "matrix": [["0", "1"], ["0", "0"]], "label": 0})
+    # Appended out of order, as merged history files are.
+    rng.shuffle(records)
+    return records
+
+
+def test_range_queries_match_a_scan():
+    rng = random.Random(4)
+    records = random_records(rng, 600)
+    index = HistoryIndex(records)
+    for _ in range(20):
+        since = START + timedelta(hours=rng.randrange(24 * 20))
+        until = since + timedelta(hours=rng.randrange(1, 24 * 10))
+        # Hourly buckets: a range covers the whole hours it touches.
+        lo = since.replace(minute=0)
+        hi = until if until == until.replace(minute=0, second=0, microsecond=0) else until.replace(minute=0) + timedelta(hours=1)
+        chosen = [r for r in records if lo <= datetime.fromisoformat(r["timestamp"]) < hi]
+        assert index.rate(since, until) == (len(chosen), sum(r["label"] for r in chosen))
+        expected = Counter(canonical_cycle(find_cycle(record_edges(r))) for r in chosen if r["label"])
+        assert dict((cycle, count) for cycle, count, _ in index.top_cycles(10, since, until)) == dict(expected)
+    series = index.series(timedelta(weeks=1))
+    assert all(start.weekday() == 0 and start.hour == 0 for start, _, _ in series)
+    assert sum(r for _, r, _ in series) == len(records)
+    assert [start for start, _, _ in series] == sorted(start for start, _, _ in series)
+
+
+def test_cycles_are_counted_once_whatever_they_start_from():
+    records = [{"timestamp": "2024-01-01 10:00:00", "state": {"P2->P1": 1, "P1->P2": 1}, "label": 1, "cycle": "P2 to P1 -> P1 to P2"},
+               {"timestamp": "2024-01-01 12:00:00", "state": {"P1->P2": 1, "P2->P1": 1}, "label": 1},
+               {"timestamp": "not a time", "matrix": [[0, 1], [1, 0]], "label": 1}]
+    index = HistoryIndex(records)
+    assert index.top_cycles() == [(("P1", "P2"), 3, datetime(2024, 1, 1, 12))]
+    assert index.rate(datetime(2024, 1, 1, 11)) == (1, 1)
+    assert sorted(edge for edge, count in index.hot_edges() if count == 3) == [("P1", "P2"), ("P2", "P1")]
+    report = index.report()
+    assert "3 detections all time, 3 deadlocked" in report and "1 records have no usable timestamp" in report
+    assert "P1 -> P2 -> P1" in report
+
+
+def test_timestamps_with_an_offset_are_local_hours():
+    stamps = ["2026-10-19T05:43:23+00:00", "2026-10-19T05:10:00+05:30", "2026-10-19T05:59:59.5Z", "0001-01-01T00:30:00+05:00"]
+    index = HistoryIndex({"timestamp": stamp, "matrix": [["0"]], "label": 0} for stamp in stamps)
+    local = [datetime.fromisoformat(stamp).astimezone().replace(tzinfo=None) for stamp in stamps[:3]]
+    assert index.undated == 1
+    assert sorted(index._time(hour) for hour in index.hours) == sorted({t.replace(minute=0, second=0, microsecond=0) for t in local})
+    assert "4 detections all time" in index.report()
@@ -0,0 +1,85 @@
+import json
+
+from lock_order import LockOrderAnalyzer, analyze_trace, main, process_records, ChunkResult
+
+
+def record(thread, lock, op, site=None):
+    return json.dumps({"thread": thread, "lock": lock, "op": op, "site": site})
+
+
+def analyze(lines):
+    analyzer = LockOrderAnalyzer()
+    analyzer.merge(process_records(lines, ChunkResult()))
+    return analyzer
+
+
+def nested(thread, first, second):
+    return [record(thread, first, "acquire"), record(thread, second, "acquire"),
+            record(thread, second, "release"), record(thread, first, "release")]
+
+
+def test_two_thread_inversion_is_a_potential_deadlock():
+    reports = analyze(nested(1, "A", "B") + nested(2, "B", "A")).potential_deadlocks()
+    assert len(reports) == 1
+    assert reports[0]["multi_thread"]
+    assert sorted(step["thread"] for step in reports[0]["steps"]) == [1, 2]
+
+
+def test_single_thread_inversion_cannot_hang():
+    reports = analyze(nested(1, "A", "B") + nested(1, "B", "A")).potential_deadlocks()
+    assert len(reports) == 1 and not reports[0]["multi_thread"]
+
+
+def test_distinct_threads_are_found_beyond_the_first_example():
+    # Thread 1 takes both orders first; thread 2 only shows up later in A -> B.
+    lines = nested(1, "A", "B") + nested(1, "B", "A") + nested(2, "A", "B")
+    report, = analyze(lines).potential_deadlocks()
+    assert report["multi_thread"]
+    assert {step["thread"] for step in report["steps"]} == {1, 2}
+
+
+def test_wait_then_acquire_counts_the_ordering_once():
+    lines = [record(1, "A", "acquire"), record(1, "B", "wait"), record(1, "B", "acquire"),
+             record(1, "B", "release"), record(1, "A", "release")]
+    analyzer = analyze(lines)
+    assert analyzer.edges[("A", "B")][0] == 1
+
+
+def test_chunked_trace_matches_whole_trace(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    lines = []
+    for i in range(200):
+        lines += nested(i % 3, "A", "B")
+    lines += nested(7, "B", "A")
+    path.write_text("\n".join(lines) + "\n")
+    whole = analyze_trace(str(path))
+    chunked = analyze_trace(str(path), chunk_size=97)
+    assert whole.records == chunked.records == len(lines)
+    assert {k: v[0] for k, v in whole.edges.items()} == {k: v[0] for k, v in chunked.edges.items()}
+    assert main([str(path)]) == 1
+
+
+def test_reentrant_acquire_across_a_chunk_boundary_adds_no_ordering(tmp_path):
+    # Thread 1 re-acquires R while holding L; thread 2 nests R -> L. Only R -> L is a real ordering.
+    lines = [record(1, "R", "acquire"), record(1, "L", "acquire"), record(1, "R", "acquire"),
+             record(1, "R", "release"), record(1, "L", "release"), record(1, "R", "release")] + nested(2, "R", "L")
+    path = tmp_path / "reentrant.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    whole = analyze_trace(str(path))
+    assert {k: v[0] for k, v in whole.edges.items()} == {("R", "L"): 2}
+    for chunk_size in range(1, path.stat().st_size + 1):
+        chunked = analyze_trace(str(path), chunk_size=chunk_size)
+        assert {k: v[0] for k, v in chunked.edges.items()} == {("R", "L"): 2}, chunk_size
+        assert chunked.potential_deadlocks() == []
+
+
+def test_counts_do_not_depend_on_chunk_size(tmp_path):
+    # A blocked attempt and the acquire that ends it count once, even in different chunks.
+    lines = [record(1, "A", "acquire"), record(1, "B", "wait"), record(1, "B", "acquire"), record(1, "A", "acquire"),
+             record(1, "C", "acquire"), record(1, "C", "release"), record(1, "A", "release"), record(1, "B", "release"),
+             record(1, "C", "acquire"), record(1, "C", "release"), record(1, "A", "release")]
+    path = tmp_path / "waits.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    expected = {("A", "B"): 1, ("A", "C"): 2, ("B", "C"): 1}
+    for chunk_size in range(1, path.stat().st_size + 1):
+        assert {k: v[0] for k, v in analyze_trace(str(path), chunk_size=chunk_size).edges.items()} == expected, chunk_size
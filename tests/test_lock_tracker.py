@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from lock_tracker import LockTracker
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_abba_deadlock_is_reported():
+    tracker = LockTracker(on_deadlock=lambda report: None)
+    a, b = tracker.Lock("A"), tracker.Lock("B")
+    holding = threading.Barrier(2)
+
+    def worker(first, second):
+        with first:
+            holding.wait()
+            second.acquire(timeout=1)
+
+    threads = [threading.Thread(target=worker, args=(a, b)), threading.Thread(target=worker, args=(b, a))]
+    for t in threads:
+        t.start()
+    assert wait_until(lambda: len(tracker._waiting) == 2)
+    tracker.check()
+    reports = tracker.check()
+    assert len(reports) == 1
+    assert sorted(entry[2] for entry in reports[0].cycle) == ["A", "B"]
+    for t in threads:
+        t.join()
+
+
+def test_reacquiring_own_plain_lock_is_a_one_thread_cycle():
+    tracker = LockTracker(on_deadlock=lambda report: None)
+    lock = tracker.Lock("L")
+
+    def worker():
+        with lock:
+            lock.acquire(timeout=1)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert wait_until(lambda: tracker._waiting)
+    tracker.check()
+    reports = tracker.check()
+    assert len(reports) == 1
+    (tid, _, lock_name, owner), = reports[0].cycle
+    assert tid == owner == t.ident and lock_name == "L"
+    t.join()
+
+
+def test_rlock_reentry_is_not_a_wait():
+    tracker = LockTracker()
+    lock = tracker.RLock()
+    with lock:
+        with lock:
+            assert tracker.wait_for_graph().number_of_edges() == 0
+    assert lock.owner is None
+
+
+def test_releasing_an_unheld_lock_leaves_no_phantom_owner():
+    tracker = LockTracker()
+    lock = tracker.Lock()
+    with pytest.raises(RuntimeError):
+        lock.release()
+    assert lock.acquire(False)
+    lock.release()
+    assert lock.owner is None and not lock.locked()
+
+
+def test_untraced_tracker_records_no_events():
+    tracker = LockTracker(trace=False)
+    with tracker.Lock():
+        pass
+    assert tracker.events() == []
+    traced = LockTracker()
+    with traced.Lock("L"):
+        pass
+    assert [op for _, _, op, _, _ in traced.events()] == ["acquire", "release"]
+
+
+def test_fork_reinit_clears_the_owner():
+    tracker = LockTracker()
+    for lock in (tracker.Lock(), tracker.RLock()):
+        lock.acquire()
+        lock._at_fork_reinit()
+        assert lock.owner is None and not lock.locked()
+        assert lock.acquire(False)
+        lock.release()
+
+
+FORK_SCRIPT = """
+import os, threading
+import lock_tracker
+lock_tracker.install()
+t = threading.Thread(target=lambda: None)
+t.start()
+t.join()
+pid = os.fork()
+if pid == 0:
+    threading.Thread(target=lambda: None).start()
+    os._exit(0)
+os._exit(os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]))
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_after_install_resets_thread_locks():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", FORK_SCRIPT], env=dict(os.environ, PYTHONPATH=root),
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0 and "Traceback" not in result.stderr, result.stderr
+
+
+def test_exited_threads_are_pruned_but_keep_their_events():
+    tracker = LockTracker()
+    lock = tracker.Lock("L")
+
+    def worker():
+        with lock:
+            pass
+
+    for _ in range(5):
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+    with lock:
+        pass
+    assert list(tracker._buffers) == [threading.get_ident()]
+    assert len(tracker.events()) == 12
@@ -0,0 +1,58 @@
+import random
+
+import networkx as nx
+import pytest
+
+import reachability
+from reachability import ReachabilityIndex
+
+
+def random_graph(seed, n=40, p=0.05):
+    graph = nx.gnp_random_graph(n, p, seed=seed, directed=True)
+    graph.add_edge(3, 3)
+    return graph
+
+
+@pytest.mark.parametrize("closure_limit", [reachability.CLOSURE_LIMIT, 0])
+def test_queries_match_networkx(monkeypatch, closure_limit):
+    # With a closure limit of 0 the index answers from interval labels and a pruned search instead.
+    monkeypatch.setattr(reachability, "CLOSURE_LIMIT", closure_limit)
+    monkeypatch.setattr(reachability, "BLOCK_BITS", 7)
+    for seed in range(8):
+        graph = random_graph(seed)
+        index = ReachabilityIndex(graph)
+        for u in graph:
+            below = nx.descendants(graph, u)
+            above = nx.ancestors(graph, u)
+            cyclic = graph.has_edge(u, u) or bool(above & below)
+            assert index.waits_on_count(u) == len(below - {u})
+            assert index.blocked_count(u) == len(above - {u})
+            assert index.is_deadlocked(u) == cyclic
+            for v in graph:
+                assert index.reaches(u, v) == (u == v or v in below)
+
+
+def test_would_close_cycle():
+    index = ReachabilityIndex(nx.DiGraph([("P1", "P2"), ("P2", "P3")]))
+    assert index.would_close_cycle("P3", "P1")
+    assert not index.would_close_cycle("P1", "P3")
+    assert index.would_close_cycle("P4", "P4")
+    assert not index.would_close_cycle("P4", "P1")
+
+
+def test_longest_chain_groups_cycles():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P3"), ("P3", "P2"), ("P3", "P4"), ("P5", "P4")])
+    index = ReachabilityIndex(graph)
+    assert index.longest_chain() == [["P1"], ["P2", "P3"], ["P4"]]
+    assert index.chain_length("P5") == 2
+    assert reachability.format_chain(index.longest_chain()) == "P1 -> {P2, P3} -> P4"
+    assert index.top_blockers(1) == [("P4", 4)]
+
+
+def test_chain_length_is_longest_path_in_a_dag():
+    rng = random.Random(1)
+    for _ in range(10):
+        graph = nx.gnp_random_graph(30, 0.1, seed=rng.randrange(10 ** 6), directed=True)
+        dag = nx.DiGraph((u, v) for u, v in graph.edges if u < v)
+        dag.add_nodes_from(graph)
+        assert ReachabilityIndex(dag).chain_length() == nx.dag_longest_path_length(dag) + 1
@@ -0,0 +1,79 @@
+import os
+import random
+import subprocess
+import sys
+
+import networkx as nx
+
+import recovery
+
+
+def is_deadlocked(graph):
+    return bool(recovery.deadlocked_components(recovery.successor_sets(graph)))
+
+
+def test_components_cover_cycles_and_self_loops_only():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P1"), ("P3", "P3"), ("P4", "P5"), ("P5", "P1")])
+    components = recovery.deadlocked_components(recovery.successor_sets(graph))
+    assert sorted(map(sorted, components)) == [["P1", "P2"], ["P3"]]
+
+
+def test_victims_break_every_cycle_preferring_cheap_processes():
+    # P1 sits on both cycles, but costs more than preempting one process from each.
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P1"), ("P1", "P3"), ("P3", "P1")])
+    plan = recovery.plan_victims(graph, {"P1": 10, "P2": 1, "P3": 1})
+    assert sorted(plan.victims) == ["P2", "P3"] and plan.cost == 2 and plan.components == 1
+    plan = recovery.plan_victims(graph, {"P1": 1, "P2": 5, "P3": 5})
+    assert plan.victims == ["P1"]
+
+
+def test_plans_leave_random_graphs_deadlock_free():
+    rng = random.Random(3)
+    for _ in range(20):
+        graph = nx.gnp_random_graph(30, 0.08, seed=rng.randrange(10 ** 6), directed=True)
+        graph.add_edges_from((n, n) for n in rng.sample(range(30), 2))
+        costs = {n: rng.randint(1, 5) for n in graph}
+        victims = recovery.plan_victims(graph, costs)
+        reduced = graph.copy()
+        reduced.remove_nodes_from(victims.victims)
+        assert not is_deadlocked(reduced)
+        timeouts = recovery.plan_timeouts(graph, lambda u, v: costs[u])
+        reduced = graph.copy()
+        reduced.remove_edges_from(timeouts.edges)
+        assert not is_deadlocked(reduced)
+        assert timeouts.cost == sum(costs[u] for u, _ in timeouts.edges)
+
+
+def test_acyclic_graph_needs_nothing():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P3")])
+    assert recovery.plan_victims(graph).describe() == "nothing to do"
+    assert recovery.plan_timeouts(graph).edges == []
+
+
+def test_process_costs_combine_priority_work_and_held_resources():
+    costs = recovery.process_costs(["P1", "P2"], [[1, 2, 0]], priority={"P1": 3}, work={"P2": 4}, weights={"held": 2})
+    assert costs == {"P1": 3 + 0 + 2 * 3, "P2": 1 + 4 + 0}
+
+
+PLAN_SCRIPT = """
+import random, sys
+import networkx as nx
+import recovery
+rng = random.Random(5)
+plans = []
+for _ in range(10):
+    graph = nx.gnp_random_graph(25, 0.12, seed=rng.randrange(10 ** 6), directed=True)
+    graph = nx.relabel_nodes(graph, {n: f"P{n + 1}" for n in graph})
+    plans.append((recovery.plan_victims(graph).victims, recovery.plan_timeouts(graph).edges))
+print(plans)
+"""
+
+
+def test_plans_do_not_depend_on_hash_seed():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONPATH=root)
+        outputs.add(subprocess.run([sys.executable, "-c", PLAN_SCRIPT], env=env, capture_output=True, text=True,
+                                   check=True).stdout)
+    assert len(outputs) == 1
@@ -0,0 +1,45 @@
+import pytest
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from render_scheduler import RenderScheduler
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def scheduler_with_views(visible):
+    rendered = []
+    scheduler = RenderScheduler(lambda tab: tab in visible, interval=5)
+    for name, tab in (("table", 0), ("chart", 0), ("other", 1)):
+        scheduler.register(name, lambda name=name: rendered.append(name), tab)
+    return scheduler, rendered
+
+
+def test_redraws_within_a_frame_coalesce(app):
+    scheduler, rendered = scheduler_with_views({0})
+    for _ in range(50):
+        scheduler.mark_dirty("chart")
+        scheduler.mark_dirty("table", "chart")
+    assert rendered == [] and scheduler.timer.isActive()
+    QTest.qWait(50)
+    assert rendered == ["table", "chart"]  # once each, in registration order
+    scheduler.mark_dirty("chart")
+    QTest.qWait(50)
+    assert rendered == ["table", "chart", "chart"]
+
+
+def test_hidden_tabs_are_painted_when_shown(app):
+    visible = {0}
+    scheduler, rendered = scheduler_with_views(visible)
+    scheduler.mark_dirty("other", "chart")
+    scheduler.mark_dirty("other")
+    QTest.qWait(50)
+    assert rendered == ["chart"] and scheduler.dirty == {"other"}
+    visible.add(1)
+    scheduler.tab_shown(1)
+    assert rendered == ["chart", "other"] and not scheduler.dirty
+    scheduler.tab_shown(1)  # nothing dirty left to paint
+    assert rendered == ["chart", "other"]
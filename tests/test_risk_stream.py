@@ -0,0 +1,69 @@
+import networkx as nx
+
+import risk_stream
+from benchmarks.bench_risk_stream import alert_quality
+from risk_stream import RiskScorer
+
+
+def chain_graph(n):
+    return nx.DiGraph((f"P{i}", f"P{i + 1}") for i in range(1, n))
+
+
+def test_structure_follows_added_dependencies():
+    graph = nx.DiGraph()
+    scorer = RiskScorer(graph, 10)
+    for u, v in [("P1", "P2"), ("P2", "P3"), ("P4", "P3"), ("P5", "P3")]:
+        graph.add_edge(u, v)
+        scorer.edge_added(u, v, now=0.0)
+    risk = scorer.risk(now=1.0)
+    assert risk.chain == 2 and risk.group == 5 and risk.hotspot == "P3"
+    assert 0 < risk.closing < 1 and 0 < risk.score < 1
+
+
+def test_removals_leave_estimates_until_a_rebuild():
+    graph = chain_graph(10)
+    scorer = RiskScorer(graph, 10)
+    assert scorer.chain == 9
+    graph.remove_edge("P5", "P6")
+    scorer.edge_removed("P5", "P6", now=0.0)
+    assert scorer.chain == 9 and scorer.largest == 10 and scorer.edges == 8
+    for i in (1, 2, 3, 4):
+        graph.remove_edge(f"P{i}", f"P{i + 1}")
+        scorer.edge_removed(f"P{i}", f"P{i + 1}", now=0.0)
+    assert scorer.chain == 4 and scorer.largest == 5  # rebuilt: P6 -> ... -> P10
+
+
+def test_rate_is_measured_over_the_stream_so_far():
+    scorer = RiskScorer(nx.DiGraph(), 20)
+    for i in range(10):
+        scorer.edge_added(f"P{i}", f"P{i + 1}", now=i * 0.5)
+    assert abs(scorer.risk(now=5.0).rate - 2.0) < 1e-9
+    assert abs(scorer.risk(now=24.0).rate - 1 / risk_stream.WINDOW) < 1e-9  # only the arrival at 4.5 s is left
+
+
+def test_alerts_repeat_once_per_horizon_while_risk_stays_high():
+    graph = chain_graph(6)
+    scorer = RiskScorer(graph, 6)
+    alerts = []
+    for step in range(200):
+        now = step * 0.5
+        u, v = f"Q{step}", f"P{1 + step % 6}"
+        graph.add_edge(u, v)
+        if scorer.edge_added(u, v, now) is not None:
+            alerts.append(now)
+    assert alerts and all(b - a >= risk_stream.HORIZON for a, b in zip(alerts, alerts[1:]))
+
+
+def test_bulk_loads_are_not_arrivals():
+    graph = nx.DiGraph()
+    scorer = RiskScorer(graph, 5)
+    with scorer.bulk():
+        graph.add_edge("P1", "P2")
+        assert scorer.edge_added("P1", "P2", now=0.0) is None
+    assert scorer.edges == 1 and scorer.risk(now=1.0).rate == 0
+
+
+def test_alerts_come_before_most_generated_cycles():
+    warned, missed, early, lead = alert_quality(streams=60, seed=3)
+    assert warned > 2 * missed and lead > 3.0
+    assert early < warned
@@ -0,0 +1,52 @@
+import pytest
+
+from scenario_dsl import ScenarioError, compile_file, compile_text
+
+
+def test_ranges_and_groups_expand_to_every_pair():
+    edges = compile_text("P1..P3 waits for {P4, P5}")
+    assert edges == [(u, v) for u in ("P1", "P2", "P3") for v in ("P4", "P5")]
+
+
+def test_ring_closes_and_chain_does_not():
+    assert compile_text("ring P1..P3") == [("P1", "P2"), ("P2", "P3"), ("P3", "P1")]
+    assert compile_text("chain P1..P3") == [("P1", "P2"), ("P2", "P3")]
+
+
+def test_random_edges_are_seeded_distinct_and_loop_free():
+    edges = compile_text("random 20 edges over P1..P10 seed 7")
+    assert edges == compile_text("random 20 edges over P1..P10 seed 7")
+    assert len(set(edges)) == 20 and all(u != v for u, v in edges)
+
+
+def test_syntax_error_reports_line_and_column():
+    with pytest.raises(ScenarioError) as info:
+        compile_text("ring P1..P3\nP1 waits P2")
+    assert (info.value.line, info.value.column) == (2, 10)
+
+
+def test_non_strict_skips_free_text_and_collects_errors():
+    warnings = []
+    edges = compile_text("what is a deadlock?\nP1 waits for P2\nring P5..P3", strict=False, warnings=warnings)
+    assert edges == [("P1", "P2")]
+    assert len(warnings) == 1
+
+
+def test_file_statements_may_span_lines_inside_braces(tmp_path):
+    path = tmp_path / "scenario.txt"
+    path.write_text("P1 waits for {\n  P2,\n  P3\n}\nchain P3..P4\n")
+    assert compile_file(str(path)) == [("P1", "P2"), ("P1", "P3"), ("P3", "P4")]
+
+
+@pytest.mark.parametrize("text", ["P1..P100000 waits for P1..P100000", "random 10000000000 edges over P1..P10",
+                                  "ring P1..P2000000", "{P1..P600000, P1..P600000} waits for P1"])
+def test_oversized_statements_are_rejected_before_expanding(text):
+    with pytest.raises(ScenarioError):
+        compile_text(text)
+
+
+def test_edge_limit_covers_the_whole_text():
+    assert len(compile_text("P1..P10 waits for P11..P20", max_edges=100)) == 100
+    warnings = []
+    edges = compile_text("P1..P10 waits for P11..P20\nring P1..P3", strict=False, warnings=warnings, max_edges=100)
+    assert len(edges) == 100 and warnings[0].line == 2
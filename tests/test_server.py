@@ -0,0 +1,79 @@
+import json
+import threading
+import http.client
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def address():
+    srv = server.DeadlockServer(("127.0.0.1", 0), workers=2)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv.server_address
+    srv.shutdown()
+    srv.server_close()
+
+
+def post(address, path, body, content_type="application/json"):
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    try:
+        conn.request("POST", path, body=body, headers={"Content-Type": content_type})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_detect_reports_cycles():
+    result = server.run_operation("detect", {"edges": [["P1", "P2"], ["P2", "P1"], ["P3", "P1"]]})
+    assert result["deadlocked"] and sorted(map(sorted, result["cycles"])) == [["P1", "P2"]]
+    assert not server.run_operation("detect", {"processes": ["P1"], "edges": [["P1", "P2"]]})["deadlocked"]
+
+
+def test_bankers_operations():
+    payload = {"available": [3, 3, 2], "max_demand": [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]],
+               "allocation": [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]]}
+    safety = server.run_operation("bankers/safety", payload)
+    assert safety["safe"] and len(safety["sequence"]) == 5
+    assert server.run_operation("bankers/request", dict(payload, process="P2", request=[1, 0, 2]))["granted"]
+    assert not server.run_operation("bankers/request", dict(payload, process=4, request=[3, 3, 0]))["granted"]
+
+
+def test_invalid_requests_raise_request_errors():
+    with pytest.raises(server.RequestError) as error:
+        server.run_operation("nope", {})
+    assert error.value.status == 404
+    with pytest.raises(server.RequestError):
+        server.run_operation("bankers/safety", {"available": [1]})
+    batch = server.run_batch({"requests": [{"op": "detect", "edges": [["A", "A"]]}, {"op": "detect", "edges": 5}]})
+    assert batch["results"][0]["deadlocked"] and "error" in batch["results"][1]
+
+
+def test_http_json_batched_and_streamed(address):
+    status, result = post(address, "/v1/detect", json.dumps({"edges": [["P1", "P2"], ["P2", "P1"]]}))
+    assert status == 200 and result["deadlocked"]
+    status, result = post(address, "/v1/recovery", b"P1 P2\nP2 -> P1\n# comment\nP3,P3\n", "text/plain")
+    assert status == 200 and result["components"] == 2 and len(result["preempt"]["processes"]) == 2
+    status, result = post(address, "/v1/bankers/safety", b"[1]")
+    assert status == 400 and "JSON object" in result["error"]
+    status, result = post(address, "/v1/missing", b"{}")
+    assert status == 404
+
+
+def test_concurrent_small_requests_are_all_answered(address):
+    results = [None] * 40
+
+    def ask(i):
+        edges = [["P0", "P1"], ["P1", "P0"]] if i % 2 else [["P0", "P1"]]
+        results[i] = post(address, "/v1/detect", json.dumps({"edges": edges}))
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(results))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [status for status, _ in results] == [200] * len(results)
+    assert [result["deadlocked"] for _, result in results] == [bool(i % 2) for i in range(len(results))]
@@ -0,0 +1,73 @@
+import random
+
+import networkx as nx
+import pytest
+
+from sim_recorder import RecordingError, SimulationRecorder, SimulationReplay
+
+
+def record_run(path, steps=400, seed=1):
+    # Random edge toggles and node removals; returns the graph after every step.
+    rng = random.Random(seed)
+    names = [f"P{i}" for i in range(20)]
+    graph = nx.DiGraph([("P1", "P2")])
+    recorder = SimulationRecorder(str(path), graph, seed, keyframe_interval=10)
+    states = [nx.DiGraph(graph)]
+    for _ in range(steps):
+        u, v = rng.sample(names, 2)
+        if rng.random() < 0.1 and u in graph:
+            removed = list(graph.in_edges(u)) + list(graph.out_edges(u))
+            graph.remove_node(u)
+            recorder.step(removed_nodes=[u], removed_edges=removed)
+        elif graph.has_edge(u, v):
+            graph.remove_edge(u, v)
+            recorder.step(removed_edges=[(u, v)])
+        else:
+            graph.add_edge(u, v)
+            recorder.step(added_edges=[(u, v)])
+        states.append(nx.DiGraph(graph))
+    return recorder, states
+
+
+def same(a, b):
+    return set(a.nodes) == set(b.nodes) and set(a.edges) == set(b.edges)
+
+
+def test_seeks_in_any_order_match_the_recorded_graphs(tmp_path):
+    recorder, states = record_run(tmp_path / "run.dlsim")
+    recorder.close()
+    replay = SimulationReplay(str(tmp_path / "run.dlsim"))
+    assert replay.steps == len(states) - 1 and replay.seed == 1
+    order = list(range(len(states))) + list(range(len(states) - 1, -1, -1)) + random.Random(2).sample(range(len(states)), 100)
+    for step in order:
+        assert same(replay.graph_at(step), states[step]), step
+    replay.close()
+
+
+def test_live_replay_is_extended_in_place(tmp_path):
+    recorder, states = record_run(tmp_path / "run.dlsim", steps=50)
+    replay = recorder.replay()
+    assert same(replay.graph_at(50), states[50])
+    recorder.step(added_edges=[("P1", "P3")])
+    assert recorder.replay(replay) is replay
+    assert replay.graph_at(51).has_edge("P1", "P3")
+    replay.close()
+    recorder.close()
+
+
+def test_recording_without_footer_is_reindexed(tmp_path):
+    recorder, states = record_run(tmp_path / "run.dlsim", steps=100)
+    recorder.close()
+    whole = SimulationReplay(str(tmp_path / "run.dlsim"))
+    (tmp_path / "cut.dlsim").write_bytes((tmp_path / "run.dlsim").read_bytes()[:whole.end])
+    cut = SimulationReplay(str(tmp_path / "cut.dlsim"))
+    assert cut.steps == whole.steps and list(cut.starts) == list(whole.starts)
+    assert same(cut.graph_at(37), states[37])
+
+
+@pytest.mark.parametrize("content", [b"", b"DLSIM", b"not a recording at all"])
+def test_empty_or_foreign_files_raise_recording_error(tmp_path, content):
+    path = tmp_path / "bad.dlsim"
+    path.write_bytes(content)
+    with pytest.raises(RecordingError):
+        SimulationReplay(str(path))
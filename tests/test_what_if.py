@@ -0,0 +1,52 @@
+import random
+
+import networkx as nx
+
+import what_if
+
+
+def brute_force(graph):
+    cyclic = [c for c in nx.strongly_connected_components(graph)
+              if len(c) > 1 or graph.has_edge(next(iter(c)), next(iter(c)))]
+    deadlocked = set().union(*cyclic) if cyclic else set()
+    blocked = {n for n in graph if deadlocked & (nx.descendants(graph, n) | {n})}
+    return len(cyclic), len(deadlocked), blocked
+
+
+def test_results_match_applying_each_action():
+    rng = random.Random(5)
+    for _ in range(15):
+        graph = nx.gnp_random_graph(25, 0.07, seed=rng.randrange(10 ** 6), directed=True)
+        graph.add_edge(0, 0)
+        _, _, blocked_before = brute_force(graph)
+        results = what_if.evaluate(graph)
+        assert results
+        for result in results:
+            after = graph.copy()
+            after.remove_nodes_from(result.action.processes)
+            after.remove_edges_from(result.action.edges)
+            groups, deadlocked, blocked = brute_force(after)
+            assert (result.deadlock_groups, result.deadlocked, result.blocked) == (groups, deadlocked, len(blocked))
+            assert result.unblocked == len(blocked_before - blocked - set(result.action.processes))
+
+
+def test_best_action_resolves_the_deadlock():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P3"), ("P3", "P1"), ("P4", "P1"), ("P5", "P5")])
+    best = what_if.evaluate(graph, costs={"P1": 5})[0]
+    assert best.action.kind == "plan" and best.deadlock_groups == 0
+    assert "P1" not in best.action.processes
+
+
+def test_single_cycle_candidates_are_preemptions_and_timeouts():
+    graph = nx.DiGraph([("P1", "P2"), ("P2", "P1")])
+    labels = {a.label for a in what_if.candidate_actions(graph)}
+    assert labels == {"Preempt P1", "Preempt P2", "Time out P1 -> P2", "Time out P2 -> P1"}
+
+
+def test_parallel_evaluation_matches_serial(monkeypatch):
+    graph = nx.gnp_random_graph(40, 0.1, seed=11, directed=True)
+    serial = [(r.action.label, r.rank_key()) for r in what_if.evaluate(graph)]
+    monkeypatch.setattr(what_if, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(what_if, "CHUNK_SIZE", 4)
+    parallel = [(r.action.label, r.rank_key()) for r in what_if.evaluate(graph, workers=2)]
+    assert parallel == serial
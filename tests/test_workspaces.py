@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+import recovery
+import workspaces
+from workspaces import Workspace
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_snapshot_is_a_copy(app):
+    workspace = Workspace("A", count=4)
+    workspace.model.set_edge("P1", "P2", True)
+    snapshot = workspace.snapshot()
+    workspace.model.set_edge("P2", "P1", True)
+    assert set(snapshot.graph.edges) == {("P1", "P2")}
+    assert snapshot.processes == ["P1", "P2", "P3", "P4"] and snapshot.bankers is None
+    workspace.bankers_configured = True
+    available, max_demand, allocation = workspace.snapshot().bankers
+    assert len(max_demand) == len(allocation) == 4 and available == workspaces.DEFAULT_AVAILABLE
+
+
+def test_evaluate_deadlocked_workspace(app):
+    workspace = Workspace("B", count=6)
+    for u, v in [("P1", "P2"), ("P2", "P1"), ("P3", "P4"), ("P4", "P3"), ("P5", "P1"), ("P6", "P5")]:
+        workspace.model.set_edge(u, v, True)
+    workspace.bankers_configured = True
+    result = workspaces.evaluate(workspace.snapshot())
+    assert result.is_deadlocked and result.cycles == 2
+    assert (result.deadlocked, result.blocked) == (4, 2)
+    assert len(result.victims) == 2 and result.rounds == 1
+    assert len(result.timeouts) == 2
+    assert result.safe is not None and result.bankers_text() == ("safe: " + " -> ".join(result.sequence) if result.safe else "unsafe")
+
+
+def test_simulate_repeats_plans_until_no_deadlock_is_left():
+    graph = nx.gnp_random_graph(30, 0.12, seed=8, directed=True)
+    removed, cost, rounds = workspaces.simulate(graph, lambda g: recovery.plan_timeouts(g))
+    assert rounds >= 1 and cost == len(removed)
+    graph.remove_edges_from(removed)
+    assert not recovery.deadlocked_components(recovery.successor_sets(graph))
+
+
+def test_evaluate_all_reports_each_workspace(app):
+    good = Workspace("good", count=3).snapshot()
+    bad = workspaces.Snapshot("bad", nx.DiGraph([("P1", "P2")]), ["P1", "P2"], {}, (None, None, None))
+    results = []
+    with ThreadPoolExecutor(2) as pool:
+        for future in workspaces.evaluate_all([good, bad], pool, results.append):
+            future.result()
+    by_name = {r.name if isinstance(r, workspaces.Evaluation) else r[0]: r for r in results}
+    assert not by_name["good"].is_deadlocked and by_name["good"].bankers_text() == "not configured"
+    assert isinstance(by_name["bad"], tuple)  # a failing evaluation is reported, not raised
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import recovery
+
+PARALLEL_THRESHOLD = 200_000  # candidates x (processes + dependencies) above which a process pool is used
+CHUNK_SIZE = 64
+
+
+class Action:
+    __slots__ = ("kind", "processes", "edges", "cost", "label")
+
+    def __init__(self, kind, processes=(), edges=(), cost=0.0, label=""):
+        self.kind = kind  # "process", "edge" or "plan"
+        self.processes = tuple(processes)
+        self.edges = tuple(edges)
+        self.cost = cost
+        self.label = label
+
+
+class WhatIfResult:
+    __slots__ = ("action", "deadlock_groups", "deadlocked", "blocked", "unblocked")
+
+    def __init__(self, action, deadlock_groups, deadlocked, blocked, unblocked):
+        self.action = action
+        self.deadlock_groups = deadlock_groups
+        self.deadlocked = deadlocked
+        self.blocked = blocked
+        self.unblocked = unblocked
+
+    def rank_key(self):
+        return (self.deadlock_groups, self.deadlocked, -self.unblocked, self.action.cost, self.action.label)
+
+
+class BitGraph:
+    # Rows of successor/predecessor bitmasks. Candidates never copy it: a candidate is a mask of removed
+    # processes plus a few overridden rows for removed dependencies.
+    def __init__(self, graph):
+        self.nodes = list(graph.nodes)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.succ = [0] * len(self.nodes)
+        self.pred = [0] * len(self.nodes)
+        for u, v in graph.edges:
+            i, j = self.index[u], self.index[v]
+            self.succ[i] |= 1 << j
+            self.pred[j] |= 1 << i
+        self.all = (1 << len(self.nodes)) - 1
+
+    def rows(self, removed_edges):
+        succ, pred = self.succ, self.pred
+        if removed_edges:
+            succ, pred = list(succ), list(pred)
+            for i, j in removed_edges:
+                succ[i] &= ~(1 << j)
+                pred[j] &= ~(1 << i)
+        return succ, pred
+
+
+def bits(mask):
+    # Indices of the set bits, lowest first. Dense masks are read from the binary string in one pass;
+    # sparse ones (most rows) are cheaper to peel one low bit at a time.
+    if mask.bit_count() * 16 >= mask.bit_length():
+        return [i for i, c in enumerate(bin(mask)[:1:-1]) if c == "1"]
+    found = []
+    while mask:
+        low = mask & -mask
+        found.append(low.bit_length() - 1)
+        mask ^= low
+    return found
+
+
+def reach(start, rows, within):
+    visited = frontier = start
+    while frontier:
+        step = 0
+        for i in bits(frontier):
+            step |= rows[i]
+        frontier = step & within & ~visited
+        visited |= frontier
+    return visited
+
+
+def peel(alive, forward, backward):
+    # Repeatedly drop nodes with no forward neighbour left; what survives can walk forward forever.
+    count = {i: (forward[i] & alive).bit_count() for i in bits(alive)}
+    queue = [i for i, c in count.items() if c == 0]
+    while queue:
+        i = queue.pop()
+        alive &= ~(1 << i)
+        for j in bits(backward[i] & alive):
+            count[j] -= 1
+            if count[j] == 0:
+                queue.append(j)
+    return alive
+
+
+def evaluate_mask(bit_graph, removed_nodes, removed_edges, universe=None):
+    # Removing processes or dependencies never blocks anyone new, so peeling can start from the
+    # blocked set of the unmodified graph instead of the whole graph.
+    succ, pred = bit_graph.rows(removed_edges)
+    alive = (bit_graph.all if universe is None else universe) & ~removed_nodes
+    blocked = peel(alive, succ, pred)       # processes that reach a cycle, i.e. wait forever
+    core = peel(blocked, pred, succ)        # of those, the ones also reachable from a cycle
+    # Forward-backward decomposition: the component of a pivot is what it reaches and what reaches it.
+    groups = deadlocked = 0
+    while core:
+        pivot = (core & -core).bit_length() - 1
+        component = reach(1 << pivot, succ, core) & reach(1 << pivot, pred, core)
+        size = component.bit_count()
+        if size > 1 or succ[pivot] >> pivot & 1:
+            groups += 1
+            deadlocked += size
+        core = peel(peel(core & ~component, succ, pred), pred, succ)
+    return groups, deadlocked, blocked
+
+
+_worker_graph = None
+
+
+def _init_worker(bit_graph, universe):
+    global _worker_graph
+    _worker_graph = (bit_graph, universe)
+
+
+def _evaluate_chunk(masks):
+    bit_graph, universe = _worker_graph
+    return [evaluate_mask(bit_graph, removed_nodes, removed_edges, universe) for removed_nodes, removed_edges in masks]
+
+
+def candidate_actions(graph, costs=None):
+    """Every single preemption or timeout inside a deadlocked component, plus the two minimum-cost plans."""
+    costs = costs or {}
+    components = recovery.deadlocked_components(recovery.successor_sets(graph))
+    actions = []
+    for component in components:
+        for p in component:
+            actions.append(Action("process", processes=[p], cost=costs.get(p, 1), label=f"Preempt {p}"))
+        for u in component:
+            for v in graph.successors(u):
+                if v in component:
+                    actions.append(Action("edge", edges=[(u, v)], cost=costs.get(u, 1), label=f"Time out {u} -> {v}"))
+    if len(components) > 1 or any(len(c) > 2 for c in components):
+        victims = recovery.plan_victims(graph, costs)
+        actions.append(Action("plan", processes=victims.victims, cost=victims.cost, label=f"Preempt {', '.join(map(str, victims.victims))}"))
+        timeouts = recovery.plan_timeouts(graph, lambda u, v: costs.get(u, 1))
+        actions.append(Action("plan", edges=timeouts.edges, cost=timeouts.cost,
+                              label=f"Time out {', '.join(f'{u} -> {v}' for u, v in timeouts.edges)}"))
+    return actions
+
+
+def evaluate(graph, actions=None, costs=None, workers=None):
+    """Evaluate every action against the same graph and return the results best first."""
+    actions = candidate_actions(graph, costs) if actions is None else actions
+    bit_graph = BitGraph(graph)
+    index = bit_graph.index
+    masks = []
+    for action in actions:
+        removed_nodes = 0
+        for p in action.processes:
+            removed_nodes |= 1 << index[p]
+        masks.append((removed_nodes, [(index[u], index[v]) for u, v in action.edges]))
+    _, _, blocked_before = evaluate_mask(bit_graph, 0, ())
+
+    if len(masks) * (len(bit_graph.nodes) + graph.number_of_edges()) > PARALLEL_THRESHOLD and len(masks) > CHUNK_SIZE:
+        chunks = [masks[i:i + CHUNK_SIZE] for i in range(0, len(masks), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker, initargs=(bit_graph, blocked_before)) as pool:
+            summaries = [s for chunk in pool.map(_evaluate_chunk, chunks) for s in chunk]
+    else:
+        summaries = [evaluate_mask(bit_graph, removed_nodes, removed_edges, blocked_before) for removed_nodes, removed_edges in masks]
+
+    results = []
+    for action, (removed_nodes, _), (groups, deadlocked, blocked) in zip(actions, masks, summaries):
+        # A preempted process is not counted as unblocked; it is gone.
+        unblocked = (blocked_before & ~blocked & ~removed_nodes).bit_count()
+        results.append(WhatIfResult(action, groups, deadlocked, blocked.bit_count(), unblocked))
+    results.sort(key=WhatIfResult.rank_key)
+    return results
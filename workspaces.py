@@ -0,0 +1,132 @@
+import time
+from collections import deque
+
+import networkx as nx
+
+import deadlock_core
+import recovery
+import risk_stream
+from dependency_model import DependencyModel
+
+DEFAULT_MAX_DEMAND = [[7, 5, 3], [3, 2, 2], [9, 0, 2], [2, 2, 2], [4, 3, 3]]
+DEFAULT_ALLOCATION = [[0, 1, 0], [2, 0, 0], [3, 0, 2], [2, 1, 1], [0, 0, 2]]
+DEFAULT_AVAILABLE = [3, 3, 3]
+
+
+class Workspace:
+    """One named analysis session: its dependency model (graph, history and processes), streaming risk,
+    Banker's configuration and recovery costs. Switching workspaces swaps all of them together."""
+
+    def __init__(self, name, count=5):
+        self.name = name
+        self.model = DependencyModel(count)
+        self.risk = risk_stream.RiskScorer(self.model.graph, count)
+        self.bankers_configured = False
+        self.available = list(DEFAULT_AVAILABLE)
+        self.reset_bankers(count)
+        self.process_priority = {}
+        self.process_work = {}
+
+    def reset_bankers(self, count):
+        self.max_demand = [list(row) for row in DEFAULT_MAX_DEMAND] + [[0, 0, 0]] * (count - 5)
+        self.allocation = [list(row) for row in DEFAULT_ALLOCATION] + [[0, 0, 0]] * (count - 5)
+
+    def snapshot(self):
+        # Taken on the GUI thread; evaluation only ever sees these copies.
+        model = self.model
+        return Snapshot(self.name, nx.DiGraph(model.graph), list(model.processes),
+                        recovery.process_costs(model.processes, self.allocation, self.process_priority, self.process_work),
+                        (list(self.available), [list(r) for r in self.max_demand[:model.count]],
+                         [list(r) for r in self.allocation[:model.count]]) if self.bankers_configured else None)
+
+
+class Snapshot:
+    __slots__ = ("name", "graph", "processes", "costs", "bankers")
+
+    def __init__(self, name, graph, processes, costs, bankers):
+        self.name = name
+        self.graph = graph
+        self.processes = processes
+        self.costs = costs
+        self.bankers = bankers  # (available, max demand, allocation), or None while not configured
+
+
+class Evaluation:
+    __slots__ = ("name", "processes", "dependencies", "type", "cycles", "deadlocked", "blocked",
+                 "victims", "victim_cost", "rounds", "timeouts", "timeout_cost", "safe", "sequence", "seconds")
+
+    def __init__(self, name, **fields):
+        self.name = name
+        for field in self.__slots__[1:]:
+            setattr(self, field, fields[field])
+
+    @property
+    def is_deadlocked(self):
+        return "No Deadlock" not in self.type
+
+    def bankers_text(self):
+        if self.safe is None:
+            return "not configured"
+        return "safe: " + " -> ".join(self.sequence) if self.safe else "unsafe"
+
+
+def blocked_behind(graph, deadlocked):
+    # Processes that wait, directly or through others, on a deadlocked one (and are not deadlocked themselves).
+    seen, queue = set(deadlocked), deque(deadlocked)
+    while queue:
+        for u in graph.pred[queue.popleft()]:
+            if u not in seen:
+                seen.add(u)
+                queue.append(u)
+    return len(seen) - len(deadlocked)
+
+
+def simulate(graph, choose):
+    """Headless run of the simulation: apply the chosen recovery plan until no deadlocked group is left.
+    Returns (everything removed, total cost, rounds)."""
+    graph = graph.copy()
+    removed, cost, rounds = [], 0.0, 0
+    while rounds <= graph.number_of_nodes():
+        components = recovery.deadlocked_components(recovery.successor_sets(graph))
+        if not components:
+            break
+        plan = choose(graph)
+        if not plan.victims and not plan.edges:
+            break
+        graph.remove_nodes_from(plan.victims)
+        graph.remove_edges_from(plan.edges)
+        removed += plan.victims or plan.edges
+        cost += plan.cost
+        rounds += 1
+    return removed, cost, rounds
+
+
+def evaluate(snapshot):
+    """Detection, both recovery simulations and the Banker's check for one workspace. Pure: safe to run on a pool."""
+    start = time.perf_counter()
+    graph, costs = snapshot.graph, snapshot.costs
+    deadlock_type = deadlock_core.identify_deadlock_type(graph)
+    cycles = deadlock_core.deadlock_cycles(graph) if "No Deadlock" not in deadlock_type else []
+    components = recovery.deadlocked_components(recovery.successor_sets(graph))
+    deadlocked = set().union(*components) if components else set()
+    victims, victim_cost, rounds = simulate(graph, lambda g: recovery.plan_victims(g, costs))
+    timeouts, timeout_cost, _ = simulate(graph, lambda g: recovery.plan_timeouts(g, lambda u, v: costs.get(u, 1)))
+    safe, sequence = None, []
+    if snapshot.bankers is not None:
+        safe, order = deadlock_core.bankers_safety(*snapshot.bankers)
+        sequence = [snapshot.processes[p] for p in order] if safe else []
+    return Evaluation(snapshot.name, processes=len(snapshot.processes), dependencies=graph.number_of_edges(),
+                      type=deadlock_type, cycles=len(cycles), deadlocked=len(deadlocked),
+                      blocked=blocked_behind(graph, deadlocked), victims=victims, victim_cost=victim_cost,
+                      rounds=rounds, timeouts=timeouts, timeout_cost=timeout_cost, safe=safe, sequence=sequence,
+                      seconds=time.perf_counter() - start)
+
+
+def evaluate_all(snapshots, pool, done):
+    """Submit every snapshot to `pool`; `done(evaluation or (name, error))` is called from the pool as each finishes."""
+    def run(snapshot):
+        try:
+            done(evaluate(snapshot))
+        except Exception as e:
+            done((snapshot.name, str(e)))
+    return [pool.submit(run, snapshot) for snapshot in snapshots]